@@ -6,12 +6,12 @@
 包含登入、驗證碼處理等核心功能
 """
 
-import os
+import json
 import time
+import base64
+import threading
 from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
-import ddddocr
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -20,34 +20,322 @@ from selenium.common.exceptions import (
     WebDriverException,
     InvalidSessionIdException,
     NoSuchWindowException,
+    TimeoutException,
 )
 
+from .settings import get_settings
 from .browser_utils import init_chrome_browser, cleanup_temp_user_data_dirs, _cleanup_headless_chrome, check_browser_health
+from .selector_cache import get_selector_cache, group_key
+from .navigation_memo import get_navigation_memo
+from .latency_history import get_latency_history
+from .page_snapshot import PageSnapshot, SNAPSHOT_PROBE_JS
+from .captcha_corpus import CaptchaCorpus
+from .step_timing import StepRecorder, timed_step
+from .errors import NoData, PageLoadTimeout, classify_exception
+from .scrape_progress import ScrapeProgress, WorkItemInterrupted
+from .trace_export import is_trace_export_enabled, instrument_driver
 from ..utils.windows_encoding_utils import safe_print
 
 
+# 瀏覽器端定位器解析函式，供多個 execute_script 腳本共用
+# 支援 Selenium By 的字串值：id / name / css selector / xpath / link text / partial link text / tag name / class name
+_LOCATOR_RESOLVER_JS = r"""
+function __tcatResolve(by, value) {
+    var doc = document;
+    var toArray = function (list) { return Array.prototype.slice.call(list || []); };
+    try {
+        switch (by) {
+            case 'id':
+                return toArray(doc.querySelectorAll('[id="' + value.replace(/"/g, '\\"') + '"]'));
+            case 'name':
+                return toArray(doc.getElementsByName(value));
+            case 'css selector':
+                return toArray(doc.querySelectorAll(value));
+            case 'tag name':
+                return toArray(doc.getElementsByTagName(value));
+            case 'class name':
+                return toArray(doc.getElementsByClassName(value));
+            case 'xpath':
+                var snapshot = doc.evaluate(value, doc, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                var nodes = [];
+                for (var i = 0; i < snapshot.snapshotLength; i++) {
+                    if (snapshot.snapshotItem(i).nodeType === 1) nodes.push(snapshot.snapshotItem(i));
+                }
+                return nodes;
+            case 'link text':
+            case 'partial link text':
+                return toArray(doc.getElementsByTagName('a')).filter(function (a) {
+                    var text = (a.innerText || a.textContent || '').trim();
+                    return by === 'link text' ? text === value : text.indexOf(value) >= 0;
+                });
+        }
+    } catch (e) {}
+    return [];
+}
+function __tcatIsVisible(el) {
+    if (!el || (el.type && String(el.type).toLowerCase() === 'hidden')) return false;
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden') return false;
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+function __tcatUsable(el, opts) {
+    if (opts.visible && !__tcatIsVisible(el)) return false;
+    if (opts.enabled && el.disabled) return false;
+    return true;
+}
+function __tcatCandidates(loc, opts) {
+    var nodes = __tcatResolve(loc[0], loc[1]);
+    if (loc.length > 2 && loc[2] !== null) nodes = nodes.length > loc[2] ? [nodes[loc[2]]] : [];
+    return nodes.filter(function (el) { return __tcatUsable(el, opts); });
+}
+function __tcatText(el) {
+    return (el.innerText || el.value || el.getAttribute('title') || '').trim();
+}
+"""
+
+# 依序評估定位器群組：first 模式回傳第一個全部命中的群組，all 模式回傳所有命中元素
+# opts.hints 為 {頁面樣式: 群組索引}，依當下頁面優先嘗試快取中的勝出群組（見 selector_cache.page_pattern）
+_FIND_MATCHES_JS = _LOCATOR_RESOLVER_JS + r"""
+var groups = arguments[0], opts = arguments[1];
+if (!opts.all) {
+    var page = location.pathname.replace(/\/+$/, '').split('/').pop().toLowerCase() || '/';
+    var order = [];
+    for (var g = 0; g < groups.length; g++) order.push(g);
+    var hint = opts.hints ? opts.hints[page] : undefined;
+    if (hint !== undefined && hint >= 0 && hint < groups.length) {
+        order.splice(hint, 1);
+        order.unshift(hint);
+    }
+    for (var o = 0; o < order.length; o++) {
+        var g = order[o], picked = [];
+        for (var i = 0; i < groups[g].length; i++) {
+            var found = __tcatCandidates(groups[g][i], opts);
+            if (!found.length) break;
+            picked.push(found[0]);
+        }
+        if (picked.length === groups[g].length) return {index: g, elements: picked, page: page};
+    }
+    return {index: -1, elements: [], page: page};
+}
+var matches = [], seen = [];
+for (var g = 0; g < groups.length; g++) {
+    var found = __tcatCandidates(groups[g][0], opts);
+    for (var n = 0; n < found.length; n++) {
+        if (seen.indexOf(found[n]) >= 0) continue;
+        seen.push(found[n]);
+        matches.push({index: g, element: found[n], text: __tcatText(found[n])});
+    }
+}
+return matches;
+"""
+
+
+# 快速登入第一段（非同步腳本）：等待登入表單與驗證碼圖片載入，
+# 一次回傳驗證碼圖片（canvas dataURL）與所有欄位的元素參照
+# arguments[0] = {captcha, radio: 定位器清單, hints: {captcha, radio}}，arguments[1] = 等待上限（毫秒）
+# arguments[2] 為 true 時先刷新驗證碼（優先點擊頁面的刷新控制項，否則替圖片網址加上時間戳記）
+_LOGIN_PREPARE_JS = _LOCATOR_RESOLVER_JS + r"""
+var locs = arguments[0], deadline = Date.now() + arguments[1], refresh = arguments[2];
+var done = arguments[arguments.length - 1];
+var refreshedImg = null, refreshLoaded = true, refreshMethod = null;
+var page = location.pathname.replace(/\/+$/, '').split('/').pop().toLowerCase() || '/';
+var opts = {visible: true, enabled: true};
+function firstMatch(list, hints) {
+    var order = [];
+    for (var i = 0; i < list.length; i++) order.push(i);
+    var hint = hints ? hints[page] : undefined;
+    if (hint !== undefined && hint >= 0 && hint < list.length) { order.splice(hint, 1); order.unshift(hint); }
+    for (var o = 0; o < order.length; o++) {
+        var found = __tcatCandidates(list[order[o]], opts);
+        if (found.length) return {element: found[0], index: order[o]};
+    }
+    return {element: null, index: -1};
+}
+function capture(img) {
+    try {
+        var canvas = document.createElement('canvas');
+        canvas.width = img.naturalWidth;
+        canvas.height = img.naturalHeight;
+        canvas.getContext('2d').drawImage(img, 0, 0);
+        return canvas.toDataURL('image/png');
+    } catch (e) {
+        return null;  // 跨來源圖片會污染 canvas，改由 Python 端截圖
+    }
+}
+function refreshCaptcha(img) {
+    refreshedImg = img;
+    refreshLoaded = false;
+    var markLoaded = function () { refreshLoaded = true; };
+    img.addEventListener('load', markLoaded, {once: true});
+    img.addEventListener('error', markLoaded, {once: true});
+    var controls = ['#btnRefresh', '#imgRefresh', '#lnkRefresh', '#btnChangeCaptcha',
+                    'a[onclick*="captcha" i]', 'img[onclick*="captcha" i]', 'input[onclick*="captcha" i]'];
+    for (var i = 0; i < controls.length; i++) {
+        var control = document.querySelector(controls[i]);
+        if (control && __tcatIsVisible(control)) { control.click(); refreshMethod = 'control'; return; }
+    }
+    var base = (img.getAttribute('src') || img.src).replace(/[?&]_tcat=\d+$/, '');
+    img.src = base + (base.indexOf('?') >= 0 ? '&' : '?') + '_tcat=' + Date.now();
+    refreshMethod = 'src';
+}
+(function poll() {
+    var user = document.getElementById('txtUserID'), img = document.getElementById('captcha');
+    if (refresh && img && !refreshedImg) refreshCaptcha(img);
+    // 刷新後需等新圖片載入（控制項可能直接替換圖片元素）
+    var refreshed = !refresh || refreshLoaded || (img && img !== refreshedImg);
+    var ready = !!(user && img && img.complete && img.naturalWidth > 0 && refreshed);
+    if (!ready && Date.now() < deadline) { setTimeout(poll, 100); return; }
+    if (!user) { done(null); return; }
+    var captcha = firstMatch(locs.captcha, locs.hints.captcha), radio = firstMatch(locs.radio, locs.hints.radio);
+    done({
+        page: page,
+        url: location.href,
+        user: user,
+        password: document.getElementById('txtUserPW'),
+        captchaImage: img,
+        captchaData: ready ? capture(img) : null,
+        captchaSrc: img ? img.currentSrc || img.src : null,
+        captchaInput: captcha.element,
+        captchaIndex: captcha.index,
+        radio: radio.element,
+        radioIndex: radio.index,
+        submit: document.querySelector('input[type="submit"]'),
+        refreshMethod: refreshMethod
+    });
+})();
+"""
+
+# 以 canvas 取得驗證碼圖片的原始像素（不經頁面截圖）；跨來源圖片污染 canvas 時 data 為 null
+# arguments[0] = 驗證碼 <img> 元素
+_CAPTCHA_CAPTURE_JS = r"""
+var img = arguments[0], data = null;
+if (img.complete && img.naturalWidth > 0) {
+    try {
+        var canvas = document.createElement('canvas');
+        canvas.width = img.naturalWidth;
+        canvas.height = img.naturalHeight;
+        canvas.getContext('2d').drawImage(img, 0, 0);
+        data = canvas.toDataURL('image/png');
+    } catch (e) {
+        data = null;
+    }
+}
+return {data: data, src: img.currentSrc || img.src};
+"""
+
+# 快速登入第二段：填入所有欄位、選擇契約客戶專區並提交（提交延後到腳本返回後，避免等待頁面卸載）
+_LOGIN_SUBMIT_JS = r"""
+var f = arguments[0], v = arguments[1];
+function setValue(el, value) {
+    el.value = value;
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+setValue(f.user, v.username);
+setValue(f.password, v.password);
+setValue(f.captchaInput, v.captcha);
+var radioClicked = false;
+if (f.radio && !f.radio.checked) {
+    f.radio.click();
+    radioClicked = true;
+}
+setTimeout(function () { f.submit.click(); }, 0);
+return {radioClicked: radioClicked, radioFound: !!f.radio};
+"""
+
+
+def _normalize_locator(locator):
+    """將 (By, value) 或 (By, value, nth) 轉為可傳入瀏覽器腳本的 list"""
+    by_method, value = locator[0], locator[1]
+    nth = locator[2] if len(locator) > 2 else None
+    return [by_method, value, nth]
+
+
 class BaseScraper:
     """黑貓宅急便基礎抓取器類別"""
 
+    # 登入頁面（MultiAccountManager 的網站探測也使用此 URL）
+    LOGIN_URL = "https://www.takkyubin.com.tw/YMTContract/aspx/Login.aspx"
+
     # 子類別必須覆寫此類別變數，指定環境變數名稱
     DOWNLOAD_DIR_ENV_KEY = None
     # 子類別必須覆寫此類別變數，指定已完成下載目錄的環境變數名稱
     DOWNLOAD_OK_DIR_ENV_KEY = None
-
-    def __init__(self, username, password, headless=None, shared_driver=None):
-        # 載入環境變數
-        load_dotenv()
-
-        self.url = "https://www.takkyubin.com.tw/YMTContract/aspx/Login.aspx"
+    # 導航備忘錄的報表類型鍵（None 表示不使用備忘錄）
+    NAVIGATION_MEMO_KEY = None
+
+    # 驗證碼輸入框候選定位器（依優先順序）
+    CAPTCHA_INPUT_LOCATORS = [
+        (By.ID, "txtValidate"),
+        (By.NAME, "txtValidate"),
+        (By.ID, "txtCaptcha"),
+        (By.NAME, "txtCaptcha"),
+        (By.CSS_SELECTOR, "input[placeholder*='驗證']"),
+        (By.CSS_SELECTOR, "input[type='text']:nth-of-type(2)"),
+    ]
+
+    # 「契約客戶專區 登入」選項候選定位器（第三個欄位為同名元素中的索引）
+    CONTRACT_RADIO_LOCATORS = [
+        (By.ID, "IsCustService_1"),  # 契約客戶專區
+        (By.ID, "rdoLoginType_1"),
+        (By.NAME, "IsCustService", 1),  # 同名選項中的第二個
+        (By.CSS_SELECTOR, "input[type='radio'][value='1']"),
+        (By.CSS_SELECTOR, "input[type='radio']:nth-of-type(2)"),
+    ]
+
+    # 日期輸入框候選定位器群組：(開始日期, 結束日期)
+    DATE_INPUT_LOCATOR_GROUPS = [
+        [(By.ID, "txtDateS"), (By.ID, "txtDateE")],
+        [(By.NAME, "txtDateS"), (By.NAME, "txtDateE")],
+        [(By.ID, "txtStartDate"), (By.ID, "txtEndDate")],  # 交易明細表特有的 ID
+        [(By.CSS_SELECTOR, "input[type='text']", 0), (By.CSS_SELECTOR, "input[type='text']", 1)],
+    ]
+
+    # 登入頁面上表示驗證碼錯誤的訊息
+    CAPTCHA_ERROR_MESSAGES = ["驗證碼錯誤", "驗證碼輸入錯誤", "驗證碼不正確", "驗證碼有誤"]
+    # 驗證碼錯誤時連續只刷新驗證碼重試的上限，超過後重新載入整個登入頁面
+    MAX_CAPTCHA_REFRESH_RETRIES = 2
+    # 投票識別信心不足時，提交前刷新驗證碼重新識別的上限
+    MAX_LOW_CONFIDENCE_REFRESHES = 2
+    # 一般登入失敗後的重試間隔（秒）
+    LOGIN_RETRY_DELAY = 3
+
+    # 搜尋按鈕候選定位器
+    SEARCH_BUTTON_LOCATORS = [
+        (By.ID, "btnSearch"),
+        (By.ID, "btnQuery"),
+        (By.ID, "lnkbtnSearch"),
+        (By.CSS_SELECTOR, "input[type='submit'][value*='搜'], input[type='button'][value*='搜'], button[value*='搜']"),
+    ]
+
+    def __init__(self, username, password, headless=None, shared_driver=None, settings=None, progress=None):
+        # 執行設定（啟動時解析一次，由 MultiAccountManager 傳入或取用程序共用的設定）
+        self.settings = settings or get_settings()
+        # 階段與工作項目進度（MultiAccountManager 在重試間沿用同一份，已完成的項目不會重做）
+        self.progress = progress or ScrapeProgress(username)
+
+        self.url = self.LOGIN_URL
         self.username = username
         self.password = password
 
         # headless 優先級: CLI 參數 > 環境變數 > 預設值 (true)
-        if headless is not None:
-            self.headless = headless
-        else:
-            env_headless = os.getenv("HEADLESS", "true").lower()
-            self.headless = env_headless == "true"
+        self.headless = headless if headless is not None else self.settings.headless
+
+        # 快速登入：兩次腳本呼叫完成表單填寫與提交，不可用時自動改用逐欄填寫流程
+        self.fast_login = self.settings.fast_login
+        # 每次登入嘗試的耗時記錄
+        self.login_latencies = []
+        # 登入統計：成功次數、總嘗試次數、驗證碼刷新 / 整頁重新載入次數、刷新重試節省的時間
+        self.login_stats = {
+            "successful_logins": 0,
+            "attempts": 0,
+            "captcha_refreshes": 0,
+            "full_reloads": 0,
+            "time_saved_seconds": 0.0,
+            "captcha_fetch": {},
+        }
+        self._captcha_unreadable = False
+        self._last_alert_text = None
 
         self.driver = None
         self.wait = None
@@ -65,23 +353,42 @@ class BaseScraper:
         self.end_time = None
         self.execution_duration_minutes = 0
 
-        # 初始化 ddddocr
-        self.ocr = ddddocr.DdddOcr(show_ad=False)
-
-        # 從環境變數讀取下載目錄
+        # 驗證碼識別器在第一次需要時才建立（見 captcha_solver 屬性），避免啟動時載入 ddddocr / onnxruntime / numpy
+        self._captcha_solver = None
+        self._captcha_solver_lock = threading.Lock()
+        # 驗證碼語料收集（設定 CAPTCHA_CORPUS_DIR 時啟用）
+        self.captcha_corpus = CaptchaCorpus()
+
+        # 跨執行的定位器 / 導航 URL 學習快取（程序內共用）
+        self.selector_cache = get_selector_cache()
+        # 每種報表 / 帳號成功到達目標頁面的導航備忘錄（程序內共用）
+        self.navigation_memo = get_navigation_memo()
+        self._last_navigation_url = None
+
+        # 步驟計時（登入、驗證碼、導航、搜尋、下載、搬移等 span，寫入 logs/*.steps.jsonl 並彙總到報告）
+        self.steps = StepRecorder(username, type(self).__name__)
+        # 跨執行的步驟延遲歷史，用來推算等待逾時（見 adaptive_timeout）
+        self.latency_history = get_latency_history()
+        self.steps.add_listener(self.latency_history.observe_record)
+
+        # 頁面原始碼快照（DOM 未變更時重複檢查不再重新傳輸原始碼）
+        self._page_snapshot = None
+        self._snapshot_epoch = 0
+
+        # 從設定讀取下載目錄
         if self.DOWNLOAD_DIR_ENV_KEY is None:
             raise NotImplementedError("子類別必須設定 DOWNLOAD_DIR_ENV_KEY")
         if self.DOWNLOAD_OK_DIR_ENV_KEY is None:
             raise NotImplementedError("子類別必須設定 DOWNLOAD_OK_DIR_ENV_KEY")
 
-        download_base_dir = os.getenv(self.DOWNLOAD_DIR_ENV_KEY, "downloads")
+        download_base_dir = self.settings.download_dir(self.DOWNLOAD_DIR_ENV_KEY, "downloads")
 
         # 所有檔案都放在同一層的下載目錄
         self.final_download_dir = Path(download_base_dir)
         self.final_download_dir.mkdir(parents=True, exist_ok=True)
 
-        # 從環境變數讀取已完成下載目錄（用於檢查是否已下載過）
-        ok_dir = os.getenv(self.DOWNLOAD_OK_DIR_ENV_KEY)
+        # 從設定讀取已完成下載目錄（用於檢查是否已下載過）
+        ok_dir = self.settings.download_dir(self.DOWNLOAD_OK_DIR_ENV_KEY)
         self.ok_download_dir = Path(ok_dir) if ok_dir else None
 
         # download_dir 將在每次下載時動態設定為 UUID 臨時目錄
@@ -124,6 +431,95 @@ class BaseScraper:
 
         return False
 
+    # ==================== 工作項目進度 ====================
+
+    def download_work_items(self, items, key_of, download_item, label="項目"):
+        """
+        逐一下載工作項目，已完成的項目略過，每完成一項立即寫入進度
+
+        Args:
+            items: 列出的工作項目
+            key_of: 取得項目唯一鍵的函式（例如發票號碼、期間文字）
+            download_item: 下載單一項目的函式，成功回傳檔案清單（可為空），失敗回傳 None
+            label: 訊息中的項目名稱
+
+        Returns:
+            list: 所有已完成項目的下載檔案（含先前嘗試下載的）
+
+        Raises:
+            WorkItemInterrupted: 項目失敗且瀏覽器已失效
+        """
+        keys = [key_of(item) for item in items]
+        self.progress.set_items(keys)
+        skipped = sum(1 for key in keys if self.progress.is_done(key))
+        if skipped:
+            safe_print(f"♻️ 略過先前已完成的 {skipped}/{len(keys)} 個{label}")
+
+        for position, (item, key) in enumerate(zip(items, keys), 1):
+            if self.progress.is_done(key):
+                continue
+            safe_print(f"📄 處理第 {position}/{len(keys)} 個{label}: {key}")
+            error = None
+            try:
+                files = download_item(item)
+            except Exception as e:
+                safe_print(f"❌ 處理{label} {key} 時發生錯誤: {e}")
+                files, error = None, e
+            # 沒有下載到檔案時確認瀏覽器仍存活（下載流程可能吞掉了瀏覽器崩潰的例外）；
+            # 瀏覽器已失效時後續項目也不可能成功，中止並交由重試從此項目續跑
+            if not files and not self.is_browser_alive():
+                raise WorkItemInterrupted(key, error)
+            if files is not None:
+                self.progress.mark_done(key, files)
+
+        return self.progress.downloaded_files()
+
+    def failure_result(self, error, downloads=()):
+        """
+        將流程中的例外轉為帳號結果
+
+        Args:
+            error: 流程中捕捉到的例外
+            downloads: 失敗前已下載的檔案
+
+        Returns:
+            dict: 帳號結果（NoData 視為成功）
+
+        Raises:
+            ScraperError: 可重試的錯誤（含無法分類但瀏覽器已失效的情況），交由 MultiAccountManager 重試
+        """
+        classified = classify_exception(error)
+        if not classified.retryable and classified is not error and self.driver and not self.is_browser_alive():
+            classified = WorkItemInterrupted(self.progress.stage or "init", error)
+            classified.__cause__ = error
+        if classified.retryable:
+            raise classified
+
+        downloads = [str(f) for f in downloads]
+        message = str(classified)
+        detail = message if message == classified.label else f"{classified.label}: {message}"
+        safe_print(f"{classified.icon} 帳號 {self.username} {detail}")
+        if isinstance(classified, NoData):
+            return {"success": True, "username": self.username, "message": message, "downloads": downloads}
+        return {
+            "success": False,
+            "username": self.username,
+            "error": message,
+            "error_type": classified.error_type,
+            "downloads": downloads,
+        }
+
+    def adaptive_timeout(self, step, default, fallback=None):
+        """
+        由步驟延遲歷史推算等待逾時（p99 × 倍數，介於下限與 default 之間；樣本不足時為 fallback，預設為 default）
+
+        Args:
+            step: timed_step / span 的步驟名稱
+            default: 原本的固定逾時（秒）
+            fallback: 樣本不足時使用的逾時（秒）
+        """
+        return self.latency_history.timeout_for(f"{type(self).__name__}.{step}", default, fallback)
+
     # ==================== 智慧等待方法 ====================
     # 以下方法用於替代固定 time.sleep()，提升執行效率
 
@@ -347,11 +743,14 @@ class BaseScraper:
 
     # ==================== 原有方法 ====================
 
+    @timed_step("browser_init", check_result=False)
     def init_browser(self):
         """初始化瀏覽器（支援共享模式）"""
         if self._shared_driver:
             self.driver, self.wait = self._shared_driver
             safe_print("♻️ 使用共享瀏覽器")
+            self._instrument_driver()
+            self._apply_page_load_timeout()
             return
 
         # 使用預設的 downloads 目錄初始化瀏覽器
@@ -359,70 +758,475 @@ class BaseScraper:
         default_download_dir = self.final_download_dir
 
         self.driver, self.wait = init_chrome_browser(
-            headless=self.headless, download_dir=str(default_download_dir.absolute())
+            headless=self.headless, download_dir=str(default_download_dir.absolute()), settings=self.settings
+        )
+        self._instrument_driver()
+        self._apply_page_load_timeout()
+
+    def _apply_page_load_timeout(self):
+        """
+        依導航步驟的延遲歷史設定頁面載入逾時（導航包含至少一次頁面載入，其 p99 是保守的上界）
+
+        每次都套用推算值（最多回到設定值）：共享瀏覽器的逾時可能被前一個 scraper 縮短，網站變慢時要能放寬回來。
+        歷史樣本不足時使用啟動前探測推算的初始逾時（未探測時為設定值）
+        """
+        timeout = self.adaptive_timeout(
+            "navigation",
+            self.settings.browser_page_load_timeout,
+            fallback=self.settings.browser_initial_page_load_timeout,
         )
+        try:
+            self.driver.set_page_load_timeout(timeout)
+        except Exception:
+            pass
+
+    def load_page(self, url):
+        """
+        載入頁面（driver.get），頁面載入逾時轉為 PageLoadTimeout（網站層級失敗，可重試並計入斷路器）
+
+        Args:
+            url: 目標 URL
+        """
+        try:
+            self.driver.get(url)
+        except TimeoutException as e:
+            raise PageLoadTimeout(f"頁面載入逾時: {url}") from e
+
+    def _instrument_driver(self):
+        """啟用追蹤匯出時，將 WebDriver 指令記錄為目前步驟的事件"""
+        if is_trace_export_enabled():
+            instrument_driver(self.driver, self.steps)
+
+    @property
+    def captcha_solver(self):
+        """
+        驗證碼識別器（首次存取時依執行設定建立）
+
+        OCR_SERVICE_SOCKET 設定時改用共用 OCR 服務（不在本程序載入模型）；
+        CAPTCHA_ENSEMBLE=true 時改用多模型投票識別，信心不足時提交前先刷新驗證碼；
+        其餘為 ddddocr + 可選的前處理步驟與字元集範圍（見 CAPTCHA_PREPROCESS 等環境變數）
+        """
+        with self._captcha_solver_lock:
+            if self._captcha_solver is None:
+                if self.settings.ocr_service_socket:
+                    from .ocr_service import RemoteCaptchaSolver
+
+                    self._captcha_solver = RemoteCaptchaSolver.from_env(self.settings)
+                elif self.settings.captcha_ensemble:
+                    from .captcha_preprocess import CaptchaEnsemble
+
+                    self._captcha_solver = CaptchaEnsemble.from_env(self.settings)
+                else:
+                    from .captcha_preprocess import CaptchaSolver
+
+                    self._captcha_solver = CaptchaSolver.from_env(self.settings)
+            return self._captcha_solver
+
+    @property
+    def ocr(self):
+        """ddddocr 實例（相容舊介面，首次存取時載入模型）"""
+        return self.captcha_solver.ocr
+
+    def preload_captcha_solver(self):
+        """在背景執行緒建立驗證碼識別器，讓模型載入與登入頁面載入同時進行"""
+        if self._captcha_solver is not None:
+            return
+
+        def load():
+            try:
+                self.captcha_solver
+            except Exception as e:
+                safe_print(f"⚠️ 預先載入驗證碼識別器失敗: {e}")
+
+        threading.Thread(target=load, name="captcha-solver-preload", daemon=True).start()
 
     def solve_captcha(self, captcha_img_element):
         """使用 ddddocr 自動識別驗證碼"""
+        image_bytes = self.fetch_captcha_bytes(captcha_img_element)
+        if not image_bytes:
+            return None
+        return self.solve_captcha_bytes(image_bytes)
+
+    @timed_step("captcha_fetch")
+    def fetch_captcha_bytes(self, captcha_img_element, captcha_src=None):
+        """
+        取得驗證碼圖片的原始位元組
+
+        依序嘗試：canvas 擷取原始像素（一次腳本呼叫）→ CDP 取得瀏覽器已下載的回應內容 →
+        元素截圖（需 Chrome 擷取並裁切整頁畫面，較慢且受視窗大小影響，僅作為最後備援）
+
+        Args:
+            captcha_img_element: 驗證碼 <img> 元素
+            captcha_src: 已知的圖片網址（提供時略過 canvas 擷取，例如快速登入 canvas 已失敗）
+
+        Returns:
+            bytes: 圖片位元組，全部失敗時回傳 None
+        """
+        started = time.perf_counter()
+        image_bytes, method = None, None
+
+        if captcha_src is None:
+            try:
+                captured = self.driver.execute_script(_CAPTCHA_CAPTURE_JS, captcha_img_element) or {}
+                captcha_src = captured.get("src")
+                data = captured.get("data")
+                if data and "," in data:
+                    image_bytes, method = base64.b64decode(data.split(",", 1)[1]), "canvas"
+            except (InvalidSessionIdException, NoSuchWindowException):
+                raise
+            except WebDriverException as e:
+                safe_print(f"⚠️ canvas 擷取驗證碼失敗: {e}")
+
+        if image_bytes is None and captcha_src and not captcha_src.startswith("data:"):
+            image_bytes = self._fetch_captcha_via_cdp(captcha_src)
+            method = "cdp" if image_bytes else None
+        elif image_bytes is None and captcha_src and "," in captcha_src:
+            # data: URL 圖片本身就是原始位元組
+            image_bytes, method = base64.b64decode(captcha_src.split(",", 1)[1]), "data_url"
+
+        if image_bytes is None:
+            try:
+                image_bytes, method = captcha_img_element.screenshot_as_png, "screenshot"
+            except (InvalidSessionIdException, NoSuchWindowException):
+                raise
+            except Exception as e:
+                safe_print(f"❌ 驗證碼圖片擷取失敗: {e}")
+                return None
+
+        fetch_stats = self.login_stats["captcha_fetch"]
+        fetch_stats[method] = fetch_stats.get(method, 0) + 1
+        safe_print(f"📷 驗證碼圖片擷取方式: {method}（{(time.perf_counter() - started) * 1000:.0f} ms）")
+        return image_bytes
+
+    def _fetch_captcha_via_cdp(self, captcha_src):
+        """
+        透過 CDP 取得瀏覽器已下載的驗證碼回應內容（不重新請求，避免伺服器產生新的驗證碼）
+
+        啟用 CAPTCHA_NETWORK_CAPTURE 時由效能日誌找出請求 ID 並呼叫 Network.getResponseBody，
+        否則以 Page.getResourceContent 讀取頁面資源快取。
+        """
+        if not hasattr(self.driver, "execute_cdp_cmd"):
+            return None
+
         try:
-            safe_print("🔍 使用 ddddocr 識別驗證碼...")
+            request_id = self._find_captcha_request_id(captcha_src)
+            if request_id:
+                body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+                content, encoded = body.get("body"), body.get("base64Encoded")
+            else:
+                frame_id = self.driver.execute_cdp_cmd("Page.getFrameTree", {})["frameTree"]["frame"]["id"]
+                resource = self.driver.execute_cdp_cmd(
+                    "Page.getResourceContent", {"frameId": frame_id, "url": captcha_src}
+                )
+                content, encoded = resource.get("content"), resource.get("base64Encoded")
+        except (InvalidSessionIdException, NoSuchWindowException):
+            raise
+        except Exception as e:
+            safe_print(f"⚠️ CDP 取得驗證碼圖片失敗: {e}")
+            return None
 
-            # 截取驗證碼圖片
-            screenshot = captcha_img_element.screenshot_as_png
+        if not content or not encoded:
+            return None
+        return base64.b64decode(content)
 
-            # 使用 ddddocr 識別
-            result = self.ocr.classification(screenshot)
+    def _find_captcha_request_id(self, captcha_src):
+        """從效能日誌找出驗證碼圖片最近一次回應的請求 ID（未啟用效能日誌時回傳 None）"""
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            return None
+
+        request_id = None
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError, TypeError):
+                continue
+            if message.get("method") != "Network.responseReceived":
+                continue
+            params = message.get("params", {})
+            if params.get("response", {}).get("url") == captcha_src:
+                request_id = params.get("requestId")
+        return request_id
+
+    @timed_step("captcha")
+    def solve_captcha_bytes(self, image_bytes):
+        """使用 ddddocr 識別驗證碼圖片位元組"""
+        try:
+            safe_print("🔍 使用 ddddocr 識別驗證碼...")
+
+            # 使用 ddddocr 識別（含設定的前處理步驟）
+            result, ocr_ms = self.captcha_solver.solve(image_bytes)
 
             safe_print(f"✅ ddddocr 識別結果: {result}")
+            vote_info = getattr(self.captcha_solver, "last_vote", None)
+            if vote_info:
+                candidates = " / ".join(c or "-" for c in vote_info["candidates"])
+                safe_print(f"🗳️ 投票信心 {vote_info['confidence']:.2f}（候選: {candidates}，{ocr_ms:.0f} ms）")
+            self.captcha_corpus.record(image_bytes, result, round(ocr_ms, 1))
             return result
         except Exception as e:
             safe_print(f"❌ ddddocr 識別失敗: {e}")
             return None
 
+    @timed_step("login")
     def login(self, max_attempts=3):
-        """執行登入流程，支援多次重試"""
+        """執行登入流程，支援多次重試（驗證碼錯誤時優先只刷新驗證碼重新提交）"""
         safe_print("🌐 開始登入流程...")
 
+        captcha_failed = False
+        refresh_streak = 0
+        full_attempt_seconds = None
+        self.preload_captcha_solver()
+
         for attempt in range(1, max_attempts + 1):
             safe_print(f"🔄 第 {attempt}/{max_attempts} 次登入嘗試")
+            self.steps.event("login.attempt", attempt=attempt)
+            attempt_started = time.time()
+            self._captcha_unreadable = False
+            self._last_alert_text = None
+
+            mode = "classic"
+            submit_success = None
+
+            # 驗證碼錯誤且仍停在登入頁：只刷新驗證碼並重新提交，連續失敗才重新載入整頁
+            if captcha_failed and self.fast_login and refresh_streak < self.MAX_CAPTCHA_REFRESH_RETRIES:
+                safe_print("🔁 驗證碼錯誤，僅刷新驗證碼後重新提交")
+                mode = "captcha_refresh"
+                submit_success = self.fast_login_submit(refresh_captcha=True)
+                if submit_success is None:
+                    safe_print("⚠️ 無法刷新驗證碼，重新載入登入頁面")
+                    mode = "classic"
+                else:
+                    refresh_streak += 1
+                    self.login_stats["captcha_refreshes"] += 1
+
+            if submit_success is None:
+                refresh_streak = 0
+                self.login_stats["full_reloads"] += 1
+
+                # 前往登入頁面
+                self.load_page(self.url)
+
+                # 快速登入：兩次腳本呼叫完成填寫與提交（None 表示不可用）
+                if self.fast_login:
+                    mode = "fast"
+                    submit_success = self.fast_login_submit()
+                    if submit_success is None:
+                        safe_print("⚠️ 快速登入不可用，改用逐欄填寫流程")
+                        mode = "classic"
+
+            if submit_success is None:
+                # 智慧等待登入表單載入完成
+                self.smart_wait_for_element(By.ID, "txtUserID", timeout=10, visible=True)
+                safe_print("✅ 登入頁面載入完成")
+
+                # 填寫表單
+                form_success = self.fill_login_form()
+                if not form_success:
+                    safe_print(f"❌ 第 {attempt} 次嘗試 - 表單填寫失敗")
+                    self._record_login_latency(attempt, mode, attempt_started, False)
+                    captcha_failed = self._is_captcha_failure()
+                    self._resolve_captcha_corpus(False, captcha_failed)
+                    if attempt < max_attempts:
+                        safe_print("🔄 準備重試...")
+                        if not (captcha_failed and self.fast_login):
+                            time.sleep(2)
+                    continue
 
-            # 前往登入頁面
-            self.driver.get(self.url)
-            # 智慧等待登入表單載入完成
-            self.smart_wait_for_element(By.ID, "txtUserID", timeout=10, visible=True)
-            safe_print("✅ 登入頁面載入完成")
-
-            # 填寫表單
-            form_success = self.fill_login_form()
-            if not form_success:
-                safe_print(f"❌ 第 {attempt} 次嘗試 - 表單填寫失敗")
-                if attempt < max_attempts:
-                    safe_print("🔄 準備重試...")
-                    time.sleep(2)
-                continue
+                submit_success = self.submit_login()
 
-            submit_success = self.submit_login()
             if not submit_success:
                 safe_print(f"❌ 第 {attempt} 次嘗試 - 表單提交失敗")
+                self._record_login_latency(attempt, mode, attempt_started, False)
+                captcha_failed = self._is_captcha_failure()
+                self._resolve_captcha_corpus(False, captcha_failed)
                 if attempt < max_attempts:
                     safe_print("🔄 準備重試...")
-                    time.sleep(2)
+                    if not (captcha_failed and self.fast_login):
+                        time.sleep(2)
                 continue
 
             # 檢查登入結果
             success = self.check_login_success()
+            duration = self._record_login_latency(attempt, mode, attempt_started, success)
+            if mode == "captcha_refresh":
+                if full_attempt_seconds is not None:
+                    # 相較於重新載入整頁並等待重試間隔所節省的時間
+                    saved = full_attempt_seconds + self.LOGIN_RETRY_DELAY - duration
+                    self.login_stats["time_saved_seconds"] += max(0.0, saved)
+            else:
+                full_attempt_seconds = duration
+
             if success:
                 safe_print(f"✅ 第 {attempt} 次嘗試成功登入！")
+                self._resolve_captcha_corpus(True, False)
+                self.captcha_solver.record_login(first_try=attempt == 1)
+                self.login_stats["successful_logins"] += 1
+                self.login_stats["attempts"] += attempt
                 return True
             else:
                 safe_print(f"❌ 第 {attempt} 次嘗試登入失敗")
+                captcha_failed = self._is_captcha_failure()
+                self._resolve_captcha_corpus(False, captcha_failed)
                 if attempt < max_attempts:
                     safe_print("🔄 準備重試...")
-                    time.sleep(3)  # 稍微增加重試間隔
+                    if not (captcha_failed and self.fast_login):
+                        time.sleep(self.LOGIN_RETRY_DELAY)  # 稍微增加重試間隔
 
+        self.login_stats["attempts"] += max_attempts
         safe_print(f"❌ 經過 {max_attempts} 次嘗試後仍然登入失敗")
         return False
 
+    def _resolve_captcha_corpus(self, success, captcha_failed):
+        """依登入結果標註本次嘗試收集的驗證碼圖片"""
+        if self.captcha_corpus.is_enabled():
+            outcome = "accepted" if success else ("rejected" if captcha_failed else "unknown")
+            self.captcha_corpus.resolve(outcome)
+
+    def _is_captcha_failure(self):
+        """判斷上次登入失敗是否為驗證碼錯誤且仍停留在登入頁面（可只刷新驗證碼重試）"""
+        try:
+            snapshot = self.get_page_snapshot()
+        except WebDriverException:
+            return False
+
+        if "login.aspx" not in snapshot.url.lower():
+            return False
+        if self._captcha_unreadable:
+            return True
+        if self._last_alert_text and "驗證碼" in self._last_alert_text:
+            return True
+        return bool(snapshot.contains_any(self.CAPTCHA_ERROR_MESSAGES))
+
+    def _record_login_latency(self, attempt, mode, started, success):
+        """記錄單次登入嘗試的耗時（從前往登入頁面到判定結果）"""
+        duration = time.time() - started
+        self.login_latencies.append(
+            {"attempt": attempt, "mode": mode, "seconds": round(duration, 2), "success": bool(success)}
+        )
+        mode_label = {"fast": "快速", "captcha_refresh": "驗證碼刷新"}.get(mode, "逐欄填寫")
+        safe_print(f"⏱️ 第 {attempt} 次登入嘗試耗時 {duration:.2f} 秒（{mode_label}模式）")
+        return duration
+
+    def fast_login_submit(self, refresh_captcha=False):
+        """
+        快速登入：以兩次腳本呼叫完成表單填寫與提交
+
+        第一段腳本等待表單與驗證碼載入，回傳 canvas 擷取的驗證碼圖片與欄位參照；
+        OCR 後第二段腳本一次填入帳號、密碼、驗證碼，選擇契約客戶專區並提交。
+
+        Args:
+            refresh_captcha: 是否先在目前頁面刷新驗證碼（驗證碼錯誤重試時使用，不重新載入登入頁）
+
+        Returns:
+            True: 已提交 / False: 驗證碼識別或提交失敗 / None: 快速路徑不可用（改用逐欄填寫流程）
+        """
+        safe_print("⚡ 快速登入：刷新驗證碼..." if refresh_captcha else "⚡ 快速登入：載入登入表單...")
+
+        captcha_keys = [group_key([loc]) for loc in self.CAPTCHA_INPUT_LOCATORS]
+        radio_keys = [group_key([loc]) for loc in self.CONTRACT_RADIO_LOCATORS]
+        payload = {
+            "captcha": [_normalize_locator(loc) for loc in self.CAPTCHA_INPUT_LOCATORS],
+            "radio": [_normalize_locator(loc) for loc in self.CONTRACT_RADIO_LOCATORS],
+            "hints": {
+                "captcha": self.selector_cache.hints("captcha_input", captcha_keys),
+                "radio": self.selector_cache.hints("contract_radio", radio_keys),
+            },
+        }
+
+        fields = self._prepare_fast_login(payload, refresh_captcha)
+        if fields is None:
+            return None
+        captcha_text = self._solve_fast_login_captcha(fields)
+
+        # 投票識別信心不足：提交前刷新驗證碼重新識別（比提交失敗後重試少一次登入往返）
+        low_confidence_refreshes = 0
+        while (
+            captcha_text
+            and not self.captcha_solver.is_confident()
+            and low_confidence_refreshes < self.MAX_LOW_CONFIDENCE_REFRESHES
+        ):
+            safe_print(f"🤔 驗證碼識別信心不足（{self.captcha_solver.last_vote['confidence']:.2f}），提交前刷新驗證碼")
+            refreshed = self._prepare_fast_login(payload, True)
+            if refreshed is None:
+                break
+            fields = refreshed
+            low_confidence_refreshes += 1
+            self.captcha_solver.record_refresh()
+            captcha_text = self._solve_fast_login_captcha(fields)
+
+        if not captcha_text:
+            safe_print("⚠️ ddddocr 無法識別驗證碼")
+            safe_print("❌ 驗證碼處理失敗")
+            self._captcha_unreadable = True
+            return False
+
+        page = fields.get("page", "/")
+        self.selector_cache.record_hit(page, "captcha_input", captcha_keys[fields["captchaIndex"]])
+        if fields.get("radio") is not None:
+            self.selector_cache.record_hit(page, "contract_radio", radio_keys[fields["radioIndex"]])
+
+        form = {key: fields.get(key) for key in ("user", "password", "captchaInput", "radio", "submit")}
+        values = {"username": self.username, "password": self.password, "captcha": captcha_text}
+        try:
+            result = self.driver.execute_script(_LOGIN_SUBMIT_JS, form, values) or {}
+        except (InvalidSessionIdException, NoSuchWindowException):
+            raise
+        except WebDriverException as e:
+            if not self.is_browser_alive():
+                raise
+            safe_print(f"❌ 提交表單失敗: {e}")
+            return False
+
+        safe_print(f"✅ 已填入使用者帳號: {self.username}")
+        safe_print("✅ 已填入密碼")
+        safe_print(f"✅ 已填入驗證碼: {captcha_text}")
+        if result.get("radioClicked"):
+            safe_print("✅ 已選擇契約客戶專區登入")
+        elif result.get("radioFound"):
+            safe_print("✅ 契約客戶專區已預先選中")
+        else:
+            safe_print("⚠️ 無法找到契約客戶專區選項，使用預設值")
+
+        safe_print("📤 提交登入表單...")
+        return self._after_login_submit(fields.get("url") or self.url)
+
+    def _prepare_fast_login(self, payload, refresh_captcha):
+        """
+        執行快速登入第一段腳本：等待表單與驗證碼載入（可先刷新驗證碼）
+
+        Returns:
+            dict: 驗證碼圖片與欄位參照 / None: 快速路徑不可用
+        """
+        try:
+            fields = self.driver.execute_async_script(_LOGIN_PREPARE_JS, payload, 10000, refresh_captcha)
+        except (InvalidSessionIdException, NoSuchWindowException):
+            raise
+        except WebDriverException as e:
+            if not self.is_browser_alive():
+                raise
+            safe_print(f"⚠️ 快速登入表單準備失敗: {e}")
+            return None
+
+        required = ("user", "password", "captchaImage", "captchaInput", "submit")
+        if not fields or any(fields.get(key) is None for key in required):
+            return None
+        if refresh_captcha:
+            method = "刷新控制項" if fields.get("refreshMethod") == "control" else "圖片網址"
+            safe_print(f"🔄 已透過{method}刷新驗證碼")
+        return fields
+
+    def _solve_fast_login_captcha(self, fields):
+        """識別快速登入擷取的驗證碼：優先使用 canvas 擷取的原始圖片，無法擷取時改用 CDP 或元素截圖"""
+        captcha_data = fields.get("captchaData")
+        if captcha_data and "," in captcha_data:
+            fetch_stats = self.login_stats["captcha_fetch"]
+            fetch_stats["canvas"] = fetch_stats.get("canvas", 0) + 1
+            return self.solve_captcha_bytes(base64.b64decode(captcha_data.split(",", 1)[1]))
+        image_bytes = self.fetch_captcha_bytes(fields["captchaImage"], captcha_src=fields.get("captchaSrc") or "")
+        return self.solve_captcha_bytes(image_bytes) if image_bytes else None
+
     def fill_login_form(self):
         """填寫登入表單"""
         safe_print("📝 填寫登入表單...")
@@ -464,23 +1268,8 @@ class BaseScraper:
             captcha_text = self.solve_captcha(captcha_img)
 
             if captcha_text:
-                # 填入驗證碼 - 尋找驗證碼輸入框
-                captcha_selectors = [
-                    (By.ID, "txtValidate"),
-                    (By.NAME, "txtValidate"),
-                    (By.ID, "txtCaptcha"),
-                    (By.NAME, "txtCaptcha"),
-                    (By.CSS_SELECTOR, "input[placeholder*='驗證']"),
-                    (By.CSS_SELECTOR, "input[type='text']:nth-of-type(2)"),
-                ]
-
-                captcha_field = None
-                for by_method, selector in captcha_selectors:
-                    try:
-                        captcha_field = self.driver.find_element(by_method, selector)
-                        break
-                    except:
-                        continue
+                # 填入驗證碼 - 一次腳本呼叫找出第一個可用的驗證碼輸入框
+                captcha_field, _ = self.find_first_match(self.CAPTCHA_INPUT_LOCATORS, cache_slot="captcha_input")
 
                 if captcha_field:
                     captcha_field.clear()
@@ -492,6 +1281,7 @@ class BaseScraper:
                     return False
             else:
                 safe_print("⚠️ ddddocr 無法識別驗證碼")
+                self._captcha_unreadable = True
                 return False
 
         except Exception as captcha_e:
@@ -501,27 +1291,8 @@ class BaseScraper:
     def _select_contract_customer_login(self):
         """選擇契約客戶專區登入"""
         try:
-            # 嘗試多種可能的選擇器
-            contract_selectors = [
-                (By.ID, "IsCustService_1"),  # 契約客戶專區
-                (By.ID, "rdoLoginType_1"),
-                (By.NAME, "IsCustService"),
-                (By.CSS_SELECTOR, "input[type='radio'][value='1']"),
-                (By.CSS_SELECTOR, "input[type='radio']:nth-of-type(2)"),
-            ]
-
-            contract_radio = None
-            for by_method, selector in contract_selectors:
-                try:
-                    if by_method == By.NAME:
-                        radios = self.driver.find_elements(by_method, selector)
-                        if len(radios) > 1:
-                            contract_radio = radios[1]  # 選擇第二個選項
-                    else:
-                        contract_radio = self.driver.find_element(by_method, selector)
-                    break
-                except:
-                    continue
+            # 一次腳本呼叫評估所有可能的選擇器
+            contract_radio, _ = self.find_first_match(self.CONTRACT_RADIO_LOCATORS, cache_slot="contract_radio")
 
             if contract_radio and not contract_radio.is_selected():
                 contract_radio.click()
@@ -543,6 +1314,15 @@ class BaseScraper:
             old_url = self.driver.current_url
             login_button.click()
 
+            return self._after_login_submit(old_url)
+
+        except Exception as e:
+            safe_print(f"❌ 提交表單失敗: {e}")
+            return False
+
+    def _after_login_submit(self, old_url):
+        """提交登入表單後的共用處理：等待頁面響應、檢查錯誤訊息與彈窗"""
+        try:
             # 智慧等待頁面響應（URL變化或頁面載入完成）
             self.smart_wait_for_url_change(old_url=old_url, timeout=10)
 
@@ -583,8 +1363,7 @@ class BaseScraper:
     def _check_error_messages(self):
         """檢查頁面上的錯誤訊息"""
         try:
-            error_messages = []
-            # 尋找可能的錯誤訊息
+            # 尋找可能的錯誤訊息（所有 XPath 在一次腳本呼叫中評估）
             error_selectors = [
                 "//div[contains(@class, 'error')]",
                 "//span[contains(@class, 'error')]",
@@ -596,14 +1375,8 @@ class BaseScraper:
                 "//span[contains(text(), '驗證碼')]",
             ]
 
-            for selector in error_selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        if element.text.strip():
-                            error_messages.append(element.text.strip())
-                except:
-                    continue
+            matches = self.find_all_matches([(By.XPATH, selector) for selector in error_selectors], enabled=False)
+            error_messages = [match["text"] for match in matches if match.get("text")]
 
             if error_messages:
                 safe_print(f"⚠️ 頁面錯誤訊息: {'; '.join(set(error_messages))}")
@@ -615,13 +1388,15 @@ class BaseScraper:
         """檢查登入是否成功"""
         safe_print("🔐 檢查登入狀態...")
 
-        current_url = self.driver.current_url
+        # 一次傳輸取得 URL 與原始碼，後續會話檢查可直接沿用
+        snapshot = self.get_page_snapshot()
+        current_url = snapshot.url
         current_title = self.driver.title
         safe_print(f"📍 當前 URL: {current_url}")
         safe_print(f"📄 當前標題: {current_title}")
 
         # 檢查頁面內容是否包含登入成功的跡象
-        page_source = self.driver.page_source
+        page_source = snapshot.source
         success_indicators = [
             "登出",
             "系統主選單",
@@ -649,20 +1424,14 @@ class BaseScraper:
         ]
 
         # 檢查失敗指標
-        found_failures = []
-        for indicator in failure_indicators:
-            if indicator in page_source:
-                found_failures.append(indicator)
+        found_failures = snapshot.contains_any(failure_indicators)
 
         if found_failures:
             safe_print(f"⚠️ 發現登入失敗訊息: {', '.join(found_failures)}")
             return False
 
         # 檢查成功指標
-        found_success = []
-        for indicator in success_indicators:
-            if indicator in page_source:
-                found_success.append(indicator)
+        found_success = snapshot.contains_any(success_indicators)
 
         # 檢查 URL 變化
         url_changed = current_url != self.url
@@ -685,6 +1454,12 @@ class BaseScraper:
 
     def close(self):
         """關閉瀏覽器並清理臨時資源（共享模式下僅解除引用）"""
+        self.selector_cache.flush()
+        self.navigation_memo.flush()
+        self.latency_history.flush()
+        if self._captcha_solver is not None:
+            self._captcha_solver.close()
+
         if not self._owns_browser:
             # 共享模式：不關閉瀏覽器，僅解除引用
             safe_print("♻️ 共享瀏覽器模式，跳過關閉")
@@ -722,6 +1497,7 @@ class BaseScraper:
             safe_print(f"💀 瀏覽器已失效: {error}")
         return alive
 
+    @timed_step("browser_rebuild")
     def _rebuild_browser(self):
         """
         銷毀死掉的瀏覽器並重建新的
@@ -749,10 +1525,14 @@ class BaseScraper:
         self.driver, self.wait = init_chrome_browser(
             headless=self.headless,
             download_dir=str(default_download_dir.absolute()),
+            settings=self.settings,
         )
 
         # 更新共享引用，讓 MultiAccountManager 能追蹤最新的 driver
         self._shared_driver = (self.driver, self.wait)
+        self._instrument_driver()
+        self._apply_page_load_timeout()
+        self.invalidate_page_snapshot()
         safe_print("✅ 瀏覽器重建完成")
         return self.driver, self.wait
 
@@ -769,7 +1549,9 @@ class BaseScraper:
         """
         self.username = username
         self.password = password
+        self.steps.username = username
         self.security_warning_encountered = False
+        self.invalidate_page_snapshot()
 
         if not self.is_browser_alive():
             self._rebuild_browser()
@@ -777,7 +1559,7 @@ class BaseScraper:
 
         try:
             self.driver.delete_all_cookies()
-            self.driver.get(self.url)
+            self.load_page(self.url)
             self.smart_wait_for_element(By.ID, "txtUserID", timeout=10, visible=True)
             safe_print(f"♻️ 已重置瀏覽器，準備切換至帳號: {username}")
         except (WebDriverException, InvalidSessionIdException, NoSuchWindowException) as e:
@@ -800,6 +1582,23 @@ class BaseScraper:
         else:
             safe_print("⚠️ 未找到開始時間，無法計算執行時長")
 
+    def get_login_stats(self):
+        """獲取登入統計（含每次成功登入平均嘗試次數與驗證碼刷新節省的秒數）"""
+        stats = dict(self.login_stats)
+        stats["captcha_fetch"] = dict(stats["captcha_fetch"])
+        successes = stats["successful_logins"]
+        stats["attempts_per_login"] = round(stats["attempts"] / successes, 2) if successes else None
+        stats["time_saved_seconds"] = round(stats["time_saved_seconds"], 2)
+        solver_stats = self._captcha_solver.get_stats() if self._captcha_solver is not None else None
+        if solver_stats and "extra_ms_total" in solver_stats:
+            # 投票識別的成本效益：額外推論秒數 vs. 修正主要模型結果所避免的重試（以平均單次嘗試耗時估算）
+            attempt_seconds = [entry["seconds"] for entry in self.login_latencies]
+            mean_attempt = sum(attempt_seconds) / len(attempt_seconds) if attempt_seconds else 0.0
+            solver_stats["extra_seconds"] = round(solver_stats["extra_ms_total"] / 1000, 2)
+            solver_stats["estimated_retry_seconds_avoided"] = round(solver_stats["overrides"] * mean_attempt, 2)
+        stats["captcha_solver"] = solver_stats
+        return stats
+
     def get_execution_summary(self):
         """獲取執行時間摘要"""
         if self.start_time and self.end_time:
@@ -809,6 +1608,9 @@ class BaseScraper:
                 "end_time": self.end_time.strftime("%Y-%m-%d %H:%M:%S"),
                 "duration_minutes": round(self.execution_duration_minutes, 2),
                 "security_warning": self.security_warning_encountered,
+                "login_attempts": list(self.login_latencies),
+                "login_stats": self.get_login_stats(),
+                "steps": self.steps.summary((self.end_time - self.start_time).total_seconds()),
             }
         else:
             return {
@@ -817,6 +1619,9 @@ class BaseScraper:
                 "end_time": None,
                 "duration_minutes": 0,
                 "security_warning": self.security_warning_encountered,
+                "login_attempts": list(self.login_latencies),
+                "login_stats": self.get_login_stats(),
+                "steps": self.steps.summary(),
             }
 
     def set_download_directory(self, download_path):
@@ -857,6 +1662,7 @@ class BaseScraper:
         self.setup_temp_download_dir()
         return self.download_dir
 
+    @timed_step("move", check_result=False)
     def move_and_cleanup_files(self, downloaded_files, renamed_files):
         """
         將重命名後的檔案從臨時目錄移動到最終下載目錄，並清理臨時目錄
@@ -892,6 +1698,7 @@ class BaseScraper:
                 # 移動檔案
                 shutil.move(str(source_file), str(target_file))
                 final_files.append(target_file)
+                self.steps.event("download.file", file=target_file.name, bytes=target_file.stat().st_size)
                 safe_print(f"✅ 檔案已移動: {source_file.name} → {target_file}")
 
             # 清理臨時目錄
@@ -915,54 +1722,200 @@ class BaseScraper:
         except Exception as e:
             safe_print(f"⚠️ 清理臨時目錄失敗: {e}")
 
-    # ==================== 元素搜尋輔助方法 ====================
-    # 以下方法用於通用的元素搜尋，減少子類中的重複程式碼
+    # ==================== 導航備忘錄方法 ====================
+    # 記錄並重用成功到達目標頁面的 URL，避免每個帳號都重跑完整的導航備援流程
 
-    def find_date_inputs(self):
+    def order_navigation_urls(self, slot, urls):
         """
-        尋找頁面上的日期輸入欄位
+        依學習快取重新排序直接導航 URL，上次成功的 URL 排第一
 
-        使用多種策略尋找開始日期和結束日期輸入框。
+        Args:
+            slot: 快取欄位名稱（例如 "freight_direct_url"）
+            urls: 依預設優先順序排列的 URL 清單
 
         Returns:
-            tuple: (start_date_input, end_date_input) 或 (None, None) 如果找不到
+            list: 重新排序後的 URL 清單
         """
-        start_date_input = None
-        end_date_input = None
+        return self.selector_cache.order("navigation", slot, urls)
 
-        # 策略1: 使用確切的 ID (txtDateS, txtDateE)
-        try:
-            start_date_input = self.driver.find_element(By.ID, "txtDateS")
-            end_date_input = self.driver.find_element(By.ID, "txtDateE")
-            return (start_date_input, end_date_input)
-        except:
-            pass
+    def remember_navigation_url(self, slot, url):
+        """記錄成功到達目標頁面的直接導航 URL"""
+        self.selector_cache.record_hit("navigation", slot, url)
+        self._last_navigation_url = url
+
+    def _navigate_via_memo(self, verify_fn):
+        """
+        依導航備忘錄直接跳到上次成功的目標頁面（登入後立即執行，略過登入完成等待）
+
+        Args:
+            verify_fn: 驗證是否已到達目標頁面的函式（例如 self._is_freight_page）
+
+        Returns:
+            True: 備忘錄命中且驗證成功
+            False: 已嘗試但驗證失敗（需執行備援導航）
+            None: 沒有可用的備忘錄記錄
+        """
+        if not self.NAVIGATION_MEMO_KEY:
+            return None
+        entry = self.navigation_memo.lookup(self.NAVIGATION_MEMO_KEY, self.username)
+        if not entry:
+            return None
+
+        url = entry["url"]
+        started = time.time()
+        safe_print(f"🧠 使用導航備忘錄直接訪問（{entry.get('strategy')}，上次耗時 {entry.get('duration')} 秒）: {url}")
 
-        # 策略2: 使用 NAME 屬性
         try:
-            start_date_input = self.driver.find_element(By.NAME, "txtDateS")
-            end_date_input = self.driver.find_element(By.NAME, "txtDateE")
-            return (start_date_input, end_date_input)
-        except:
-            pass
+            self.load_page(url)
+            if self._handle_alerts() == "SECURITY_WARNING":
+                return False
+
+            self.smart_wait(
+                lambda d: d.execute_script("return document.readyState") == "complete",
+                timeout=10,
+                error_message="頁面載入完成",
+            )
+            if self._handle_alerts() == "SECURITY_WARNING":
+                return False
+
+            if not self._check_session_timeout() and verify_fn():
+                duration = time.time() - started
+                safe_print(f"✅ 導航備忘錄命中，耗時 {duration:.1f} 秒")
+                self.navigation_memo.record_success(
+                    self.NAVIGATION_MEMO_KEY, self.username, entry.get("strategy", "direct_url"), url, duration
+                )
+                return True
+        except (InvalidSessionIdException, NoSuchWindowException):
+            raise
+        except WebDriverException as e:
+            if not self.is_browser_alive():
+                raise
+            safe_print(f"⚠️ 導航備忘錄訪問失敗: {e}")
+
+        safe_print("⚠️ 導航備忘錄未命中，改用完整導航流程")
+        self.navigation_memo.record_miss(self.NAVIGATION_MEMO_KEY, self.username, url)
+        return False
 
-        # 策略3: 嘗試交易明細表特有的 ID
+    def _remember_navigation(self, strategy, started, url=None):
+        """
+        記錄備援導航成功的策略與 URL，供後續帳號與執行直接使用
+
+        Args:
+            strategy: 導航策略（direct_url / menu / frame）
+            started: 開始導航的時間戳記（time.time()）
+            url: 可重新訪問的 URL，預設為當前頁面 URL
+        """
+        if not self.NAVIGATION_MEMO_KEY:
+            return
         try:
-            start_date_input = self.driver.find_element(By.ID, "txtStartDate")
-            end_date_input = self.driver.find_element(By.ID, "txtEndDate")
-            return (start_date_input, end_date_input)
-        except:
-            pass
+            url = url or self.driver.current_url
+        except WebDriverException:
+            return
+        self.navigation_memo.record_success(
+            self.NAVIGATION_MEMO_KEY, self.username, strategy, url, time.time() - started
+        )
 
-        # 策略4: 通用搜索 - 尋找前兩個文字輸入框
+    # ==================== 元素搜尋輔助方法 ====================
+    # 以下方法用於通用的元素搜尋，減少子類中的重複程式碼
+
+    def _find_matches(self, groups, visible, enabled, find_all, hints=None):
+        """在瀏覽器端一次評估所有定位器群組（find_first_match 系列的共用實作）"""
+        options = {"visible": visible, "enabled": enabled, "all": find_all, "hints": hints or {}}
+        payload = [[_normalize_locator(loc) for loc in group] for group in groups]
         try:
-            date_inputs = self.driver.find_elements(By.CSS_SELECTOR, "input[type='text']")
-            if len(date_inputs) >= 2:
-                return (date_inputs[0], date_inputs[1])
-        except:
-            pass
+            return self.driver.execute_script(_FIND_MATCHES_JS, payload, options)
+        except (InvalidSessionIdException, NoSuchWindowException):
+            safe_print("💀 評估定位器時瀏覽器崩潰")
+            raise
+        except WebDriverException as e:
+            if not self.is_browser_alive():
+                safe_print("💀 評估定位器時瀏覽器崩潰")
+                raise
+            safe_print(f"⚠️ 評估定位器失敗: {e}")
+            return None
 
-        return (None, None)
+    def find_first_match_group(self, groups, visible=True, enabled=True, cache_slot=None):
+        """
+        依序評估定位器群組，回傳第一個所有定位器皆命中的群組
+
+        整個群組清單在一次瀏覽器端腳本中評估，未命中的定位器不會產生
+        額外的 WebDriver 往返或例外。
+
+        Args:
+            groups: 定位器群組清單，每個群組為 [(By, value), ...]，
+                    定位器可帶第三個欄位 nth 指定同名元素中的索引
+            visible: 是否只接受可見元素，預設 True
+            enabled: 是否只接受可用（非 disabled）元素，預設 True
+            cache_slot: 學習快取欄位名稱；指定時優先嘗試此頁面上次勝出的群組，並記錄命中結果
+
+        Returns:
+            tuple: (群組索引, [元素, ...])，找不到時為 (-1, [])
+        """
+        hints = None
+        if cache_slot:
+            keys = [group_key(group) for group in groups]
+            hints = self.selector_cache.hints(cache_slot, keys)
+
+        result = self._find_matches(groups, visible, enabled, find_all=False, hints=hints)
+        if not result or result.get("index", -1) < 0:
+            return (-1, [])
+
+        if cache_slot:
+            self.selector_cache.record_hit(result.get("page", "/"), cache_slot, keys[result["index"]])
+        return (result["index"], list(result["elements"]))
+
+    def find_first_match(self, locators, visible=True, enabled=True, cache_slot=None):
+        """
+        依序評估定位器清單，回傳第一個可見且可用的元素
+
+        Example:
+            button, index = self.find_first_match([
+                (By.ID, "btnSearch"),
+                (By.CSS_SELECTOR, "input[type='submit'][value*='搜']"),
+            ])
+
+        Args:
+            locators: [(By, value), ...] 或 [(By, value, nth), ...]
+            visible: 是否只接受可見元素，預設 True
+            enabled: 是否只接受可用元素，預設 True
+            cache_slot: 學習快取欄位名稱（見 find_first_match_group）
+
+        Returns:
+            tuple: (元素, 定位器索引)，找不到時為 (None, -1)
+        """
+        index, elements = self.find_first_match_group([[loc] for loc in locators], visible, enabled, cache_slot)
+        if index < 0:
+            return (None, -1)
+        return (elements[0], index)
+
+    def find_all_matches(self, locators, visible=True, enabled=True):
+        """
+        依定位器順序回傳所有可見且可用的元素（已去除重複）
+
+        Args:
+            locators: [(By, value), ...]
+            visible: 是否只接受可見元素，預設 True
+            enabled: 是否只接受可用元素，預設 True
+
+        Returns:
+            list: [{"element": 元素, "text": 顯示文字, "index": 定位器索引}, ...]
+        """
+        result = self._find_matches([[loc] for loc in locators], visible, enabled, find_all=True)
+        return list(result) if result else []
+
+    def find_date_inputs(self):
+        """
+        尋找頁面上的日期輸入欄位
+
+        使用多種策略尋找開始日期和結束日期輸入框，所有策略在一次腳本呼叫中評估。
+
+        Returns:
+            tuple: (start_date_input, end_date_input) 或 (None, None) 如果找不到
+        """
+        index, elements = self.find_first_match_group(self.DATE_INPUT_LOCATOR_GROUPS, cache_slot="date_inputs")
+        if index < 0:
+            return (None, None)
+        return (elements[0], elements[1])
 
     def fill_date_range(self, start_date, end_date):
         """
@@ -1002,30 +1955,8 @@ class BaseScraper:
         Returns:
             搜尋按鈕元素或 None
         """
-        # 嘗試多種搜尋按鈕 ID
-        button_ids = ["btnSearch", "btnQuery", "lnkbtnSearch"]
-
-        for button_id in button_ids:
-            try:
-                button = self.driver.find_element(By.ID, button_id)
-                if button and button.is_displayed() and button.is_enabled():
-                    return button
-            except:
-                continue
-
-        # 備用方法: 通用 CSS 選擇器
-        try:
-            buttons = self.driver.find_elements(
-                By.CSS_SELECTOR,
-                "input[type='submit'][value*='搜'], input[type='button'][value*='搜'], button[value*='搜']"
-            )
-            for button in buttons:
-                if button.is_displayed() and button.is_enabled():
-                    return button
-        except:
-            pass
-
-        return None
+        button, _ = self.find_first_match(self.SEARCH_BUTTON_LOCATORS, cache_slot="search_button")
+        return button
 
     def click_search_button(self):
         """
@@ -1047,14 +1978,48 @@ class BaseScraper:
             safe_print("❌ 找不到搜尋按鈕")
             return False
 
+    # ==================== 頁面快照方法 ====================
+
+    def get_page_snapshot(self, force=False):
+        """
+        取得目前頁面（或框架）的原始碼快照
+
+        以瀏覽器端的文件 token 與 DOM 變更計數判斷快取是否仍有效：
+        同一文件且 DOM 未變更時只需一次小型往返，不重新傳輸整份原始碼。
+
+        Args:
+            force: 是否忽略快取強制重新抓取
+
+        Returns:
+            PageSnapshot: 包含 source / url / soup 的快照
+        """
+        cached = self._page_snapshot
+        known = None
+        if cached is not None and not force and cached.epoch == self._snapshot_epoch:
+            known = cached.probe_key()
+
+        data = self.driver.execute_script(SNAPSHOT_PROBE_JS, known) or {}
+        if known is not None and "source" not in data:
+            return cached
+
+        self._page_snapshot = PageSnapshot(
+            data.get("source"), data.get("url"), data.get("token"), data.get("version"), self._snapshot_epoch
+        )
+        return self._page_snapshot
+
+    def invalidate_page_snapshot(self):
+        """捨棄目前快照（重建瀏覽器或切換帳號時呼叫）"""
+        self._snapshot_epoch += 1
+        self._page_snapshot = None
+
     # ==================== 會話管理方法 ====================
     # 以下方法用於處理會話超時和彈窗，在子類中共用
 
     def _check_session_timeout(self):
         """檢查當前頁面是否為會話超時"""
         try:
-            current_url = self.driver.current_url
-            page_source = self.driver.page_source
+            snapshot = self.get_page_snapshot()
+            current_url = snapshot.url
 
             # 檢查 URL 是否包含會話超時相關的訊息
             timeout_indicators = ["MsgCenter.aspx", "系統閒置過久", "請重新登入"]
@@ -1074,7 +2039,7 @@ class BaseScraper:
             # 檢查頁面內容
             timeout_messages = ["系統閒置過久", "請重新登入", "Session timeout", "Session expired", "會話超時"]
 
-            if any(message in page_source for message in timeout_messages):
+            if snapshot.contains_any(timeout_messages):
                 return True
 
             return False
@@ -1114,14 +2079,15 @@ class BaseScraper:
             for login_url in login_urls:
                 try:
                     safe_print(f"   嘗試登入 URL: {login_url}")
-                    self.driver.get(login_url)
+                    self.load_page(login_url)
                     self.smart_wait_for_url_change(timeout=5)
 
-                    current_url = self.driver.current_url
+                    snapshot = self.get_page_snapshot()
+                    current_url = snapshot.url
                     safe_print(f"   導航後 URL: {current_url}")
 
                     # 檢查是否成功到達登入頁面
-                    if "Login.aspx" in current_url or "登入" in self.driver.page_source:
+                    if "Login.aspx" in current_url or "登入" in snapshot.source:
                         safe_print("   ✅ 成功到達登入頁面")
 
                         # 重新執行登入流程
@@ -1162,7 +2128,7 @@ class BaseScraper:
 
                     # 回到首頁
                     old_url = self.driver.current_url
-                    self.driver.get("https://www.takkyubin.com.tw/YMTContract/")
+                    self.load_page("https://www.takkyubin.com.tw/YMTContract/")
                     self.smart_wait_for_url_change(old_url, timeout=5)
 
                     # 再次嘗試登入
@@ -1185,6 +2151,7 @@ class BaseScraper:
         try:
             alert = self.driver.switch_to.alert
             alert_text = alert.text
+            self._last_alert_text = alert_text
             safe_print(f"🔔 檢測到彈窗: {alert_text}")
 
             # 檢查是否為密碼安全相關的嚴重警告
@@ -21,9 +21,10 @@ from selenium.common.exceptions import (
     InvalidSessionIdException,
     NoSuchWindowException,
 )
-from webdriver_manager.chrome import ChromeDriverManager
 
 # 導入 Windows 編碼處理工具
+from .settings import get_settings
+from .errors import BrowserStartupError
 from ..utils.windows_encoding_utils import safe_print
 
 # 追蹤所有建立的臨時 user-data-dir，供清理使用
@@ -138,6 +139,40 @@ def _cleanup_headless_chrome():
         safe_print(f"⚠️ 進程清理時發生錯誤（可忽略）: {e}")
 
 
+def _chromedriver_cache_file():
+    """WebDriver Manager 下載的 ChromeDriver 路徑快取檔"""
+    return get_settings().chromedriver_cache_file
+
+
+def _load_cached_chromedriver_path():
+    """讀取上次 WebDriver Manager 安裝的 ChromeDriver 路徑（檔案不存在或路徑失效時回傳 None）"""
+    try:
+        with open(_chromedriver_cache_file(), "r", encoding="utf-8") as f:
+            path = f.read().strip()
+    except OSError:
+        return None
+    return path if path and os.path.exists(path) else None
+
+
+def _save_cached_chromedriver_path(path):
+    """記錄 WebDriver Manager 安裝的 ChromeDriver 路徑，下次啟動不需再載入 webdriver_manager 查詢版本"""
+    try:
+        cache_file = _chromedriver_cache_file()
+        os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+        with open(cache_file, "w", encoding="utf-8") as f:
+            f.write(path)
+    except OSError:
+        pass
+
+
+def _clear_cached_chromedriver_path():
+    """移除失效的 ChromeDriver 路徑快取"""
+    try:
+        os.remove(_chromedriver_cache_file())
+    except OSError:
+        pass
+
+
 def cleanup_temp_user_data_dirs():
     """清理所有建立的臨時 user-data-dir 目錄"""
     global _temp_user_data_dirs
@@ -150,22 +185,23 @@ def cleanup_temp_user_data_dirs():
     _temp_user_data_dirs.clear()
 
 
-def init_chrome_browser(headless=False, download_dir=None, max_retries=3, retry_delay=2):
+def init_chrome_browser(headless=False, download_dir=None, max_retries=None, retry_delay=2, settings=None):
     """
     初始化 Chrome 瀏覽器（帶重試機制）
 
     Args:
         headless (bool): 是否使用無頭模式
         download_dir (str): 下載目錄路徑
-        max_retries (int): 最大重試次數（預設 3）
+        max_retries (int): 最大重試次數（預設讀取設定 BROWSER_INIT_RETRIES，否則 3）
         retry_delay (int): 基礎重試延遲秒數（實際延遲 = retry_delay * attempt）
+        settings (Settings): 執行設定（預設 get_settings()）
 
     Returns:
         tuple: (driver, wait) WebDriver 實例和 WebDriverWait 實例
 
     重試邏輯：
     - 每次嘗試前：清理殘留 Chrome 進程 + 使用獨立 user-data-dir
-    - 輪次 1：嘗試所有方法（CHROMEDRIVER_PATH → WebDriver Manager → 系統）
+    - 輪次 1：嘗試所有方法（CHROMEDRIVER_PATH → 快取的 ChromeDriver 路徑 → WebDriver Manager → 系統）
     - 輪次 2+：增加等待延遲後重試
     """
     global _temp_user_data_dirs
@@ -177,12 +213,16 @@ def init_chrome_browser(headless=False, download_dir=None, max_retries=3, retry_
     is_windows = sys.platform == "win32"
     is_macos = sys.platform == "darwin"
 
-    # 從環境變數讀取 Chrome 路徑（跨平台設定）
-    chrome_binary_path = os.getenv("CHROME_BINARY_PATH")
+    settings = settings or get_settings()
+    if max_retries is None:
+        max_retries = settings.browser_init_retries
+
+    # 從設定讀取 Chrome 路徑（跨平台設定）
+    chrome_binary_path = settings.chrome_binary_path
 
     # 初始化 Chrome 瀏覽器（帶重試機制）
     # 優先使用 WebDriver Manager 以確保版本相容性
-    chromedriver_path = os.getenv("CHROMEDRIVER_PATH")
+    chromedriver_path = settings.chromedriver_path
     all_errors = []  # 收集所有嘗試的錯誤
 
     for attempt in range(1, max_retries + 1):
@@ -225,6 +265,11 @@ def init_chrome_browser(headless=False, download_dir=None, max_retries=3, retry_
         chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
         chrome_options.add_experimental_option("useAutomationExtension", False)
 
+        # 驗證碼網路擷取：啟用效能日誌，讓驗證碼圖片可透過 CDP Network.getResponseBody 取得原始位元組
+        if settings.captcha_network_capture:
+            chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
         # 設定自動下載權限，避免下載多個檔案時的權限提示
         chrome_options.add_argument("--allow-running-insecure-content")
         chrome_options.add_argument("--disable-web-security")
@@ -306,22 +351,41 @@ def init_chrome_browser(headless=False, download_dir=None, max_retries=3, retry_
                 safe_print(f"⚠️ {error_msg}")
                 attempt_errors.append(error_msg)
 
-        # 方法2: 使用 WebDriver Manager（自動下載匹配版本的 ChromeDriver）
+        # 方法2: 使用上次 WebDriver Manager 安裝的 ChromeDriver（不需載入 webdriver_manager 查詢版本）
+        cached_driver_path = None if driver else _load_cached_chromedriver_path()
+        if cached_driver_path:
+            try:
+                service = Service(cached_driver_path)
+                driver = webdriver.Chrome(service=service, options=chrome_options)
+                safe_print(f"✅ 使用快取的 ChromeDriver 啟動: {cached_driver_path}")
+            except Exception as cache_error:
+                # Chrome 更新後版本可能不再相符，移除快取改由 WebDriver Manager 重新匹配
+                error_msg = f"快取 ChromeDriver: {cache_error}"
+                safe_print(f"⚠️ {error_msg}")
+                attempt_errors.append(error_msg)
+                _clear_cached_chromedriver_path()
+
+        # 方法3: 使用 WebDriver Manager（自動下載匹配版本的 ChromeDriver）
         if not driver:
             try:
-                # 抑制 ChromeDriverManager 的輸出
+                # 只在需要時才載入 webdriver_manager（其依賴套件載入較慢）
                 import logging
+                from webdriver_manager.chrome import ChromeDriverManager
+
+                # 抑制 ChromeDriverManager 的輸出
                 logging.getLogger("WDM").setLevel(logging.WARNING)
 
-                service = Service(ChromeDriverManager().install())
+                driver_path = ChromeDriverManager().install()
+                service = Service(driver_path)
                 driver = webdriver.Chrome(service=service, options=chrome_options)
+                _save_cached_chromedriver_path(driver_path)
                 safe_print("✅ 使用 WebDriver Manager 啟動 Chrome（自動匹配版本）")
             except Exception as wdm_error:
                 error_msg = f"WebDriver Manager: {wdm_error}"
                 safe_print(f"⚠️ {error_msg}")
                 attempt_errors.append(error_msg)
 
-        # 方法3: 最後嘗試使用系統 ChromeDriver（可能有版本不匹配問題）
+        # 方法4: 最後嘗試使用系統 ChromeDriver（可能有版本不匹配問題）
         if not driver:
             try:
                 # 配置 Chrome Service 來隱藏輸出
@@ -343,10 +407,10 @@ def init_chrome_browser(headless=False, download_dir=None, max_retries=3, retry_
         # 如果成功啟動，設定超時並返回 driver 和 wait
         if driver:
             # 設定 WebDriver 超時，防止 Chrome 無限期掛起後崩潰
-            driver.set_page_load_timeout(60)   # 頁面載入超時 60 秒
-            driver.set_script_timeout(30)      # 腳本執行超時 30 秒
+            driver.set_page_load_timeout(settings.browser_page_load_timeout)  # 頁面載入超時（預設 60 秒）
+            driver.set_script_timeout(settings.browser_script_timeout)  # 腳本執行超時（預設 30 秒）
 
-            wait = WebDriverWait(driver, 10)
+            wait = WebDriverWait(driver, settings.browser_wait_timeout)
             safe_print("✅ 瀏覽器初始化完成")
             return driver, wait
 
@@ -437,7 +501,7 @@ def init_chrome_browser(headless=False, download_dir=None, max_retries=3, retry_
             print("   3. 設定 .env 檔案中的路徑")
 
         error_msg = f"❌ 所有 Chrome 啟動方法都失敗了（共嘗試 {max_retries} 輪）！請檢查 Chrome 安裝或環境設定"
-        raise RuntimeError(error_msg)
+        raise BrowserStartupError(error_msg)
 
 
 def check_browser_health(driver):
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+驗證碼語料收集 - 保存登入時 OCR 看到的驗證碼圖片，並依登入結果自動標註
+
+設定 CAPTCHA_CORPUS_DIR 後啟用，目錄結構：
+    labelled/<答案>_<id>.png     登入成功（伺服器接受 OCR 結果即為正確答案）
+    unlabelled/<id>.png          驗證碼錯誤或結果未知，待人工標註
+    index.jsonl                  每張圖片的 OCR 結果、耗時與登入結果
+"""
+
+import os
+import json
+import uuid
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .settings import get_settings
+from ..utils.windows_encoding_utils import safe_print
+
+LABELLED_DIR = "labelled"
+UNLABELLED_DIR = "unlabelled"
+INDEX_FILE = "index.jsonl"
+
+
+def label_from_filename(path):
+    """從已標註檔名（<答案>_<id>.png）取出答案"""
+    stem = Path(path).stem
+    return stem.rsplit("_", 1)[0] if "_" in stem else None
+
+
+class CaptchaCorpus:
+    """驗證碼語料收集器"""
+
+    def __init__(self, root=None):
+        """
+        初始化語料收集器
+
+        Args:
+            root: 語料根目錄（預設讀取 CAPTCHA_CORPUS_DIR，未設定時停用）
+        """
+        root = root or get_settings().captcha_corpus_dir
+        self.root = Path(root) if root else None
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def is_enabled(self):
+        """是否啟用語料收集"""
+        return self.root is not None
+
+    def record(self, image_bytes, prediction, ocr_ms=None):
+        """
+        保存一張驗證碼圖片，等待登入結果決定標註
+
+        Args:
+            image_bytes: 驗證碼 PNG 位元組
+            prediction: OCR 識別結果
+            ocr_ms: OCR 耗時（毫秒）
+        """
+        if not self.is_enabled() or not image_bytes:
+            return
+        sample_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        try:
+            unlabelled = self.root / UNLABELLED_DIR
+            unlabelled.mkdir(parents=True, exist_ok=True)
+            path = unlabelled / f"{sample_id}.png"
+            path.write_bytes(image_bytes)
+        except Exception as e:
+            safe_print(f"⚠️ 驗證碼語料保存失敗: {e}")
+            return
+        with self._lock:
+            self._pending.append(
+                {"id": sample_id, "file": str(path), "prediction": prediction or "", "ocr_ms": ocr_ms}
+            )
+
+    def resolve(self, outcome):
+        """
+        依登入結果標註尚未決定的圖片
+
+        Args:
+            outcome: "accepted"（登入成功）/ "rejected"（驗證碼錯誤）/ "unknown"（其他失敗）
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        for sample in pending:
+            sample.update({"outcome": outcome, "label": None, "timestamp": datetime.now().isoformat(timespec="seconds")})
+            # 只有最後一張（實際提交的）圖片能由登入成功推得答案
+            if outcome == "accepted" and sample is pending[-1] and sample["prediction"]:
+                try:
+                    labelled = self.root / LABELLED_DIR
+                    labelled.mkdir(parents=True, exist_ok=True)
+                    target = labelled / f"{sample['prediction']}_{sample['id']}.png"
+                    os.replace(sample["file"], target)
+                    sample.update({"file": str(target), "label": sample["prediction"]})
+                except Exception as e:
+                    safe_print(f"⚠️ 驗證碼語料標註失敗: {e}")
+            self._append_index(sample)
+
+    def _append_index(self, sample):
+        """寫入語料索引"""
+        try:
+            with open(self.root / INDEX_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+        except Exception as e:
+            safe_print(f"⚠️ 驗證碼語料索引寫入失敗: {e}")
+
+    def labelled_samples(self):
+        """
+        列出已標註的樣本
+
+        Returns:
+            list: [(圖片路徑, 答案), ...]
+        """
+        if not self.is_enabled():
+            return []
+        labelled = self.root / LABELLED_DIR
+        if not labelled.exists():
+            return []
+        return [(path, label_from_filename(path)) for path in sorted(labelled.glob("*.png")) if label_from_filename(path)]
+
+    def unlabelled_samples(self):
+        """列出待人工標註的圖片路徑"""
+        if not self.is_enabled():
+            return []
+        unlabelled = self.root / UNLABELLED_DIR
+        return sorted(unlabelled.glob("*.png")) if unlabelled.exists() else []
+
+    def apply_label(self, path, label):
+        """人工標註：將待標註圖片移到 labelled/<答案>_<id>.png"""
+        path = Path(path)
+        labelled = self.root / LABELLED_DIR
+        labelled.mkdir(parents=True, exist_ok=True)
+        target = labelled / f"{label}_{path.stem}.png"
+        os.replace(path, target)
+        return target
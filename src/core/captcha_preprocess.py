@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+驗證碼前處理管線與識別器
+
+以 numpy / Pillow 向量化實作的前處理步驟（灰階、自適應二值化、雜訊線移除、裁切），
+搭配 ddddocr 字元集範圍限制；CaptchaSolver 依設定組合各步驟並統計首次登入成功率，
+用來衡量各設定減少的登入重試次數。CaptchaEnsemble 以多個模型 / 前處理變體平行識別
+並投票，提供提交前可用的信心分數。
+"""
+
+import io
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from .settings import get_settings
+
+
+# ==================== 前處理步驟 ====================
+
+
+def to_grayscale(image):
+    """轉為灰階（uint8 二維陣列）"""
+    if image.ndim == 2:
+        return image
+    rgb = image[..., :3].astype(np.float32)
+    return (rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)).astype(np.uint8)
+
+
+def adaptive_threshold(image, block=15, offset=10):
+    """
+    自適應二值化：以積分影像計算每個像素周圍 block×block 的平均值，
+    比平均暗 offset 以上的像素視為字元（0），其餘為背景（255）
+    """
+    gray = to_grayscale(image)
+    block = block | 1  # 區塊邊長必須為奇數
+    pad = block // 2
+    height, width = gray.shape
+
+    padded = np.pad(gray.astype(np.float64), pad, mode="edge")
+    integral = np.pad(padded.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+    window_sum = (
+        integral[block : block + height, block : block + width]
+        - integral[0:height, block : block + width]
+        - integral[block : block + height, 0:width]
+        + integral[0:height, 0:width]
+    )
+    mean = window_sum / (block * block)
+    return np.where(gray < mean - offset, 0, 255).astype(np.uint8)
+
+
+def remove_noise_lines(image, min_neighbors=3):
+    """移除干擾線與雜點：8 鄰域中深色鄰居少於 min_neighbors 的深色像素改為背景"""
+    gray = to_grayscale(image)
+    dark = (gray < 128).astype(np.uint8)
+    height, width = dark.shape
+    padded = np.pad(dark, 1)
+    neighbors = sum(
+        padded[1 + dy : 1 + dy + height, 1 + dx : 1 + dx + width]
+        for dy in (-1, 0, 1)
+        for dx in (-1, 0, 1)
+        if (dy, dx) != (0, 0)
+    )
+    keep = (dark == 1) & (neighbors >= min_neighbors)
+    return np.where(keep, 0, 255).astype(np.uint8)
+
+
+def crop_to_content(image, margin=2):
+    """裁切到深色內容的外框（保留 margin 像素邊界）"""
+    gray = to_grayscale(image)
+    dark = gray < 128
+    rows = np.flatnonzero(dark.any(axis=1))
+    cols = np.flatnonzero(dark.any(axis=0))
+    if rows.size == 0 or cols.size == 0:
+        return gray
+    top, bottom = max(rows[0] - margin, 0), min(rows[-1] + margin + 1, gray.shape[0])
+    left, right = max(cols[0] - margin, 0), min(cols[-1] + margin + 1, gray.shape[1])
+    return gray[top:bottom, left:right]
+
+
+PREPROCESS_STAGES = {
+    "grayscale": to_grayscale,
+    "threshold": adaptive_threshold,
+    "denoise": remove_noise_lines,
+    "crop": crop_to_content,
+}
+
+
+def preprocess(image_bytes, stages):
+    """
+    依序套用前處理步驟
+
+    Args:
+        image_bytes: 原始驗證碼圖片位元組
+        stages: 步驟名稱清單（見 PREPROCESS_STAGES）
+
+    Returns:
+        bytes: 處理後的 PNG 位元組（沒有步驟時回傳原始位元組）
+    """
+    if not stages:
+        return image_bytes
+    image = np.asarray(Image.open(io.BytesIO(image_bytes)).convert("RGB"))
+    for stage in stages:
+        image = PREPROCESS_STAGES[stage](image)
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def decode_probability(result):
+    """將 classification(probability=True) 的輸出以 CTC 貪婪解碼為字串（空白類別為 ""）"""
+    charsets = result["charsets"]
+    best = np.asarray(result["probability"]).argmax(axis=1)
+    chars = []
+    last = None
+    for index in best:
+        if index != last and charsets[index] != "":
+            chars.append(charsets[index])
+        last = index
+    return "".join(chars)
+
+
+def vote(candidates):
+    """
+    多個識別結果投票
+
+    過半數結果完全相同時直接採用；否則取最常見長度的結果逐字元投票（同票時以第一個候選為準）。
+
+    Args:
+        candidates: 識別結果清單，第一個為主要模型的結果（無法識別時為 None 或空字串）
+
+    Returns:
+        tuple: (投票結果, 信心分數 0-1)
+    """
+    readable = [c for c in candidates if c]
+    if not readable:
+        return "", 0.0
+    total = len(candidates)
+
+    text, count = Counter(readable).most_common(1)[0]
+    if count * 2 > total:
+        return text, count / total
+
+    lengths = Counter(len(c) for c in readable)
+    primary_length = len(readable[0])
+    length = max(lengths, key=lambda n: (lengths[n], n == primary_length))
+    same_length = [c for c in readable if len(c) == length]
+
+    chars = []
+    agreement = []
+    for position in range(length):
+        column = Counter(c[position] for c in same_length)
+        best = max(column.values())
+        # 同票時以排在前面的候選（主要模型優先）為準
+        chars.append(next(c[position] for c in same_length if column[c[position]] == best))
+        agreement.append(best / total)
+    return "".join(chars), sum(agreement) / length
+
+
+# ==================== 識別器 ====================
+
+
+class CaptchaSolver:
+    """前處理 + ddddocr 識別器，統計識別耗時與首次登入成功率"""
+
+    def __init__(self, stages=None, ranges=None, beta=False, ocr=None):
+        """
+        初始化識別器
+
+        Args:
+            stages: 前處理步驟名稱清單，None 或空清單表示直接識別原圖
+            ranges: ddddocr set_ranges 參數（整數代碼或字元集字串），None 表示不限制
+            beta: 是否使用 ddddocr beta 模型
+            ocr: 既有的 ddddocr 實例（未提供時自行建立）
+        """
+        unknown = [stage for stage in (stages or []) if stage not in PREPROCESS_STAGES]
+        if unknown:
+            raise ValueError(f"未知的驗證碼前處理步驟: {', '.join(unknown)}")
+
+        self.stages = list(stages or [])
+        self.ranges = ranges
+        self.beta = beta
+        if ocr is None:
+            import ddddocr
+
+            ocr = ddddocr.DdddOcr(show_ad=False, beta=beta)
+        self.ocr = ocr
+        if ranges is not None:
+            self.ocr.set_ranges(ranges)
+
+        self.stats = {"solves": 0, "total_ms": 0.0, "logins": 0, "first_try_logins": 0, "refreshes": 0}
+
+    @classmethod
+    def from_env(cls, settings=None):
+        """
+        依執行設定建立識別器（settings 未提供時為 get_settings()）
+
+        CAPTCHA_PREPROCESS: 前處理步驟，逗號分隔（例如 grayscale,threshold,denoise,crop）
+        CAPTCHA_OCR_RANGES: ddddocr 字元集範圍（0-7 的代碼或字元集字串）
+        CAPTCHA_OCR_BETA: 是否使用 beta 模型（true / false）
+        """
+        settings = settings or get_settings()
+        return cls(
+            stages=list(settings.captcha_preprocess), ranges=settings.captcha_ocr_ranges, beta=settings.captcha_ocr_beta
+        )
+
+    def describe(self):
+        """設定摘要（用於日誌與報告）"""
+        parts = ["beta" if self.beta else "default"]
+        if self.stages:
+            parts.append("+".join(self.stages))
+        if self.ranges is not None:
+            parts.append(f"ranges={self.ranges}")
+        return " | ".join(parts)
+
+    def classify(self, image_bytes):
+        """前處理並識別，不更新統計（供基準測試使用）"""
+        image = preprocess(image_bytes, self.stages)
+        if self.ranges is None:
+            return self.ocr.classification(image)
+        return decode_probability(self.ocr.classification(image, probability=True))
+
+    def solve(self, image_bytes):
+        """
+        識別驗證碼並累計耗時
+
+        Returns:
+            tuple: (識別結果, 耗時毫秒)
+        """
+        started = time.perf_counter()
+        result = self.classify(image_bytes)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats["solves"] += 1
+        self.stats["total_ms"] += elapsed_ms
+        return result, elapsed_ms
+
+    def is_confident(self):
+        """上次識別結果是否足夠可信（單一模型沒有信心分數，一律視為可信）"""
+        return True
+
+    def record_refresh(self):
+        """記錄一次因識別信心不足而在提交前刷新驗證碼"""
+        self.stats["refreshes"] += 1
+
+    def record_login(self, first_try):
+        """記錄一次成功登入是否為首次嘗試即成功"""
+        self.stats["logins"] += 1
+        self.stats["first_try_logins"] += bool(first_try)
+
+    def close(self):
+        """釋放識別器資源（本機識別器無需處理）"""
+
+    def get_stats(self):
+        """識別統計：設定、平均耗時、首次登入成功率與重試率"""
+        solves, logins = self.stats["solves"], self.stats["logins"]
+        first_try_rate = self.stats["first_try_logins"] / logins if logins else None
+        return {
+            "config": self.describe(),
+            "solves": solves,
+            "mean_ms": round(self.stats["total_ms"] / solves, 1) if solves else None,
+            "first_try_rate": round(first_try_rate, 3) if first_try_rate is not None else None,
+            "retry_rate": round(1 - first_try_rate, 3) if first_try_rate is not None else None,
+        }
+
+
+class CaptchaEnsemble(CaptchaSolver):
+    """
+    多模型投票識別器：在執行緒池中平行執行多個 CaptchaSolver 並投票
+
+    信心分數低於 min_confidence 時 is_confident() 回傳 False，呼叫端可在提交前刷新驗證碼；
+    統計額外推論耗時（整體耗時減去主要模型耗時）與投票修正主要模型結果的次數，
+    用來與避免的登入重試成本比較。
+    """
+
+    # 主要模型未使用前處理時，額外加入的前處理變體
+    CLEAN_STAGES = ["grayscale", "threshold", "denoise", "crop"]
+
+    def __init__(self, members, min_confidence=0.67):
+        """
+        初始化投票識別器
+
+        Args:
+            members: CaptchaSolver 清單，第一個為主要模型（同票時優先）
+            min_confidence: 最低信心分數，低於此值視為不可信
+        """
+        if not members:
+            raise ValueError("投票識別器至少需要一個識別器")
+        self.members = list(members)
+        primary = self.members[0]
+        self.stages, self.ranges, self.beta, self.ocr = primary.stages, primary.ranges, primary.beta, primary.ocr
+        self.min_confidence = min_confidence
+        self.last_vote = None
+        self.stats = {
+            "solves": 0,
+            "total_ms": 0.0,
+            "logins": 0,
+            "first_try_logins": 0,
+            "primary_ms": 0.0,
+            "disagreements": 0,
+            "overrides": 0,
+            "low_confidence": 0,
+            "refreshes": 0,
+        }
+
+    @classmethod
+    def from_env(cls, settings=None):
+        """
+        依執行設定建立投票識別器：主要模型（CAPTCHA_PREPROCESS 等設定）+ 另一個模型 + 前處理變體
+
+        CAPTCHA_ENSEMBLE_MIN_CONFIDENCE: 最低信心分數（預設 0.67）
+        """
+        settings = settings or get_settings()
+        return cls.from_primary(
+            CaptchaSolver.from_env(settings), min_confidence=settings.captcha_ensemble_min_confidence
+        )
+
+    @classmethod
+    def from_primary(cls, primary, min_confidence=0.67):
+        """以主要識別器為基礎，加入另一個模型（default / beta 互換）與前處理變體"""
+        other_model = CaptchaSolver(stages=primary.stages, ranges=primary.ranges, beta=not primary.beta)
+        # 前處理變體與主要模型共用同一個 ddddocr 實例（onnxruntime 推論可跨執行緒共用）
+        variant_stages = [] if primary.stages else cls.CLEAN_STAGES
+        variant = CaptchaSolver(stages=variant_stages, ranges=primary.ranges, beta=primary.beta, ocr=primary.ocr)
+        return cls([primary, other_model, variant], min_confidence=min_confidence)
+
+    def describe(self):
+        """設定摘要（用於日誌與報告）"""
+        return "ensemble(" + ", ".join(member.describe() for member in self.members) + ")"
+
+    def _timed_classify(self, member, image_bytes):
+        """單一識別器識別並計時（識別失敗視為無結果）"""
+        started = time.perf_counter()
+        try:
+            result = member.classify(image_bytes)
+        except Exception:
+            result = None
+        return result, (time.perf_counter() - started) * 1000
+
+    def classify(self, image_bytes):
+        """平行識別並投票，結果與各候選記錄於 last_vote"""
+        with ThreadPoolExecutor(max_workers=len(self.members), thread_name_prefix="captcha-ocr") as pool:
+            outputs = list(pool.map(lambda member: self._timed_classify(member, image_bytes), self.members))
+
+        candidates = [result for result, _ in outputs]
+        text, confidence = vote(candidates)
+        self.last_vote = {
+            "text": text,
+            "confidence": round(confidence, 3),
+            "candidates": candidates,
+            "primary": candidates[0],
+            "primary_ms": outputs[0][1],
+        }
+        return text or None
+
+    def solve(self, image_bytes):
+        """識別驗證碼並累計耗時、意見分歧與修正次數"""
+        result, elapsed_ms = super().solve(image_bytes)
+        vote_info = self.last_vote
+        self.stats["primary_ms"] += vote_info["primary_ms"]
+        if len(set(vote_info["candidates"])) > 1:
+            self.stats["disagreements"] += 1
+        if vote_info["text"] != (vote_info["primary"] or ""):
+            self.stats["overrides"] += 1
+        if not self.is_confident():
+            self.stats["low_confidence"] += 1
+        return result, elapsed_ms
+
+    def is_confident(self):
+        """上次投票的信心分數是否達到 min_confidence"""
+        return bool(self.last_vote and self.last_vote["text"] and self.last_vote["confidence"] >= self.min_confidence)
+
+    def get_stats(self):
+        """識別統計：另含額外推論耗時、意見分歧、修正與提交前刷新次數"""
+        stats = super().get_stats()
+        stats.update(
+            {
+                "extra_ms_total": round(self.stats["total_ms"] - self.stats["primary_ms"], 1),
+                "disagreements": self.stats["disagreements"],
+                "overrides": self.stats["overrides"],
+                "low_confidence": self.stats["low_confidence"],
+                "pre_submit_refreshes": self.stats["refreshes"],
+            }
+        )
+        return stats
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+網站斷路器與全域重試預算 - 網站停機或維護時，限制多帳號執行浪費在重試上的時間
+
+跨帳號連續發生 N 次網站層級失敗（網站無法連線、頁面載入逾時）時斷路器跳開：
+之後每個帳號開始前先以輕量 HTTP 請求探測登入頁，恢復才繼續，
+否則暫停冷卻後再探測，超過暫停次數即中止執行（未處理的帳號不寫入執行日誌，可 --resume 續跑）。
+整次執行的帳號重試次數另有全域上限，失敗成本有固定上界。
+"""
+
+import time
+
+from .errors import SiteUnavailable
+from .preflight import SiteProbe, describe
+from .settings import get_settings
+from ..utils.windows_encoding_utils import safe_print
+
+
+# 視為網站層級的失敗（error_type）：登入失敗多半是帳密或驗證碼問題，不計入；
+# 登入頁本身載入失敗時由 load_page 拋出 PageLoadTimeout，已屬於 SiteUnavailable
+SITE_LEVEL_ERROR_TYPES = frozenset({SiteUnavailable.error_type})
+
+CLOSED = "closed"
+OPEN = "open"
+
+
+class CircuitBreaker:
+    """多帳號執行的網站斷路器"""
+
+    def __init__(
+        self,
+        probe_url,
+        failure_threshold=3,
+        cooldown=120,
+        max_pauses=2,
+        retry_budget=10,
+        probe_timeout=10,
+    ):
+        """
+        Args:
+            probe_url: 探測用的 URL（登入頁）
+            failure_threshold: 跨帳號連續幾次網站層級失敗後跳開
+            cooldown: 探測失敗後暫停的秒數
+            max_pauses: 最多暫停幾次，之後中止執行
+            retry_budget: 整次執行允許的帳號重試總次數
+            probe_timeout: 探測請求逾時秒數
+        """
+        self.site_probe = SiteProbe(probe_url, timeout=probe_timeout)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_pauses = max_pauses
+        self.retry_budget = retry_budget
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.pauses = 0
+        self.probes = 0
+        self.retries_used = 0
+        self.retries_denied = 0
+        self.budget_exhausted = False
+        self.aborted = False
+
+    @classmethod
+    def from_settings(cls, probe_url, settings=None):
+        """依設定（CIRCUIT_* / RUN_RETRY_BUDGET）建立斷路器"""
+        settings = settings or get_settings()
+        return cls(
+            probe_url,
+            failure_threshold=settings.circuit_failure_threshold,
+            cooldown=settings.circuit_cooldown,
+            max_pauses=settings.circuit_max_pauses,
+            retry_budget=settings.run_retry_budget,
+            probe_timeout=settings.circuit_probe_timeout,
+        )
+
+    @property
+    def is_open(self):
+        return self.state == OPEN
+
+    # ==================== 記錄結果 ====================
+
+    def record_success(self):
+        """帳號成功（網站可用），連續失敗歸零"""
+        self.consecutive_failures = 0
+        self.state = CLOSED
+
+    def record_failure(self, error_type):
+        """記錄一次失敗（帳號結果或重試前的錯誤），只有網站層級的失敗會累計"""
+        if error_type not in SITE_LEVEL_ERROR_TYPES:
+            return
+        self.consecutive_failures += 1
+        if self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self.state = OPEN
+            self.trips += 1
+            safe_print(f"🔌 連續 {self.consecutive_failures} 次網站層級失敗，斷路器跳開（後續帳號開始前先探測網站）")
+
+    def allow_retry(self):
+        """是否允許再重試一次帳號（斷路器跳開或全域重試預算用盡時不重試）"""
+        if self.is_open:
+            self.retries_denied += 1
+            return False
+        if self.retries_used >= self.retry_budget:
+            if not self.budget_exhausted:
+                self.budget_exhausted = True
+                safe_print(f"🪫 全域重試預算（{self.retry_budget} 次）已用盡，之後的失敗不再重試")
+            self.retries_denied += 1
+            return False
+        self.retries_used += 1
+        return True
+
+    # ==================== 探測 ====================
+
+    def trip(self, reason):
+        """直接跳開斷路器（例如啟動前探測失敗）"""
+        if self.state == CLOSED:
+            self.state = OPEN
+            self.trips += 1
+            safe_print(f"🔌 {reason}，斷路器跳開")
+
+    def probe(self):
+        """
+        以 HTTP GET 探測登入頁（重用啟動前探測保留的連線）
+
+        Returns:
+            tuple: (是否可用, 說明)
+        """
+        self.probes += 1
+        result = self.site_probe.probe()
+        return result["ok"], describe(result)
+
+    def wait_until_available(self):
+        """
+        帳號開始前呼叫：斷路器關閉時直接通過；跳開時探測網站，失敗則暫停冷卻後再探測
+
+        Returns:
+            bool: 網站可用時為 True；暫停次數用盡時為 False（應中止執行）
+        """
+        if not self.is_open:
+            return True
+        if self.aborted:
+            return False
+
+        while True:
+            available, detail = self.probe()
+            if available:
+                safe_print(f"🔌 網站探測成功（{detail}），斷路器關閉，繼續執行")
+                self.state = CLOSED
+                self.consecutive_failures = 0
+                return True
+            if self.pauses >= self.max_pauses:
+                safe_print(f"⛔ 網站探測失敗（{detail}），已暫停 {self.pauses} 次，中止執行")
+                self.aborted = True
+                return False
+            self.pauses += 1
+            safe_print(
+                f"⏸️ 網站探測失敗（{detail}），暫停 {self.cooldown} 秒後再探測（{self.pauses}/{self.max_pauses}）"
+            )
+            time.sleep(self.cooldown)
+
+    def summary(self):
+        """寫入報告的統計"""
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "pauses": self.pauses,
+            "probes": self.probes,
+            "retries_used": self.retries_used,
+            "retry_budget": self.retry_budget,
+            "retries_denied": self.retries_denied,
+            "aborted": self.aborted,
+        }
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+抓取錯誤分類 - BaseScraper / browser_utils 拋出的型別化例外，以及各類別的重試與退避策略
+
+MultiAccountManager 依例外類別決定是否重試、等待多久、是否重建共享瀏覽器，
+不再比對錯誤訊息字串；第三方例外（Selenium、urllib3、連線錯誤）由 classify_exception() 依型別對應。
+Selenium 的 TimeoutException 不直接對應：元素等待逾時多半是頁面結構問題，只有頁面載入逾時
+（由 load_page 轉為 PageLoadTimeout）才視為網站無法連線。
+"""
+
+import http.client
+
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchWindowException,
+    SessionNotCreatedException,
+    WebDriverException,
+)
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+
+class ScraperError(Exception):
+    """抓取錯誤基底類別（預設不可重試）"""
+
+    # 重試策略：是否可重試、最多重試次數、每次重試的線性退避秒數、重試前是否重建共享瀏覽器
+    retryable = False
+    max_retries = 0
+    backoff_seconds = 0
+    rebuild_browser = False
+    # 訊息用的分類名稱與圖示，error_type 寫入帳號結果供報告分類
+    label = "流程執行失敗"
+    icon = "💥"
+    error_type = "failed"
+
+    def __init__(self, message=None):
+        super().__init__(message or self.label)
+
+    def retry_delay(self, retry):
+        """第 retry 次（從 0 起算）重試前的等待秒數"""
+        return self.backoff_seconds * (retry + 1)
+
+
+class BrowserCrash(ScraperError):
+    """瀏覽器或 ChromeDriver 失效（session 遺失、視窗關閉、連線中斷）"""
+
+    retryable = True
+    max_retries = 2
+    backoff_seconds = 5
+    rebuild_browser = True
+    label = "瀏覽器崩潰"
+    icon = "💀"
+    error_type = "browser_crash"
+
+
+class BrowserStartupError(BrowserCrash, RuntimeError):
+    """所有 Chrome 啟動方法都失敗（通常是資源不足，等久一點再試）"""
+
+    backoff_seconds = 8
+    rebuild_browser = False
+    label = "Chrome 啟動失敗"
+    error_type = "browser_startup"
+
+
+class SiteUnavailable(ScraperError):
+    """網站無法連線或回應逾時（瀏覽器本身正常，不需要重建）"""
+
+    retryable = True
+    max_retries = 2
+    backoff_seconds = 10
+    label = "網站無法連線"
+    icon = "🌐"
+    error_type = "site_unavailable"
+
+
+class PageLoadTimeout(SiteUnavailable):
+    """頁面載入逾時（BaseScraper.load_page 轉換；一般元素等待逾時不屬於此類）"""
+
+    label = "頁面載入逾時"
+
+
+class LoginRejected(ScraperError):
+    """登入失敗（帳密或驗證碼在登入流程內已重試過，不再重做整個帳號）"""
+
+    label = "登入失敗"
+    icon = "❌"
+    error_type = "login_rejected"
+
+
+class SecurityWarning(ScraperError):
+    """網站要求變更密碼的安全警告（需人工處理）"""
+
+    label = "密碼安全警告"
+    icon = "🚨"
+    error_type = "security_warning"
+
+
+class NoData(ScraperError):
+    """沒有可下載的資料（視為成功，不重試）"""
+
+    label = "無資料可下載"
+    icon = "ℹ️"
+    error_type = "no_data"
+
+
+# 第三方例外型別 → 錯誤類別（依例外的 MRO 由近到遠查表）
+_EXCEPTION_CLASSES = {
+    InvalidSessionIdException: BrowserCrash,
+    NoSuchWindowException: BrowserCrash,
+    SessionNotCreatedException: BrowserStartupError,
+    # Selenium 透過 HTTP 與 ChromeDriver 溝通，連線層錯誤代表 ChromeDriver 已失效
+    MaxRetryError: BrowserCrash,
+    NewConnectionError: BrowserCrash,
+    ProtocolError: BrowserCrash,
+    http.client.RemoteDisconnected: BrowserCrash,
+    ConnectionError: BrowserCrash,
+}
+
+# WebDriverException 沒有細分子類別的情況，依 Chrome 回報的錯誤代碼分類
+_WEBDRIVER_MESSAGES = (
+    ("chrome not reachable", BrowserCrash),
+    ("no such session", BrowserCrash),
+    ("session deleted", BrowserCrash),
+    ("tab crashed", BrowserCrash),
+    ("net::ERR_", SiteUnavailable),
+)
+
+
+def classify_exception(error):
+    """
+    將例外分類為 ScraperError
+
+    Args:
+        error: 任意例外
+
+    Returns:
+        ScraperError: ScraperError 原樣回傳；其他例外包成對應類別（無法分類時為不可重試的 ScraperError），
+            原例外保存在 __cause__
+    """
+    if isinstance(error, ScraperError):
+        return error
+
+    error_class = None
+    for klass in type(error).__mro__:
+        error_class = _EXCEPTION_CLASSES.get(klass)
+        if error_class:
+            break
+    if error_class is None and isinstance(error, WebDriverException):
+        message = error.msg or ""
+        error_class = next((cls for text, cls in _WEBDRIVER_MESSAGES if text in message), None)
+    if error_class is None and error.__cause__ is not None and error.__cause__ is not error:
+        return classify_exception(error.__cause__)
+
+    classified = (error_class or ScraperError)(str(error))
+    classified.__cause__ = error
+    return classified
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+步驟延遲歷史與自適應逾時 - 跨執行記錄每個步驟的實際耗時，由高百分位數推算等待逾時
+
+逾時 = p99 × 倍數，限制在下限與程式原本的固定逾時之間：平常幾秒內完成的等待，
+頁面失效時也只會等幾秒；網站偏慢但正常時 p99 跟著升高，逾時也隨之放寬，最多回到原本的固定值。
+樣本數不足時沿用固定逾時。
+"""
+
+import os
+import json
+import math
+import atexit
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .settings import get_settings
+from ..utils.windows_encoding_utils import safe_print
+
+
+def percentile(samples, q):
+    """最近秩百分位數（samples 不可為空）"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class LatencyHistory:
+    """各步驟耗時的滑動視窗（JSON 檔案持久化）"""
+
+    def __init__(self, path=None, window=200, min_samples=20, factor=3.0, floor=5.0, enabled=True):
+        """
+        初始化延遲歷史
+
+        Args:
+            path: 歷史檔案路徑（預設讀取 LATENCY_HISTORY_FILE，否則 cache/latency_history.json）
+            window: 每個步驟保留的最近樣本數
+            min_samples: 樣本數達到此值才推算逾時
+            factor: p99 的倍數
+            floor: 推算逾時的下限（秒）
+            enabled: False 時一律回傳固定逾時（仍會記錄樣本）
+        """
+        self.path = Path(path or get_settings().latency_history_file)
+        self.window = window
+        self.min_samples = min_samples
+        self.factor = factor
+        self.floor = floor
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._samples = self._load()
+
+    def _load(self):
+        """讀取歷史檔案，檔案不存在或損毀時從空歷史開始"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                samples = json.load(f).get("steps", {})
+            return {key: list(values)[-self.window :] for key, values in samples.items()} if isinstance(samples, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            safe_print(f"⚠️ 步驟延遲歷史讀取失敗，將重新累積: {e}")
+            return {}
+
+    def record(self, key, seconds):
+        """記錄一次步驟耗時"""
+        with self._lock:
+            samples = self._samples.setdefault(key, [])
+            samples.append(round(seconds, 3))
+            if len(samples) > self.window:
+                del samples[: len(samples) - self.window]
+            self._dirty = True
+
+    def observe_record(self, record):
+        """
+        StepRecorder 監聽回呼：記錄每個 span 的耗時（鍵為 scraper.步驟）
+
+        逾時失敗的 span 也一併記錄：它們是實際耗時的下限，網站變慢時會把 p99 推高、放寬下次的逾時；
+        拋出例外的 span 不記錄。
+        """
+        if record["type"] != "span" or record["outcome"] == "error":
+            return
+        self.record(f"{record['scraper']}.{record['name']}", record["duration_ms"] / 1000)
+
+    def timeout_for(self, key, default, fallback=None):
+        """
+        推算步驟逾時
+
+        Args:
+            key: 步驟鍵（scraper.步驟）
+            default: 程式原本的固定逾時（同時作為上限）
+            fallback: 停用或樣本不足時回傳的逾時（預設為 default）
+
+        Returns:
+            float: 逾時秒數
+        """
+        fallback = default if fallback is None else fallback
+        if not self.enabled:
+            return fallback
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return fallback
+        return round(min(default, max(self.floor, percentile(samples, 99) * self.factor)), 1)
+
+    def stats(self, key):
+        """步驟的樣本統計（樣本數、p50、p99）"""
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+        if not samples:
+            return {"samples": 0}
+        return {"samples": len(samples), "p50": percentile(samples, 50), "p99": percentile(samples, 99)}
+
+    def flush(self):
+        """將變更寫回歷史檔案（無變更時不寫入）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(
+                        {
+                            "version": 1,
+                            "updated_at": datetime.now().isoformat(timespec="seconds"),
+                            "steps": self._samples,
+                        },
+                        f,
+                        ensure_ascii=False,
+                    )
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except Exception as e:
+                safe_print(f"⚠️ 步驟延遲歷史寫入失敗: {e}")
+
+
+_history_instance = None
+_history_lock = threading.Lock()
+
+
+def get_latency_history():
+    """取得程序內共用的 LatencyHistory（首次呼叫時載入並註冊結束時寫回）"""
+    global _history_instance
+    with _history_lock:
+        if _history_instance is None:
+            settings = get_settings()
+            _history_instance = LatencyHistory(
+                window=settings.adaptive_timeout_window,
+                min_samples=settings.adaptive_timeout_min_samples,
+                factor=settings.adaptive_timeout_factor,
+                floor=settings.adaptive_timeout_floor,
+                enabled=settings.adaptive_timeouts,
+            )
+            atexit.register(_history_instance.flush)
+        return _history_instance
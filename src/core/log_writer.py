@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+非同步日誌寫入器 - 由背景執行緒以區塊緩衝寫入日誌檔
+
+主執行緒只把文字放入佇列（不碰磁碟），背景執行緒批次寫入並定期 flush；
+程序結束、發生例外或呼叫 flush(wait=True) 時確保內容落地。
+"""
+
+import time
+import queue
+import atexit
+import threading
+
+from .settings import get_settings
+
+_STOP = object()
+
+
+class AsyncLogWriter:
+    """背景執行緒日誌寫入器"""
+
+    def __init__(self, path, flush_interval=None, buffer_size=64 * 1024):
+        """
+        初始化日誌寫入器並啟動背景執行緒
+
+        Args:
+            path: 日誌檔路徑
+            flush_interval: 定期 flush 的間隔秒數（預設讀取 LOG_FLUSH_INTERVAL，否則 2 秒）
+            buffer_size: 檔案緩衝區大小（位元組）
+        """
+        if flush_interval is None:
+            flush_interval = get_settings().log_flush_interval
+        self.path = path
+        self.flush_interval = flush_interval
+        self._fh = open(path, "w", encoding="utf-8", buffering=buffer_size)
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, data):
+        """將文字放入寫入佇列（不阻塞呼叫端）"""
+        if data and not self._closed:
+            self._queue.put(data)
+
+    def flush(self, wait=True, timeout=5):
+        """
+        要求背景執行緒 flush 日誌檔
+
+        Args:
+            wait: 是否等待佇列中先前的內容全部寫入並 flush 完成
+            timeout: 最長等待秒數
+        """
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        if wait:
+            done.wait(timeout)
+
+    def close(self, timeout=5):
+        """寫完佇列中所有內容後關閉日誌檔（可重複呼叫）"""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        """背景執行緒：批次寫入佇列內容，未 flush 的內容最多保留 flush_interval 秒（持續輸出時亦同），收到要求時立即 flush"""
+        dirty_since = None  # 第一筆未 flush 內容的寫入時間
+        while True:
+            timeout = None if dirty_since is None else max(0.0, dirty_since + self.flush_interval - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._safe_flush()
+                try:
+                    self._fh.close()
+                except Exception:
+                    pass
+                return
+            if isinstance(item, threading.Event):
+                self._safe_flush()
+                dirty_since = None
+                item.set()
+                continue
+
+            if item is not None:
+                try:
+                    self._fh.write(item)
+                except Exception:
+                    pass
+                if dirty_since is None:
+                    dirty_since = time.monotonic()
+            if dirty_since is not None and time.monotonic() - dirty_since >= self.flush_interval:
+                self._safe_flush()
+                dirty_since = None
+
+    def _safe_flush(self):
+        """flush 日誌檔（磁碟錯誤不影響主流程）"""
+        try:
+            self._fh.flush()
+        except Exception:
+            pass
+
+
+class TeeWriter:
+    """同時輸出到原始 stdout/stderr 和非同步日誌寫入器"""
+
+    def __init__(self, original, log_writer):
+        self.original = original
+        self.log_writer = log_writer
+
+    def write(self, data):
+        self.original.write(data)
+        self.log_writer.write(data)
+
+    def flush(self):
+        # 只同步 flush 主控台；日誌檔由背景執行緒定期 flush
+        self.original.flush()
+
+    @property
+    def encoding(self):
+        return getattr(self.original, "encoding", "utf-8")
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prometheus 指標 - 執行中的即時觀測
+
+設定 METRICS_PORT 時在本機提供 HTTP /metrics（Prometheus 文字格式），
+設定 METRICS_TEXTFILE 時定期寫出 node_exporter textfile collector 檔案。
+指標來源為 StepRecorder 的步驟 / 事件與 MultiAccountManager 的帳號進度。
+"""
+
+import os
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .settings import get_settings
+from ..utils.windows_encoding_utils import safe_print
+
+# 步驟耗時直方圖的分界（秒）
+STEP_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# 驗證碼識別耗時直方圖的分界（秒）
+OCR_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+def _format_labels(labels):
+    """標籤 tuple 轉為 {k="v"} 字串"""
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value):
+    """數值轉為 Prometheus 文字格式"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """指標基底：名稱、說明、型別與依標籤分組的值"""
+
+    kind = "untyped"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(sorted(labels.items()))
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """只增不減的計數器"""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """可增可減的量測值；提供 callback 時於輸出時即時計算"""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, callback=None):
+        super().__init__(name, help_text)
+        self.callback = callback
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self):
+        if self.callback is not None:
+            try:
+                self.set(self.callback())
+            except Exception:
+                pass
+        return super().render()
+
+
+class Histogram(_Metric):
+    """累積分桶直方圖"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][index] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = [(labels, dict(state, counts=list(state["counts"]))) for labels, state in self._values.items()]
+        for labels, state in items:
+            for bound, count in zip(self.buckets, state["counts"]):
+                bucket_labels = labels + (("le", _format_value(bound)),)
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {state['count']}")
+        return lines
+
+
+def chrome_rss_bytes():
+    """本程序衍生的 Chrome / ChromeDriver 程序常駐記憶體總和（讀取 /proc，非 Linux 回傳 0）"""
+    if not os.path.isdir("/proc"):
+        return 0
+
+    parents = {}
+    names = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # 程序名稱可能含空白，以最後一個右括號分隔
+        name = stat[stat.find("(") + 1 : stat.rfind(")")]
+        fields = stat[stat.rfind(")") + 2 :].split()
+        parents[int(entry)] = int(fields[1])
+        names[int(entry)] = name.lower()
+
+    root = os.getpid()
+    total = 0
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for pid, name in names.items():
+        if "chrom" not in name:
+            continue
+        # 只計算本程序的子孫程序，避免把其他執行中的 Chrome 算進來
+        ancestor, depth = parents.get(pid), 0
+        while ancestor and ancestor != root and depth < 64:
+            ancestor, depth = parents.get(ancestor), depth + 1
+        if ancestor != root:
+            continue
+        try:
+            with open(f"/proc/{pid}/statm", "r") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+class RunMetrics:
+    """一次執行的指標集合"""
+
+    def __init__(self):
+        self.accounts = Counter("tcat_accounts_total", "已完成的帳號數（依結果分類）")
+        self.accounts_in_flight = Gauge("tcat_accounts_in_flight", "正在處理的帳號數")
+        self.step_duration = Histogram("tcat_step_duration_seconds", "各步驟耗時", STEP_BUCKETS)
+        self.step_failures = Counter("tcat_step_failures_total", "各步驟失敗次數")
+        self.downloads = Counter("tcat_downloads_total", "下載完成的檔案數")
+        self.download_bytes = Counter("tcat_download_bytes_total", "下載完成的檔案位元組數")
+        self.browser_rebuilds = Counter("tcat_browser_rebuilds_total", "瀏覽器重建次數")
+        self.login_retries = Counter("tcat_login_retries_total", "登入重試次數（首次以外的嘗試）")
+        self.ocr_latency = Histogram("tcat_ocr_latency_seconds", "驗證碼識別耗時", OCR_BUCKETS)
+        self.chrome_rss = Gauge("tcat_chrome_rss_bytes", "Chrome / ChromeDriver 常駐記憶體總和", callback=chrome_rss_bytes)
+        self.last_update = Gauge("tcat_last_update_timestamp_seconds", "最後一次更新指標的時間")
+        self._metrics = [
+            self.accounts,
+            self.accounts_in_flight,
+            self.step_duration,
+            self.step_failures,
+            self.downloads,
+            self.download_bytes,
+            self.browser_rebuilds,
+            self.login_retries,
+            self.ocr_latency,
+            self.chrome_rss,
+            self.last_update,
+        ]
+        # 已開始過登入嘗試的帳號（之後的嘗試皆計為重試，含帳號層級重試的新 scraper 實例）
+        self._login_accounts = set()
+        # 無標籤的指標先輸出 0，讓告警規則從第一次抓取就有資料
+        for metric in (self.accounts_in_flight, self.downloads, self.download_bytes, self.browser_rebuilds, self.login_retries):
+            metric.inc(0)
+
+    def observe_record(self, record):
+        """StepRecorder 監聽回呼：步驟耗時、失敗、瀏覽器重建、登入重試、驗證碼識別與下載"""
+        self.last_update.set(time.time())
+        if record["type"] == "event":
+            if record["name"] == "download.file":
+                self.downloads.inc()
+                self.download_bytes.inc(record["attrs"].get("bytes", 0))
+            elif record["name"] == "login.attempt":
+                if record["account"] in self._login_accounts:
+                    self.login_retries.inc()
+                else:
+                    self._login_accounts.add(record["account"])
+            return
+
+        seconds = record["duration_ms"] / 1000
+        self.step_duration.observe(seconds, step=record["name"])
+        if record["outcome"] != "ok":
+            self.step_failures.inc(step=record["name"])
+        if record["name"] == "browser_rebuild":
+            self.browser_rebuilds.inc()
+        elif record["name"] == "captcha":
+            self.ocr_latency.observe(seconds)
+
+    def render(self):
+        """輸出 Prometheus 文字格式"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """以 HTTP /metrics 或 textfile 輸出 RunMetrics"""
+
+    def __init__(self, metrics, port=None, textfile=None, interval=15):
+        self.metrics = metrics
+        self.port = port
+        self.textfile = textfile
+        self.interval = interval
+        self._server = None
+        self._stop = threading.Event()
+        self._writer = None
+
+    @classmethod
+    def from_env(cls, metrics):
+        """依 METRICS_PORT / METRICS_TEXTFILE 建立，兩者皆未設定時回傳 None"""
+        settings = get_settings()
+        if not settings.metrics_port and not settings.metrics_textfile:
+            return None
+        return cls(
+            metrics,
+            port=settings.metrics_port,
+            textfile=settings.metrics_textfile,
+            interval=settings.metrics_textfile_interval,
+        )
+
+    def start(self):
+        """啟動 HTTP 服務與 textfile 定期寫出"""
+        if self.port:
+            metrics = self.metrics
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = metrics.render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass  # 不把每次抓取寫進執行日誌
+
+            try:
+                self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+                self._server.daemon_threads = True
+                threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+                safe_print(f"📈 指標服務: http://127.0.0.1:{self.port}/metrics")
+            except OSError as e:
+                safe_print(f"⚠️ 指標服務啟動失敗: {e}")
+                self._server = None
+
+        if self.textfile:
+            self._writer = threading.Thread(target=self._write_loop, name="metrics-textfile", daemon=True)
+            self._writer.start()
+            safe_print(f"📈 指標檔案: {self.textfile}")
+
+    def _write_loop(self):
+        """定期寫出 textfile"""
+        while not self._stop.wait(self.interval):
+            self.write_textfile()
+
+    def write_textfile(self):
+        """以暫存檔 + 取代的方式寫出，避免 collector 讀到寫一半的檔案"""
+        if not self.textfile:
+            return
+        try:
+            directory = os.path.dirname(self.textfile)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.textfile}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.metrics.render())
+            os.replace(tmp_path, self.textfile)
+        except Exception as e:
+            safe_print(f"⚠️ 指標檔案寫入失敗: {e}")
+
+    def stop(self):
+        """停止輸出（textfile 會寫出最後一次）"""
+        self._stop.set()
+        self.write_textfile()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
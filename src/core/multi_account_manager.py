@@ -10,25 +10,36 @@ import sys
 import json
 import time
 import logging
+import traceback
 from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
 
 from ..utils.windows_encoding_utils import safe_print
 from ..utils.discord_notifier import DiscordNotifier
 from ..utils.email_notifier import EmailNotifier
+from ..utils.notification_dispatcher import NotificationDispatcher
+from .settings import get_settings
+from .log_writer import AsyncLogWriter, TeeWriter
+from .step_timing import set_step_sink
+from .run_journal import RunJournal
+from .errors import classify_exception
+from .circuit_breaker import CircuitBreaker
+from .preflight import run_preflight, seed_timeouts
+from .scrape_progress import ScrapeProgress
+from .trace_export import TraceExporter, is_trace_export_enabled
+from .metrics import RunMetrics, MetricsExporter
 from .browser_utils import _cleanup_headless_chrome, cleanup_temp_user_data_dirs, init_chrome_browser, check_browser_health
 
 
 def _setup_file_logger(function_name):
     """
-    設定檔案日誌記錄器，將 stdout/stderr 同時輸出到日誌檔
+    設定檔案日誌記錄器，將 stdout/stderr 同時輸出到日誌檔（由背景執行緒非同步寫入）
 
     Args:
         function_name: 功能名稱，用於日誌檔命名
 
     Returns:
-        tuple: (log_file_path, original_stdout, original_stderr, tee_stdout, tee_stderr)
+        tuple: (log_file_path, original_stdout, original_stderr, log_writer)
     """
     logs_dir = Path("logs")
     logs_dir.mkdir(parents=True, exist_ok=True)
@@ -36,40 +47,13 @@ def _setup_file_logger(function_name):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_file = logs_dir / f"{timestamp}_{function_name}.log"
 
-    class TeeWriter:
-        """同時輸出到原始 stdout/stderr 和日誌檔"""
-        def __init__(self, original, log_fh):
-            self.original = original
-            self.log_fh = log_fh
-
-        def write(self, data):
-            self.original.write(data)
-            try:
-                self.log_fh.write(data)
-                self.log_fh.flush()
-            except Exception:
-                pass
-
-        def flush(self):
-            self.original.flush()
-            try:
-                self.log_fh.flush()
-            except Exception:
-                pass
-
-        @property
-        def encoding(self):
-            return getattr(self.original, 'encoding', 'utf-8')
-
-    log_fh = open(log_file, "w", encoding="utf-8")
+    log_writer = AsyncLogWriter(log_file)
     original_stdout = sys.stdout
     original_stderr = sys.stderr
-    tee_stdout = TeeWriter(original_stdout, log_fh)
-    tee_stderr = TeeWriter(original_stderr, log_fh)
-    sys.stdout = tee_stdout
-    sys.stderr = tee_stderr
+    sys.stdout = TeeWriter(original_stdout, log_writer)
+    sys.stderr = TeeWriter(original_stderr, log_writer)
 
-    return log_file, original_stdout, original_stderr, log_fh
+    return log_file, original_stdout, original_stderr, log_writer
 
 
 class MultiAccountManager:
@@ -83,8 +67,8 @@ class MultiAccountManager:
     }
 
     def __init__(self, config_file="accounts.json"):
-        # 載入環境變數
-        load_dotenv()
+        # 執行設定（載入 .env 並解析一次，之後傳給 scraper、瀏覽器與通知器）
+        self.settings = get_settings()
 
         self.config_file = config_file
         self.load_config()
@@ -97,11 +81,26 @@ class MultiAccountManager:
         # 當前執行的功能名稱
         self.current_function_name = None
 
+        # 執行中指標（啟用 Prometheus 輸出時為 RunMetrics）
+        self.metrics = None
+
+        # 目前執行的進度日誌（--resume 續跑用）
+        self.run_journal = None
+
+        # 目前執行的網站斷路器與重試預算、啟動前探測結果
+        self.circuit_breaker = None
+        self.preflight = None
+        # 本次執行使用的設定（啟動前探測可能調整初始逾時）
+        self.run_settings = self.settings
+
         # Discord 通知器
-        self.discord_notifier = DiscordNotifier()
+        self.discord_notifier = DiscordNotifier(settings=self.settings)
 
         # Email 通知器
-        self.email_notifier = EmailNotifier()
+        self.email_notifier = EmailNotifier(settings=self.settings)
+
+        # 通知派送器（背景執行緒池發送，失敗重試）
+        self.notification_dispatcher = NotificationDispatcher(settings=self.settings)
 
     def load_config(self):
         """載入設定檔"""
@@ -174,16 +173,15 @@ class MultiAccountManager:
         safe_print("🚀 建立共享瀏覽器...")
 
         # 解析 headless 設定
-        if headless is not None:
-            use_headless = headless
-        else:
-            use_headless = os.getenv("HEADLESS", "true").lower() == "true"
+        use_headless = headless if headless is not None else self.settings.headless
 
-        driver, wait = init_chrome_browser(headless=use_headless, download_dir=None)
+        driver, wait = init_chrome_browser(headless=use_headless, download_dir=None, settings=self.run_settings)
         safe_print("✅ 共享瀏覽器建立完成")
         return (driver, wait)
 
-    def run_all_accounts(self, scraper_class, headless_override=None, progress_callback=None, **scraper_kwargs):
+    def run_all_accounts(
+        self, scraper_class, headless_override=None, progress_callback=None, resume=False, **scraper_kwargs
+    ):
         """
         執行所有啟用的帳號
 
@@ -191,6 +189,7 @@ class MultiAccountManager:
             scraper_class: 要使用的抓取器類別 (例如 PaymentScraper)
             headless_override: 覆寫無頭模式設定
             progress_callback: 進度回呼函數
+            resume: 從同一功能最近一次中斷的執行續跑（略過已成功的帳號）
             **scraper_kwargs: 額外的 scraper 參數 (例如 period_number, start_date, end_date)
         """
         # 開始總執行時間計時
@@ -199,21 +198,51 @@ class MultiAccountManager:
         # 設定檔案日誌（功能名稱用於命名）
         scraper_class_name = scraper_class.__name__
         function_name_for_log = self.SCRAPER_NAMES.get(scraper_class_name, scraper_class_name)
-        log_file, original_stdout, original_stderr, log_fh = _setup_file_logger(function_name_for_log)
+        log_file, original_stdout, original_stderr, log_writer = _setup_file_logger(function_name_for_log)
         safe_print(f"📝 執行日誌: {log_file}")
 
+        # 步驟計時記錄（JSON Lines，與執行日誌同名）
+        steps_file = log_file.with_suffix(".steps.jsonl")
+        steps_writer = AsyncLogWriter(steps_file)
+        set_step_sink(steps_writer)
+        safe_print(f"📝 步驟計時: {steps_file}")
+
+        # Prometheus 指標（設定 METRICS_PORT / METRICS_TEXTFILE 時啟用）
+        self.metrics = RunMetrics()
+        metrics_exporter = MetricsExporter.from_env(self.metrics)
+        if metrics_exporter:
+            metrics_exporter.start()
+        else:
+            self.metrics = None
+
         try:
-            return self._run_all_accounts_inner(scraper_class, headless_override, progress_callback, **scraper_kwargs)
+            return self._run_all_accounts_inner(
+                scraper_class, headless_override, progress_callback, resume=resume, **scraper_kwargs
+            )
+        except BaseException:
+            if self.run_journal and not self.run_journal.finished:
+                safe_print(f"💾 進度已記錄於 {self.run_journal.path}，可加上 --resume 從中斷處續跑")
+            # 發生例外時先把錯誤堆疊與佇列中的日誌寫入檔案，確保中斷前的輸出不遺失
+            log_writer.write(traceback.format_exc())
+            log_writer.flush()
+            steps_writer.flush()
+            raise
         finally:
-            # 還原 stdout/stderr 並關閉日誌檔
+            # 等待背景通知送出（逾時未送出的寫入 dead-letter），其輸出仍記錄在日誌中
+            self.notification_dispatcher.close()
+            self.email_notifier.close()
+            # 還原 stdout/stderr 並關閉日誌檔（寫完佇列中的內容）
             sys.stdout = original_stdout
             sys.stderr = original_stderr
-            try:
-                log_fh.close()
-            except Exception:
-                pass
-
-    def _run_all_accounts_inner(self, scraper_class, headless_override=None, progress_callback=None, **scraper_kwargs):
+            set_step_sink(None)
+            if metrics_exporter:
+                metrics_exporter.stop()
+            steps_writer.close()
+            log_writer.close()
+
+    def _run_all_accounts_inner(
+        self, scraper_class, headless_override=None, progress_callback=None, resume=False, **scraper_kwargs
+    ):
         """run_all_accounts 的內部實作（包裹在日誌系統中）"""
         safe_print(f"⏱️ 總執行開始時間: {self.total_start_time.strftime('%Y-%m-%d %H:%M:%S')}")
 
@@ -224,14 +253,34 @@ class MultiAccountManager:
         accounts = self.get_enabled_accounts()
         results = []
 
+        # 執行日誌：逐筆記錄完成的帳號與下載檔案，中斷後可用 --resume 續跑
+        journal = None
+        if resume:
+            journal = RunJournal.find_resumable(self.current_function_name)
+            if journal is None:
+                safe_print("ℹ️ 沒有可續跑的中斷執行，從頭開始")
+            else:
+                if journal.scraper_kwargs != scraper_kwargs:
+                    safe_print(f"ℹ️ 續跑沿用中斷執行的參數: {journal.scraper_kwargs}")
+                    scraper_kwargs = dict(journal.scraper_kwargs)
+                journal.mark_resumed()
+                safe_print(
+                    f"♻️ 續跑 {journal.path}（已完成 {len(journal.successful_accounts())} 個帳號，將略過）"
+                )
+        if journal is None:
+            journal = RunJournal.start(self.current_function_name, scraper_kwargs, [a["username"] for a in accounts])
+        self.run_journal = journal
+        completed_accounts = journal.successful_accounts()
+        pending_count = sum(1 for a in accounts if a["username"] not in completed_accounts)
+        processed = 0  # 本次實際處理的帳號數
+
         # 顯示全域設定（只顯示一次）
         if headless_override is not None:
             use_headless = headless_override
             headless_source = f"命令列參數: {use_headless}"
         else:
             use_headless = None
-            env_headless = os.getenv("HEADLESS", "true").lower()
-            headless_source = f"環境變數: {env_headless}"
+            headless_source = f"環境變數: {str(self.settings.headless).lower()}"
 
         # 組合全域參數訊息
         global_params = []
@@ -254,10 +303,30 @@ class MultiAccountManager:
 
         max_account_retries = 2  # 每個帳號最多重試 2 次（共 3 次嘗試）
 
+        # 網站斷路器：跨帳號連續網站層級失敗時先探測網站，必要時暫停或中止；重試次數受全域預算限制
+        breaker = CircuitBreaker.from_settings(scraper_class.LOGIN_URL, self.settings)
+        self.circuit_breaker = breaker
+
+        # 追蹤匯出（設定 TRACE_EXPORT_DIR 時啟用）：整次執行為一個 trace，每個帳號為子 span
+        tracer = TraceExporter(self.current_function_name) if is_trace_export_enabled() else None
+        metrics = self.metrics
+
+        # 啟動前探測：啟動 Chrome 前確認網站可用（DNS / 連線 / TLS / TTFB），
+        # 無法使用時由斷路器暫停後再探測或直接中止，可用時依延遲設定初始頁面載入逾時
+        self.preflight = None
+        self.run_settings = self.settings
+        if pending_count and self.settings.preflight:
+            self.preflight = run_preflight(breaker.site_probe)
+            if not self.preflight["ok"]:
+                breaker.trip("啟動前探測失敗")
+                breaker.wait_until_available()
+            elif self.settings.preflight_seed_timeouts:
+                self.run_settings = seed_timeouts(self.settings, self.preflight)
+
         # ==================== 共享瀏覽器模式 ====================
         # 建立一個 Chrome 實例，所有帳號共用，減少開關瀏覽器的不穩定因素
         shared_browser = None  # (driver, wait) tuple 或 None
-        if len(accounts) > 1:
+        if pending_count > 1 and not breaker.aborted:
             try:
                 shared_browser = self._create_shared_browser(use_headless)
             except Exception as e:
@@ -268,6 +337,25 @@ class MultiAccountManager:
             username = account["username"]
             password = account["password"]
 
+            # 續跑：先前已成功的帳號直接沿用日誌中的結果
+            if username in completed_accounts:
+                safe_print(f"⏭️ [{i}/{len(accounts)}] {username} 已於中斷前完成，略過")
+                results.append(completed_accounts[username])
+                continue
+
+            # 斷路器跳開且網站仍無法使用：中止執行，剩餘帳號不寫入執行日誌（可 --resume 續跑）
+            if not breaker.wait_until_available():
+                results.append(
+                    {
+                        "success": False,
+                        "username": username,
+                        "error": "網站無法使用，執行已中止",
+                        "error_type": "circuit_open",
+                        "downloads": [],
+                    }
+                )
+                continue
+
             progress_msg = f"📊 [{i}/{len(accounts)}] 處理帳號: {username}"
             if progress_callback:
                 progress_callback(progress_msg)
@@ -276,13 +364,15 @@ class MultiAccountManager:
                 print("-" * 50)
 
             # 共享模式：帳號切換前檢查瀏覽器健康
-            if shared_browser and i > 1:
+            if shared_browser and processed > 0:
                 alive, error_msg = check_browser_health(shared_browser[0])
                 if not alive:
                     safe_print(f"💀 共享瀏覽器已失效: {error_msg}，重建中...")
                     _cleanup_headless_chrome()
                     cleanup_temp_user_data_dirs()
                     time.sleep(2)
+                    if metrics:
+                        metrics.browser_rebuilds.inc()
                     try:
                         shared_browser = self._create_shared_browser(use_headless)
                     except Exception as e:
@@ -290,7 +380,7 @@ class MultiAccountManager:
                         shared_browser = None
 
                 # 批次冷卻：每 5 個帳號等待，讓系統釋放資源
-                if (i - 1) % 5 == 0:
+                if processed % 5 == 0:
                     safe_print("🧊 批次冷卻：等待 3 秒...")
                     time.sleep(3)
 
@@ -301,18 +391,33 @@ class MultiAccountManager:
                 "headless": use_headless,
                 "quiet_init": True,  # 全域設定已在上方顯示，抑制重複訊息
                 "shared_driver": shared_browser,
+                "settings": self.run_settings,
             }
 
             # 合併額外的 scraper 參數
             scraper_init_kwargs.update(scraper_kwargs)
 
+            # 階段與工作項目進度：重試（含 --resume）時從失敗的工作項目續跑，不重新下載已完成的項目
+            progress = ScrapeProgress.for_account(journal, username)
+            scraper_init_kwargs["progress"] = progress
+
+            trace_account = tracer.start_account(username) if tracer else None
+            journal.account_started(username)
+            if metrics:
+                metrics.accounts_in_flight.inc()
+
             # 帳號執行（含連線錯誤重試）
             for retry in range(max_account_retries + 1):
                 try:
                     scraper = scraper_class(**scraper_init_kwargs)
+                    if tracer:
+                        tracer.attach(trace_account, scraper.steps)
+                    scraper.steps.add_listener(journal.on_step_record)
+                    if metrics:
+                        scraper.steps.add_listener(metrics.observe_record)
 
                     # 共享模式：非首帳號需要先重置瀏覽器（清 cookie → 導航登入頁）
-                    if shared_browser and i > 1:
+                    if shared_browser and processed > 0:
                         scraper.reset_for_new_account(username, password)
 
                     result = scraper.run_full_process()
@@ -326,37 +431,27 @@ class MultiAccountManager:
                     result.update(execution_summary)
 
                     results.append(result)
+                    if not result["success"]:
+                        breaker.record_failure(result.get("error_type"))
                     break  # 成功則跳出重試迴圈
 
                 except Exception as e:
-                    error_str = str(e)
-                    is_connection_error = any(kw in error_str for kw in [
-                        'RemoteDisconnected', 'Connection aborted',
-                        'ConnectionResetError', 'MaxRetryError',
-                        'ConnectionRefusedError', 'NewConnectionError',
-                    ])
-                    is_chrome_startup_error = '所有 Chrome 啟動方法都失敗了' in error_str
-                    # 新增：WebDriver 特定異常也視為可重試
-                    is_browser_crash = any(kw in error_str for kw in [
-                        'WebDriverException', 'InvalidSessionIdException',
-                        'NoSuchWindowException', 'no such session',
-                        'chrome not reachable', 'session not created',
-                    ])
-                    is_retryable = is_connection_error or is_chrome_startup_error or is_browser_crash
-
-                    if is_retryable and retry < max_account_retries:
-                        retry_delay = 8 * (retry + 1) if is_chrome_startup_error else 5 * (retry + 1)
-                        if is_browser_crash:
-                            error_type = "瀏覽器崩潰"
-                        elif is_chrome_startup_error:
-                            error_type = "Chrome 啟動失敗"
-                        else:
-                            error_type = "連線中斷"
-                        safe_print(f"⚠️ 帳號 {username} {error_type} (第 {retry + 1} 次)，{retry_delay} 秒後重試...")
+                    # 依例外類別決定重試策略（BrowserCrash / SiteUnavailable 等，見 errors.py）
+                    error = classify_exception(e)
+                    error_str = str(error)
+                    retry_limit = min(max_account_retries, error.max_retries)
+
+                    breaker.record_failure(error.error_type)
+
+                    if error.retryable and retry < retry_limit and breaker.allow_retry():
+                        retry_delay = error.retry_delay(retry)
+                        safe_print(f"⚠️ 帳號 {username} {error.label} (第 {retry + 1} 次)，{retry_delay} 秒後重試...")
                         safe_print(f"   錯誤: {error_str[:100]}")
 
                         # 瀏覽器崩潰時重建共享瀏覽器
-                        if shared_browser and (is_browser_crash or is_connection_error):
+                        if shared_browser and error.rebuild_browser:
+                            if metrics:
+                                metrics.browser_rebuilds.inc()
                             _cleanup_headless_chrome()
                             cleanup_temp_user_data_dirs()
                             time.sleep(retry_delay)
@@ -374,20 +469,61 @@ class MultiAccountManager:
                         continue
                     else:
                         # 不可重試錯誤或重試用盡，記錄失敗
-                        if is_retryable and retry >= max_account_retries:
-                            safe_print(f"💥 帳號 {username} 重試 {max_account_retries} 次後仍失敗: {e}")
+                        if error.retryable:
+                            safe_print(f"💥 帳號 {username} 重試 {retry} 次後仍失敗: {e}")
                         else:
                             safe_print(f"💥 帳號 {username} 處理失敗: {e}")
-                        results.append({"success": False, "username": username, "error": error_str, "downloads": []})
+                        results.append(
+                            {
+                                "success": False,
+                                "username": username,
+                                "error": error_str,
+                                "error_type": error.error_type,
+                                "downloads": progress.downloaded_files(),
+                            }
+                        )
                         break
 
+            # 仍有未完成的工作項目（例如某期沒有下載到檔案）：回報為未完成並保留進度，--resume 時只重做這些項目
+            pending_items = progress.pending_items()
+            if results[-1]["success"] and pending_items:
+                safe_print(f"⚠️ 帳號 {username} 有 {len(pending_items)} 個工作項目未完成: {', '.join(map(str, pending_items))}")
+                results[-1].update(
+                    success=False,
+                    error=f"{len(pending_items)} 個工作項目未完成",
+                    error_type="incomplete",
+                    pending_items=pending_items,
+                )
+                breaker.record_success()
+
+            journal.account_done(username, self._journal_result(results[-1]))
+            if results[-1]["success"]:
+                progress.discard()
+                breaker.record_success()
+            processed += 1
+
+            if metrics:
+                metrics.accounts_in_flight.dec()
+                metrics.accounts.inc(status="success" if results[-1]["success"] else "failed")
+
+            if tracer:
+                account_result = results[-1]
+                tracer.end_account(
+                    trace_account,
+                    account_result["success"],
+                    error=account_result.get("error"),
+                    downloads=len(account_result["downloads"]),
+                )
+
             # 帳號間隔等待 (保留此處固定等待)
             # 原因: 避免連續請求過於頻繁導致伺服器限制或封鎖
             # 此等待是有意的速率限制 (rate limiting)，不應優化移除
-            if i < len(accounts):
+            if processed < pending_count:
                 safe_print("⏳ 等待 3 秒後處理下一個帳號...")
                 time.sleep(3)
 
+        breaker.site_probe.close()
+
         # 清理共享瀏覽器
         if shared_browser:
             safe_print("🔚 關閉共享瀏覽器...")
@@ -406,10 +542,68 @@ class MultiAccountManager:
             safe_print(f"⏱️ 總執行結束時間: {self.total_end_time.strftime('%Y-%m-%d %H:%M:%S')}")
             safe_print(f"📊 總執行時長: {self.total_execution_minutes:.2f} 分鐘")
 
-        # 生成總報告
+        if tracer:
+            trace_file = tracer.export(
+                {
+                    "run.accounts": len(results),
+                    "run.failed_accounts": sum(1 for r in results if not r["success"]),
+                    "run.downloads": sum(len(r["downloads"]) for r in results),
+                }
+            )
+            if trace_file:
+                safe_print(f"🧵 追蹤檔已輸出: {trace_file}")
+
+        # 生成總報告（續跑時包含中斷前已完成的帳號）
         self.generate_summary_report(results)
+        if breaker.aborted:
+            # 斷路器中止：不寫入 run_end，之後可用 --resume 處理剩餘帳號
+            safe_print(f"💾 網站無法使用，執行已中止；進度已記錄於 {journal.path}，可加上 --resume 續跑")
+            return results
+        journal.finish(
+            {
+                "accounts": len(results),
+                "failed_accounts": sum(1 for r in results if not r["success"]),
+                "downloads": sum(len(r["downloads"]) for r in results),
+            }
+        )
         return results
 
+    @staticmethod
+    def _clean_result(result):
+        """轉為可寫入報告的結果（移除不可序列化物件，記錄只保留筆數）"""
+        records = result.get("records")
+        clean_result = {
+            "success": result["success"],
+            "username": result["username"],
+            "downloads": [str(path) for path in result["downloads"]],
+            "records": records if isinstance(records, int) else len(records or []),
+            "duration_minutes": result.get("duration_minutes", 0),
+            "start_time": result.get("start_time"),
+            "end_time": result.get("end_time"),
+        }
+        if "error" in result:
+            clean_result["error"] = result["error"]
+        if "error_type" in result:
+            clean_result["error_type"] = result["error_type"]
+        if "message" in result:
+            clean_result["message"] = result["message"]
+        if result.get("pending_items"):
+            clean_result["pending_items"] = result["pending_items"]
+        if result.get("login_attempts"):
+            clean_result["login_attempts"] = result["login_attempts"]
+        if result.get("login_stats"):
+            clean_result["login_stats"] = result["login_stats"]
+        if result.get("steps"):
+            clean_result["steps"] = result["steps"]
+        return clean_result
+
+    def _journal_result(self, result):
+        """寫入執行日誌的結果：報告欄位加上各期間 / 發票的下載明細"""
+        journal_result = self._clean_result(result)
+        if result.get("period_details"):
+            journal_result["period_details"] = result["period_details"]
+        return journal_result
+
     def generate_summary_report(self, results):
         """生成總體執行報告"""
         print("\n" + "=" * 80)
@@ -498,24 +692,7 @@ class MultiAccountManager:
         report_file.parent.mkdir(parents=True, exist_ok=True)
 
         # 清理結果中的不可序列化物件
-        clean_results = []
-        for result in results:
-            clean_result = {
-                "success": result["success"],
-                "username": result["username"],
-                "downloads": result["downloads"],
-                "records": len(result.get("records", [])) if result.get("records") else 0,
-                "duration_minutes": result.get("duration_minutes", 0),
-                "start_time": result.get("start_time"),
-                "end_time": result.get("end_time"),
-            }
-            if "error" in result:
-                clean_result["error"] = result["error"]
-            if "error_type" in result:
-                clean_result["error_type"] = result["error_type"]
-            if "message" in result:
-                clean_result["message"] = result["message"]
-            clean_results.append(clean_result)
+        clean_results = [self._clean_result(result) for result in results]
 
         with open(report_file, "w", encoding="utf-8") as f:
             json.dump(
@@ -536,6 +713,10 @@ class MultiAccountManager:
                     "failed_accounts": len(other_failed_accounts),
                     "security_warning_accounts": len(security_warning_accounts),
                     "total_downloads": total_downloads,
+                    "journal_file": str(self.run_journal.path) if self.run_journal else None,
+                    "resumed": bool(self.run_journal and self.run_journal.resumed),
+                    "circuit_breaker": self.circuit_breaker.summary() if self.circuit_breaker else None,
+                    "preflight": self.preflight,
                     "details": clean_results,
                 },
                 f,
@@ -557,10 +738,12 @@ class MultiAccountManager:
 
         # 發送 Discord 通知
         if self.discord_notifier.is_enabled():
-            safe_print("\n📢 正在發送 Discord 通知...")
+            safe_print("\n📢 Discord 通知已排入背景發送")
 
             # 發送執行摘要
-            self.discord_notifier.send_execution_summary(
+            self.notification_dispatcher.submit(
+                "Discord 執行摘要",
+                self.discord_notifier.send_execution_summary,
                 function_name=self.current_function_name or "未知功能",
                 total_accounts=len(results),
                 successful_accounts=len(successful_accounts),
@@ -573,14 +756,16 @@ class MultiAccountManager:
 
             # 如果有密碼安全警告，額外發送詳細通知
             if security_warning_accounts:
-                self.discord_notifier.send_security_warning_notification(
+                self.notification_dispatcher.submit(
+                    "Discord 密碼警告",
+                    self.discord_notifier.send_security_warning_notification,
                     function_name=self.current_function_name or "未知功能",
                     security_warning_accounts=security_warning_accounts,
                 )
 
         # 發送 Email 通知
         if self.email_notifier.is_enabled():
-            safe_print("\n📧 正在發送 Email 通知...")
+            safe_print("\n📧 Email 通知已排入背景發送")
 
             # 組合失敗帳號詳情
             failed_accounts_details = [
@@ -598,7 +783,9 @@ class MultiAccountManager:
             ]
 
             # 發送執行摘要
-            self.email_notifier.send_execution_summary(
+            self.notification_dispatcher.submit(
+                "Email 執行摘要",
+                self.email_notifier.send_execution_summary,
                 function_name=self.current_function_name or "未知功能",
                 total_accounts=len(results),
                 successful_accounts=len(successful_accounts),
@@ -614,7 +801,9 @@ class MultiAccountManager:
 
             # 如果有密碼安全警告，額外發送詳細通知
             if security_warning_accounts:
-                self.email_notifier.send_security_warning_notification(
+                self.notification_dispatcher.submit(
+                    "Email 密碼警告",
+                    self.email_notifier.send_security_warning_notification,
                     function_name=self.current_function_name or "未知功能",
                     security_warning_accounts=security_warning_accounts,
                 )
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+導航備忘錄 - 記錄每種報表（及帳號）實際成功到達目標頁面的策略與 URL
+
+登入後可直接跳到上次成功的 URL 並驗證，只有在驗證失敗時才執行
+直接 URL 清單、選單與框架等備援導航。
+"""
+
+import os
+import json
+import atexit
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .settings import get_settings
+from ..utils.windows_encoding_utils import safe_print
+
+# 不分帳號的共用鍵，讓新帳號也能沿用其他帳號的成功路徑
+ANY_ACCOUNT = "*"
+
+
+class NavigationMemo:
+    """導航備忘錄（JSON 檔案持久化）"""
+
+    def __init__(self, path=None, max_misses=2):
+        """
+        初始化導航備忘錄
+
+        Args:
+            path: 備忘錄檔案路徑（預設讀取 NAVIGATION_MEMO_FILE，否則 cache/navigation_memo.json）
+            max_misses: 連續驗證失敗幾次後移除該筆記錄
+        """
+        self.path = Path(path or get_settings().navigation_memo_file)
+        self.max_misses = max_misses
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = self._load()
+
+    def _load(self):
+        """讀取備忘錄檔案，檔案不存在或損毀時回傳空備忘錄"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", {})
+            return entries if isinstance(entries, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            safe_print(f"⚠️ 導航備忘錄讀取失敗，將重新學習: {e}")
+            return {}
+
+    def lookup(self, report_type, username):
+        """
+        查詢導航記錄，帳號專屬記錄優先，其次為同報表的共用記錄
+
+        Returns:
+            dict: {"strategy", "url", "duration", ...} 或 None
+        """
+        for account in (username, ANY_ACCOUNT):
+            entry = self._entries.get(f"{report_type}::{account}")
+            if entry and entry.get("url"):
+                return entry
+        return None
+
+    def record_success(self, report_type, username, strategy, url, duration):
+        """
+        記錄成功到達目標頁面的導航方式（同時更新帳號專屬與共用記錄）
+
+        Args:
+            report_type: 報表類型（例如 "freight"）
+            username: 帳號
+            strategy: 發現此 URL 的導航策略（direct_url / menu / frame）
+            url: 可直接重新訪問的 URL
+            duration: 從開始導航到驗證成功的秒數
+        """
+        with self._lock:
+            for account in (username, ANY_ACCOUNT):
+                key = f"{report_type}::{account}"
+                entry = self._entries.get(key) or {"hits": 0}
+                entry.update(
+                    {
+                        "strategy": strategy,
+                        "url": url,
+                        "duration": round(duration, 2),
+                        "hits": entry.get("hits", 0) + 1,
+                        "consecutive_misses": 0,
+                        "updated_at": datetime.now().isoformat(timespec="seconds"),
+                    }
+                )
+                self._entries[key] = entry
+            self._dirty = True
+
+    def record_miss(self, report_type, username, url):
+        """記錄驗證失敗；連續失敗達 max_misses 次即移除該記錄"""
+        with self._lock:
+            for account in (username, ANY_ACCOUNT):
+                key = f"{report_type}::{account}"
+                entry = self._entries.get(key)
+                if not entry or entry.get("url") != url:
+                    continue
+                entry["consecutive_misses"] = entry.get("consecutive_misses", 0) + 1
+                if entry["consecutive_misses"] >= self.max_misses:
+                    safe_print(f"♻️ 導航備忘錄移除失效記錄: {key}")
+                    del self._entries[key]
+            self._dirty = True
+
+    def flush(self):
+        """將變更寫回備忘錄檔案（無變更時不寫入）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"version": 1, "entries": self._entries}, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except Exception as e:
+                safe_print(f"⚠️ 導航備忘錄寫入失敗: {e}")
+
+
+_memo_instance = None
+_memo_lock = threading.Lock()
+
+
+def get_navigation_memo():
+    """取得程序內共用的 NavigationMemo（首次呼叫時載入並註冊結束時寫回）"""
+    global _memo_instance
+    with _memo_lock:
+        if _memo_instance is None:
+            _memo_instance = NavigationMemo()
+            atexit.register(_memo_instance.flush)
+        return _memo_instance
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本機 OCR 服務 - 多個爬蟲程序共用一個已預熱的 ddddocr 模型
+
+服務端透過 Unix socket 接收驗證碼圖片，在短暫的收集視窗內合併所有工作程序的請求，
+由單一推論執行緒依序處理（並限制 onnxruntime intra-op 執行緒數，避免與 Chrome 搶 CPU）；
+客戶端 RemoteCaptchaSolver 與 CaptchaSolver 介面相同，服務無法連線時自動改用本機 OCR。
+
+訊框格式：4 位元組大端序標頭長度 + JSON 標頭 + 標頭 "size" 指定長度的圖片位元組
+"""
+
+import os
+import json
+import time
+import queue
+import socket
+import struct
+import threading
+import socketserver
+from collections import Counter, deque
+
+from .captcha_preprocess import CaptchaSolver, CaptchaEnsemble
+from .settings import get_settings
+from ..utils.windows_encoding_utils import safe_print
+
+HEADER_STRUCT = struct.Struct(">I")
+MAX_HEADER_BYTES = 64 * 1024
+MAX_PAYLOAD_BYTES = 4 * 1024 * 1024
+
+
+# ==================== 訊框協定 ====================
+
+
+def _recv_exact(sock, size):
+    """讀取剛好 size 位元組，連線關閉時回傳 None"""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 65536))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_frame(sock, header, payload=b""):
+    """傳送一個訊框（標頭會自動補上 size）"""
+    header = dict(header, size=len(payload))
+    encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    sock.sendall(HEADER_STRUCT.pack(len(encoded)) + encoded + payload)
+
+
+def recv_frame(sock):
+    """
+    接收一個訊框
+
+    Returns:
+        tuple: (標頭 dict, 圖片位元組)，連線關閉時回傳 (None, None)
+    """
+    raw_length = _recv_exact(sock, HEADER_STRUCT.size)
+    if raw_length is None:
+        return None, None
+    (length,) = HEADER_STRUCT.unpack(raw_length)
+    if length > MAX_HEADER_BYTES:
+        raise ValueError(f"OCR 服務訊框標頭過大: {length}")
+    raw_header = _recv_exact(sock, length)
+    if raw_header is None:
+        return None, None
+    header = json.loads(raw_header.decode("utf-8"))
+    size = int(header.get("size", 0))
+    if size > MAX_PAYLOAD_BYTES:
+        raise ValueError(f"OCR 服務訊框內容過大: {size}")
+    payload = _recv_exact(sock, size) if size else b""
+    if payload is None:
+        return None, None
+    return header, payload
+
+
+# ==================== onnxruntime 執行緒限制 ====================
+
+
+def limit_ocr_threads(ocr, intra_op_threads):
+    """
+    以限制 intra-op 執行緒數的 SessionOptions 重建 ddddocr 的 onnxruntime session
+
+    ddddocr 未提供設定 SessionOptions 的參數，因此找出實例上的 InferenceSession 屬性
+    並以相同模型與 providers 重建；找不到或重建失敗時保留原 session。
+
+    Returns:
+        bool: 是否成功套用
+    """
+    try:
+        import onnxruntime
+    except ImportError:
+        return False
+
+    for name, session in vars(ocr).items():
+        if not isinstance(session, onnxruntime.InferenceSession):
+            continue
+        model = getattr(session, "_model_bytes", None) or getattr(session, "_model_path", None)
+        if not model:
+            continue
+        try:
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = intra_op_threads
+            options.inter_op_num_threads = 1
+            setattr(ocr, name, onnxruntime.InferenceSession(model, options, providers=session.get_providers()))
+            return True
+        except Exception as e:
+            safe_print(f"⚠️ 無法限制 onnxruntime 執行緒數: {e}")
+            return False
+    return False
+
+
+# ==================== 服務端 ====================
+
+
+def _percentile(values, percent):
+    """以最近鄰法計算百分位數"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered) + 0.5) - 1))
+    return round(ordered[index], 1)
+
+
+class _OcrJob:
+    """排隊中的單一識別請求"""
+
+    __slots__ = ("image_bytes", "enqueued", "done", "response")
+
+    def __init__(self, image_bytes):
+        self.image_bytes = image_bytes
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.response = None
+
+
+class OcrServer:
+    """持有單一已預熱模型的 OCR 服務"""
+
+    def __init__(self, socket_path, solver=None, intra_op_threads=1, batch_window_ms=5, max_batch=16):
+        """
+        初始化 OCR 服務
+
+        Args:
+            socket_path: Unix socket 路徑
+            solver: CaptchaSolver / CaptchaEnsemble（預設依環境變數建立）
+            intra_op_threads: onnxruntime intra-op 執行緒上限
+            batch_window_ms: 收到第一個請求後繼續收集同批請求的時間（毫秒）
+            max_batch: 單批最多請求數
+        """
+        self.socket_path = socket_path
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        if solver is None:
+            solver = (CaptchaEnsemble if get_settings().captcha_ensemble else CaptchaSolver).from_env()
+        self.solver = solver
+
+        members = getattr(solver, "members", [solver])
+        limited = {id(member.ocr): limit_ocr_threads(member.ocr, intra_op_threads) for member in members}
+        self.threads_limited = all(limited.values())
+
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._latencies = {"queue_ms": deque(maxlen=1000), "infer_ms": deque(maxlen=1000), "total_ms": deque(maxlen=1000)}
+        self._batch_sizes = Counter()
+        self._counts = {"requests": 0, "errors": 0}
+        self.started_at = time.time()
+        self.intra_op_threads = intra_op_threads
+        self._server = None
+
+    def warm_up(self):
+        """以空白圖片執行一次推論，讓第一個真實請求不需負擔初始化成本"""
+        import io
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (120, 40), "white").save(buffer, format="PNG")
+        started = time.perf_counter()
+        try:
+            self.solver.classify(buffer.getvalue())
+        except Exception as e:
+            safe_print(f"⚠️ OCR 模型預熱失敗: {e}")
+        return (time.perf_counter() - started) * 1000
+
+    def submit(self, image_bytes, timeout=30):
+        """將請求放入佇列並等待推論執行緒回覆"""
+        job = _OcrJob(image_bytes)
+        self._queue.put(job)
+        if not job.done.wait(timeout):
+            return {"ok": False, "error": "OCR 服務處理逾時"}
+        return job.response
+
+    def _dispatch_loop(self):
+        """推論執行緒：收集同一視窗內的請求後依序識別"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        """識別一批請求並記錄延遲"""
+        with self._stats_lock:
+            self._batch_sizes[len(batch)] += 1
+        for job in batch:
+            started = time.perf_counter()
+            try:
+                result = self.solver.classify(job.image_bytes)
+                response = {"ok": True, "result": result}
+                vote_info = getattr(self.solver, "last_vote", None)
+                if vote_info:
+                    response["vote"] = {"confidence": vote_info["confidence"], "candidates": vote_info["candidates"]}
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            finished = time.perf_counter()
+
+            queue_ms = (started - job.enqueued) * 1000
+            infer_ms = (finished - started) * 1000
+            response.update({"queue_ms": round(queue_ms, 1), "infer_ms": round(infer_ms, 1), "batch_size": len(batch)})
+            with self._stats_lock:
+                self._counts["requests"] += 1
+                self._counts["errors"] += not response["ok"]
+                self._latencies["queue_ms"].append(queue_ms)
+                self._latencies["infer_ms"].append(infer_ms)
+                self._latencies["total_ms"].append(queue_ms + infer_ms)
+            job.response = response
+            job.done.set()
+
+    def get_stats(self):
+        """服務統計：請求數、佇列 / 推論 / 總延遲百分位數、批次大小分佈"""
+        with self._stats_lock:
+            latencies = {name: list(values) for name, values in self._latencies.items()}
+            stats = {
+                "config": self.solver.describe(),
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "intra_op_threads": self.intra_op_threads,
+                "threads_limited": self.threads_limited,
+                "requests": self._counts["requests"],
+                "errors": self._counts["errors"],
+                "queue_depth": self._queue.qsize(),
+                "batch_sizes": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+            }
+        for name, values in latencies.items():
+            stats[name] = {
+                "mean": round(sum(values) / len(values), 1) if values else None,
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "p99": _percentile(values, 99),
+            }
+        return stats
+
+    def serve_forever(self):
+        """啟動推論執行緒並開始接受連線（阻塞直到 shutdown）"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        service = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                # 每個連線可連續送出多個請求（客戶端保持連線以省去重新連線成本）
+                while True:
+                    try:
+                        header, payload = recv_frame(self.request)
+                    except (OSError, ValueError):
+                        return
+                    if header is None:
+                        return
+                    op = header.get("op")
+                    if op == "solve":
+                        response = service.submit(payload)
+                    elif op == "stats":
+                        response = {"ok": True, "stats": service.get_stats()}
+                    elif op == "ping":
+                        response = {"ok": True}
+                    else:
+                        response = {"ok": False, "error": f"未知的操作: {op}"}
+                    try:
+                        send_frame(self.request, response)
+                    except OSError:
+                        return
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        threading.Thread(target=self._dispatch_loop, name="ocr-dispatch", daemon=True).start()
+        self._server = Server(self.socket_path, Handler)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self):
+        """停止接受連線"""
+        if self._server:
+            self._server.shutdown()
+
+
+# ==================== 客戶端 ====================
+
+
+def request_stats(socket_path, timeout=5):
+    """查詢執行中 OCR 服務的統計"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        send_frame(sock, {"op": "stats"})
+        header, _ = recv_frame(sock)
+    if not header or not header.get("ok"):
+        raise RuntimeError((header or {}).get("error", "OCR 服務未回應"))
+    return header["stats"]
+
+
+class RemoteCaptchaSolver(CaptchaSolver):
+    """
+    透過 OCR 服務識別的 CaptchaSolver（介面與本機識別器相同）
+
+    服務無法連線或回應錯誤時，改用本機 CaptchaSolver.from_env()（首次需要時才載入模型）。
+    """
+
+    def __init__(self, socket_path, timeout=10, settings=None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.settings = settings or get_settings()
+        self.stages, self.ranges, self.beta, self.ocr = [], None, False, None
+        self.last_vote = None
+        self.min_confidence = self.settings.captcha_ensemble_min_confidence
+        self._sock = None
+        self._lock = threading.Lock()
+        self._local = None
+        self.stats = {
+            "solves": 0,
+            "total_ms": 0.0,
+            "logins": 0,
+            "first_try_logins": 0,
+            "refreshes": 0,
+            "remote": 0,
+            "fallbacks": 0,
+            "queue_ms": 0.0,
+            "infer_ms": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls, settings=None):
+        """依 OCR_SERVICE_SOCKET / OCR_SERVICE_TIMEOUT 建立（settings 未提供時為 get_settings()）"""
+        settings = settings or get_settings()
+        return cls(settings.ocr_service_socket, timeout=settings.ocr_service_timeout, settings=settings)
+
+    def describe(self):
+        """設定摘要（用於日誌與報告）"""
+        return f"ocr-service({self.socket_path})"
+
+    def _connect(self):
+        """建立（或沿用）與服務的連線"""
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._sock = sock
+        return self._sock
+
+    def _disconnect(self):
+        """關閉連線（下次請求時重新連線）"""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def _request(self, image_bytes):
+        """送出識別請求；既有連線失效時重新連線一次"""
+        with self._lock:
+            for retry in range(2):
+                try:
+                    sock = self._connect()
+                    send_frame(sock, {"op": "solve"}, image_bytes)
+                    header, _ = recv_frame(sock)
+                    if header is None:
+                        raise ConnectionError("OCR 服務關閉連線")
+                    return header
+                except (OSError, ValueError):
+                    self._disconnect()
+                    if retry:
+                        raise
+
+    def _local_solver(self):
+        """本機備援識別器（延遲載入）"""
+        if self._local is None:
+            safe_print("⚠️ OCR 服務無法使用，改用本機 ddddocr")
+            self._local = CaptchaSolver.from_env(self.settings)
+            self.ocr = self._local.ocr
+        return self._local
+
+    def classify(self, image_bytes):
+        """透過服務識別，失敗時改用本機識別"""
+        self.last_vote = None
+        try:
+            response = self._request(image_bytes)
+            if not response.get("ok"):
+                raise RuntimeError(response.get("error"))
+        except Exception as e:
+            safe_print(f"⚠️ OCR 服務請求失敗: {e}")
+            self.stats["fallbacks"] += 1
+            return self._local_solver().classify(image_bytes)
+
+        self.stats["remote"] += 1
+        self.stats["queue_ms"] += response.get("queue_ms", 0.0)
+        self.stats["infer_ms"] += response.get("infer_ms", 0.0)
+        vote_info = response.get("vote")
+        if vote_info:
+            self.last_vote = {"text": response.get("result") or "", **vote_info}
+        return response.get("result")
+
+    def is_confident(self):
+        """服務使用投票識別時依信心分數判斷，否則一律視為可信"""
+        if not self.last_vote:
+            return True
+        return bool(self.last_vote["text"] and self.last_vote["confidence"] >= self.min_confidence)
+
+    def get_stats(self):
+        """識別統計：另含服務請求數、備援次數與平均佇列 / 推論延遲"""
+        stats = super().get_stats()
+        remote = self.stats["remote"]
+        stats.update(
+            {
+                "remote_solves": remote,
+                "fallbacks": self.stats["fallbacks"],
+                "mean_queue_ms": round(self.stats["queue_ms"] / remote, 1) if remote else None,
+                "mean_infer_ms": round(self.stats["infer_ms"] / remote, 1) if remote else None,
+            }
+        )
+        return stats
+
+    def close(self):
+        """關閉與服務的連線"""
+        with self._lock:
+            self._disconnect()
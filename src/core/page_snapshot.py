@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+頁面原始碼快照 - 同一次導航內重複的關鍵字檢查只傳輸一次 DOM
+
+瀏覽器端以 MutationObserver 維護每個文件的 token 與 DOM 變更計數；
+token 或計數改變（換頁、框架切換、AJAX 更新）時才重新抓取原始碼。
+"""
+
+# 探測目前文件的 token / DOM 版本 / URL；首次呼叫時安裝 MutationObserver
+# arguments[0] 為已快取快照的 {token, version, url}，仍相符時不回傳 outerHTML（只需一次小型往返）
+SNAPSHOT_PROBE_JS = r"""
+var w = window, state = w.__tcatSnapshot, known = arguments[0];
+if (!state) {
+    state = w.__tcatSnapshot = {token: Date.now().toString(36) + Math.random().toString(36).slice(2), version: 0, observer: null};
+    try {
+        state.observer = new MutationObserver(function () { state.version++; });
+        state.observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    } catch (e) {
+        state.version = -1;
+    }
+}
+if (state.observer && state.observer.takeRecords().length) state.version++;
+var result = {token: state.token, version: state.version, url: location.href};
+var unchanged = known && state.version !== -1 && known.token === state.token
+    && known.version === state.version && known.url === location.href;
+if (!unchanged) result.source = document.documentElement ? document.documentElement.outerHTML : '';
+return result;
+"""
+
+
+class PageSnapshot:
+    """單次擷取的頁面原始碼與 URL，提供本地關鍵字掃描與 BeautifulSoup 解析"""
+
+    def __init__(self, source, url, token=None, version=None, epoch=0):
+        self.source = source or ""
+        self.url = url or ""
+        self.token = token
+        self.version = version
+        self.epoch = epoch
+        self._soup = None
+
+    def probe_key(self):
+        """傳給 SNAPSHOT_PROBE_JS 的快照識別（無法追蹤 DOM 版本時回傳 None 強制重新抓取）"""
+        if self.token is None or self.version == -1:
+            return None
+        return {"token": self.token, "version": self.version, "url": self.url}
+
+    def contains_any(self, keywords):
+        """回傳出現在頁面原始碼中的關鍵字清單（依傳入順序）"""
+        return [keyword for keyword in keywords if keyword in self.source]
+
+    def url_contains_any(self, keywords):
+        """回傳出現在 URL 中的關鍵字清單"""
+        return [keyword for keyword in keywords if keyword in self.url]
+
+    @property
+    def soup(self):
+        """延遲解析的 BeautifulSoup 樹，供本地查詢元素而不需額外 WebDriver 往返"""
+        if self._soup is None:
+            from bs4 import BeautifulSoup
+
+            self._soup = BeautifulSoup(self.source, "html.parser")
+        return self._soup
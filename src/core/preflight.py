@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+啟動前網站探測（preflight）- 在啟動 Chrome 之前以 HTTP GET 探測登入頁
+
+分段量測 DNS 解析、TCP 連線、TLS 交握與 TTFB（送出請求到收到回應狀態列），
+網站無法使用時不必先花數秒（含重試）啟動 Chrome；量到的延遲也用來設定導航歷史累積前的初始頁面載入逾時。
+SiteProbe 保留 keep-alive 連線，斷路器之後的探測會重用同一條連線。
+"""
+
+import ssl
+import time
+import socket
+import threading
+import http.client
+from dataclasses import replace
+from urllib.parse import urlsplit
+
+from ..utils.windows_encoding_utils import safe_print
+
+
+# 由探測延遲推算初始頁面載入逾時：總耗時 × 倍數，不低於設定值的一半（單次 GET 只能粗估整頁載入）
+PAGE_LOAD_TIMEOUT_FACTOR = 30
+PAGE_LOAD_TIMEOUT_MIN_RATIO = 0.5
+
+
+class SiteProbe:
+    """連線池化的 HTTP 探測（保留 keep-alive 連線供後續探測重用）"""
+
+    def __init__(self, url, timeout=10):
+        parts = urlsplit(url)
+        self.url = url
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.https else 80)
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += "?" + parts.query
+        self.timeout = timeout
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self, timings):
+        """建立新連線並記錄 DNS / TCP / TLS 各段耗時"""
+        started = time.perf_counter()
+        addresses = socket.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)
+        resolved = time.perf_counter()
+        timings["dns_ms"] = round((resolved - started) * 1000, 1)
+
+        sock, last_error = None, None
+        for family, sock_type, proto, _, address in addresses:
+            sock = socket.socket(family, sock_type, proto)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(address)
+                timings["address"] = address[0]
+                break
+            except OSError as e:
+                sock.close()
+                sock, last_error = None, e
+        if sock is None:
+            raise last_error or OSError(f"無法解析 {self.host}")
+        connected = time.perf_counter()
+        timings["connect_ms"] = round((connected - resolved) * 1000, 1)
+
+        if self.https:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+            timings["tls_ms"] = round((time.perf_counter() - connected) * 1000, 1)
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        # 交給 http.client 使用已建立的連線（sock 不為 None 時不會重新連線）
+        conn.sock = sock
+        return conn
+
+    def probe(self):
+        """
+        GET 探測 URL（重用既有連線時 DNS / TCP / TLS 皆為 0）
+
+        Returns:
+            dict: ok、status、reused、dns_ms、connect_ms、tls_ms、ttfb_ms、total_ms，失敗時含 error
+        """
+        with self._lock:
+            result = self._probe_once()
+            if not result["ok"] and result.get("reused") and "status" not in result:
+                # keep-alive 連線可能已被伺服器關閉，改用新連線再試一次
+                result = self._probe_once()
+            return result
+
+    def _probe_once(self):
+        timings = {"dns_ms": 0.0, "connect_ms": 0.0, "tls_ms": 0.0}
+        reused = self._conn is not None
+        started = time.perf_counter()
+        try:
+            if not reused:
+                self._conn = self._connect(timings)
+            request_started = time.perf_counter()
+            self._conn.request("GET", self.path, headers={"User-Agent": "SeleniumTCat-preflight"})
+            response = self._conn.getresponse()
+            timings["ttfb_ms"] = round((time.perf_counter() - request_started) * 1000, 1)
+            # 讀完回應內容，連線才能重用
+            response.read()
+            if response.will_close:
+                self.close()
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            return {"ok": False, "reused": reused, "error": str(e) or type(e).__name__, **timings}
+        timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return {"ok": response.status < 500, "status": response.status, "reused": reused, **timings}
+
+    def close(self):
+        """關閉保留的連線"""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+def describe(result):
+    """單行探測摘要"""
+    if "status" not in result:
+        return f"無法連線: {result.get('error')}"
+    return (
+        f"HTTP {result['status']}，DNS {result['dns_ms']:.0f} ms / 連線 {result['connect_ms']:.0f} ms / "
+        f"TLS {result['tls_ms']:.0f} ms / TTFB {result['ttfb_ms']:.0f} ms"
+    )
+
+
+def run_preflight(site_probe):
+    """啟動 Chrome 前探測網站並輸出各段耗時"""
+    safe_print(f"🛫 啟動前探測: {site_probe.url}")
+    result = site_probe.probe()
+    if result["ok"]:
+        safe_print(f"✅ 網站可用（{describe(result)}）")
+    else:
+        safe_print(f"⚠️ 網站無法使用（{describe(result)}）")
+    return result
+
+
+def seed_timeouts(settings, result):
+    """
+    依探測耗時設定初始頁面載入逾時（只會縮短，不低於設定值的一半）
+
+    只在導航延遲歷史樣本不足時使用；設定值（browser_page_load_timeout）仍是上限，
+    歷史累積後依實際導航耗時推算，網站變慢時可放寬回設定值。
+
+    Returns:
+        Settings: 調整後的設定（探測失敗或不需縮短時原樣回傳）
+    """
+    if not result.get("ok"):
+        return settings
+    ceiling = settings.browser_page_load_timeout
+    page_load_timeout = max(ceiling * PAGE_LOAD_TIMEOUT_MIN_RATIO, result["total_ms"] / 1000 * PAGE_LOAD_TIMEOUT_FACTOR)
+    page_load_timeout = round(min(ceiling, page_load_timeout))
+    if page_load_timeout >= ceiling:
+        return settings
+    safe_print(f"⏱️ 依探測延遲將初始頁面載入逾時設為 {page_load_timeout} 秒（設定值 {ceiling:g} 秒，導航歷史累積後改依歷史推算）")
+    return replace(settings, browser_initial_page_load_timeout=page_load_timeout)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+執行日誌（checkpoint journal）- 記錄多帳號執行的進度，讓中斷的執行可以 --resume 續跑
+
+每次執行一個只追加的 JSON Lines 檔（journal/<時間>_<功能>.jsonl），每筆寫入後立即 fsync，
+程序被 OOM 終止、重開機或 Ctrl-C 時已完成的帳號、期間與下載檔案都不會遺失。
+"""
+
+import os
+import json
+from datetime import datetime
+from pathlib import Path
+
+from .settings import get_settings
+from ..utils.windows_encoding_utils import safe_print
+
+
+# 寫入執行日誌的 StepRecorder 事件 → 記錄類型
+JOURNALED_EVENTS = {
+    "download.file": "file",
+    "download.period": "period",
+    "download.invoice": "invoice",
+}
+
+
+class RunJournal:
+    """單次多帳號執行的進度日誌"""
+
+    def __init__(self, path, function_name, scraper_kwargs=None):
+        self.path = Path(path)
+        self.function_name = function_name
+        self.scraper_kwargs = dict(scraper_kwargs or {})
+        # 已完成帳號的結果（帳號 → 結果 dict，含下載檔案）
+        self.completed = {}
+        self.resumed = False
+        self.finished = False
+        # 中斷時最後一行可能只寫了一半，續寫前需先換行
+        self._torn_tail = False
+
+    # ==================== 建立 / 續跑 ====================
+
+    @classmethod
+    def start(cls, function_name, scraper_kwargs, usernames):
+        """開始新的執行日誌"""
+        journal_dir = Path(get_settings().run_journal_dir)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        journal = cls(journal_dir / f"{timestamp}_{function_name}.jsonl", function_name, scraper_kwargs)
+        journal._append(
+            {
+                "type": "run_start",
+                "function": function_name,
+                "scraper_kwargs": journal.scraper_kwargs,
+                "accounts": list(usernames),
+            }
+        )
+        return journal
+
+    @classmethod
+    def find_resumable(cls, function_name):
+        """
+        找出同一功能最近一次未正常結束（沒有 run_end 記錄）的執行日誌
+
+        Returns:
+            RunJournal: 已載入進度的日誌，找不到時回傳 None
+        """
+        journal_dir = Path(get_settings().run_journal_dir)
+        if not journal_dir.exists():
+            return None
+        for path in sorted(journal_dir.glob(f"*_{function_name}.jsonl"), reverse=True):
+            journal = cls.load(path)
+            if journal is None:
+                continue
+            if journal.finished:
+                # 最近一次已正常結束，沒有需要續跑的執行
+                return None
+            return journal
+        return None
+
+    @classmethod
+    def load(cls, path):
+        """讀取執行日誌（忽略中斷時寫了一半的最後一行）"""
+        journal = None
+        finished = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return None
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            kind = record.get("type")
+            if kind == "run_start":
+                journal = cls(path, record.get("function"), record.get("scraper_kwargs"))
+            elif journal is None:
+                continue
+            elif kind == "account_done":
+                journal.completed[record["username"]] = record["result"]
+            elif kind == "run_end":
+                finished = True
+
+        if journal is not None:
+            journal.finished = finished
+            journal._torn_tail = bool(lines) and not lines[-1].endswith("\n")
+        return journal
+
+    def mark_resumed(self):
+        """記錄續跑開始"""
+        self.resumed = True
+        self._append({"type": "resume", "completed_accounts": len(self.successful_accounts())})
+
+    # ==================== 記錄 ====================
+
+    def _append(self, record):
+        """追加一筆記錄並立即寫入磁碟"""
+        record = {"time": datetime.now().isoformat(timespec="seconds"), **record}
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        if self._torn_tail:
+            line = "\n" + line
+            self._torn_tail = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            safe_print(f"⚠️ 執行日誌寫入失敗: {e}")
+
+    def account_started(self, username):
+        """記錄帳號開始處理"""
+        self._append({"type": "account_start", "username": username})
+
+    def on_step_record(self, record):
+        """StepRecorder 監聽回呼：記錄每個搬移完成的檔案，以及完成的期間（對帳單）/ 發票（運費）"""
+        if record["type"] != "event" or record["name"] not in JOURNALED_EVENTS:
+            return
+        self._append({"type": JOURNALED_EVENTS[record["name"]], "username": record["account"], **record["attrs"]})
+
+    def account_done(self, username, result):
+        """記錄帳號處理完成（result 為可序列化的結果，含期間與下載檔案）"""
+        self.completed[username] = result
+        self._append({"type": "account_done", "username": username, "success": result["success"], "result": result})
+
+    def finish(self, summary=None):
+        """記錄執行正常結束（之後不會再被 --resume 選中）"""
+        self.finished = True
+        self._append({"type": "run_end", **(summary or {})})
+
+    # ==================== 查詢 ====================
+
+    def successful_accounts(self):
+        """已成功完成的帳號（續跑時略過）"""
+        return {username: result for username, result in self.completed.items() if result.get("success")}
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+抓取進度 - 將單一帳號的流程拆成明確的階段（登入 → 導航 → 列出工作項目 → 逐項下載）並持久化進度
+
+MultiAccountManager 重試帳號時沿用同一份進度：登入與導航一定重做（新瀏覽器沒有 session），
+但已完成的工作項目（運費的發票、對帳單的期間）不會重新下載，從失敗的項目續跑。
+進度檔放在執行日誌旁（journal/<執行>/<帳號>.progress.json），--resume 時也會沿用。
+"""
+
+import os
+import re
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .errors import BrowserCrash
+from ..utils.windows_encoding_utils import safe_print
+
+
+# 流程階段（依序）
+STAGES = ("login", "navigate", "enumerate", "download")
+
+
+class WorkItemInterrupted(BrowserCrash):
+    """處理工作項目時瀏覽器失效，交由 MultiAccountManager 以新瀏覽器重試並從此項目續跑"""
+
+    def __init__(self, item, cause=None):
+        self.item = item
+        self.cause = cause
+        super().__init__(f"處理 {item} 時瀏覽器失效: {cause}" if cause else f"處理 {item} 時瀏覽器失效")
+
+
+class ScrapeProgress:
+    """單一帳號的階段與工作項目進度（path 為 None 時只保存在記憶體）"""
+
+    def __init__(self, username, path=None):
+        self.username = username
+        self.path = Path(path) if path else None
+        self.stage = None
+        self.attempts = 0
+        # 列出的工作項目（依頁面順序）與已完成的項目（項目 → 下載檔案清單）
+        self.items = []
+        self.done = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_account(cls, journal, username):
+        """
+        建立（或載入既有的）帳號進度，進度檔放在執行日誌旁
+
+        Args:
+            journal: RunJournal（None 時只保存在記憶體）
+            username: 帳號
+        """
+        if journal is None:
+            return cls(username)
+        safe_name = re.sub(r"[^\w.-]", "_", username)
+        progress = cls(username, journal.path.with_suffix("") / f"{safe_name}.progress.json")
+        progress._load()
+        return progress
+
+    def _load(self):
+        """讀取進度檔，檔案不存在或損毀時從頭開始"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            safe_print(f"⚠️ 抓取進度讀取失敗，將從頭開始: {e}")
+            return
+        self.stage = data.get("stage")
+        self.attempts = data.get("attempts", 0)
+        self.items = list(data.get("items", []))
+        self.done = dict(data.get("done", {}))
+        if self.done:
+            safe_print(f"♻️ 帳號 {self.username} 已完成 {len(self.done)} 個工作項目，將從中斷處續跑")
+
+    def _save(self):
+        """以暫存檔 + os.replace 原子寫入進度檔"""
+        if self.path is None:
+            return
+        data = {
+            "username": self.username,
+            "stage": self.stage,
+            "attempts": self.attempts,
+            "items": self.items,
+            "done": self.done,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            safe_print(f"⚠️ 抓取進度寫入失敗: {e}")
+
+    # ==================== 階段 ====================
+
+    def start_attempt(self):
+        """開始一次帳號嘗試（每次重試都會呼叫）"""
+        with self._lock:
+            self.attempts += 1
+            if self.attempts > 1 and self.done:
+                safe_print(f"♻️ 第 {self.attempts} 次嘗試，略過已完成的 {len(self.done)} 個工作項目")
+            self._save()
+
+    def enter(self, stage):
+        """進入流程階段"""
+        if stage not in STAGES:
+            raise ValueError(f"未知的流程階段: {stage}")
+        with self._lock:
+            self.stage = stage
+            self._save()
+
+    # ==================== 工作項目 ====================
+
+    def set_items(self, items):
+        """記錄列出的工作項目（重試時以最新列出的清單為準，已完成的記錄保留）"""
+        with self._lock:
+            self.stage = "download"
+            self.items = list(items)
+            self._save()
+
+    def is_done(self, item):
+        """工作項目是否已完成"""
+        return item in self.done
+
+    def mark_done(self, item, files):
+        """標記工作項目完成並立即寫入進度"""
+        with self._lock:
+            self.done[item] = [str(f) for f in files]
+            self._save()
+
+    def pending_items(self):
+        """尚未完成的工作項目"""
+        return [item for item in self.items if item not in self.done]
+
+    def downloaded_files(self):
+        """所有已完成項目的下載檔案（含先前嘗試下載的）"""
+        return [f for item in self.items if item in self.done for f in self.done[item]]
+
+    def discard(self):
+        """帳號完成後刪除進度檔"""
+        if self.path is None:
+            return
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            safe_print(f"⚠️ 抓取進度刪除失敗: {e}")
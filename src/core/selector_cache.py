@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+跨執行持久化的定位器 / URL 學習快取
+
+記錄每個頁面（以 URL 路徑樣式為鍵）上實際命中的定位器或導航 URL，
+下次查找時優先嘗試上次的勝出者；勝出者連續落空數次後會被降級。
+"""
+
+import os
+import json
+import atexit
+import threading
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+from .settings import get_settings
+from ..utils.windows_encoding_utils import safe_print
+
+
+def page_pattern(url):
+    """
+    將 URL 轉為頁面樣式鍵（路徑最後一段、小寫、不含查詢字串）
+
+    Example:
+        page_pattern("https://host/YMTContract/aspx/Login.aspx?x=1") -> "login.aspx"
+    """
+    if not url:
+        return "/"
+    path = urlparse(url).path.rstrip("/")
+    return path.rsplit("/", 1)[-1].lower() or "/"
+
+
+def locator_key(locator):
+    """將 (By, value[, nth]) 轉為穩定的字串識別，不受程式中候選順序調整影響"""
+    key = f"{locator[0]}={locator[1]}"
+    if len(locator) > 2 and locator[2] is not None:
+        key += f"#{locator[2]}"
+    return key
+
+
+def group_key(group):
+    """將定位器群組轉為穩定的字串識別"""
+    return " + ".join(locator_key(loc) for loc in group)
+
+
+class SelectorCache:
+    """定位器 / 導航 URL 的勝出者快取（JSON 檔案持久化）"""
+
+    def __init__(self, path=None, demote_after=3):
+        """
+        初始化快取
+
+        Args:
+            path: 快取檔案路徑（預設讀取 SELECTOR_CACHE_FILE，否則 cache/selector_cache.json）
+            demote_after: 勝出者連續落空幾次後改用新的勝出者
+        """
+        self.path = Path(path or get_settings().selector_cache_file)
+        self.demote_after = demote_after
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = self._load()
+
+    def _load(self):
+        """讀取快取檔案，檔案不存在或損毀時回傳空快取"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entries = data.get("entries", {})
+            return entries if isinstance(entries, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            safe_print(f"⚠️ 定位器快取讀取失敗，將重新學習: {e}")
+            return {}
+
+    # ==================== 查詢 ====================
+
+    def winner(self, pattern, slot):
+        """回傳指定頁面樣式與欄位的勝出者識別，沒有時回傳 None"""
+        entry = self._entries.get(f"{pattern}::{slot}")
+        return entry.get("winner") if entry else None
+
+    def order(self, pattern, slot, candidates, key_fn=str):
+        """
+        依快取結果重新排序候選清單：勝出者排第一，其餘保持原順序
+
+        Args:
+            pattern: 頁面樣式鍵
+            slot: 欄位名稱（例如 "freight_direct_url"）
+            candidates: 候選清單
+            key_fn: 候選項轉為識別字串的函式
+
+        Returns:
+            list: 重新排序後的候選清單
+        """
+        candidates = list(candidates)
+        winner = self.winner(pattern, slot)
+        if winner is not None:
+            for i, candidate in enumerate(candidates):
+                if key_fn(candidate) == winner:
+                    return [candidate] + candidates[:i] + candidates[i + 1 :]
+        return candidates
+
+    def hints(self, slot, candidate_keys):
+        """
+        回傳所有頁面樣式上此欄位勝出者在候選清單中的索引
+
+        供瀏覽器端腳本依當下 location 選用，不需額外查詢 current_url。
+
+        Returns:
+            dict: {頁面樣式: 候選索引}
+        """
+        suffix = f"::{slot}"
+        result = {}
+        for key, entry in self._entries.items():
+            if key.endswith(suffix) and entry.get("winner") in candidate_keys:
+                result[key[: -len(suffix)]] = candidate_keys.index(entry["winner"])
+        return result
+
+    # ==================== 記錄 ====================
+
+    def record_hit(self, pattern, slot, candidate_key):
+        """
+        記錄某候選項命中
+
+        命中的是勝出者時累計命中次數；命中的是其他候選項時，勝出者計一次落空，
+        連續落空達 demote_after 次（或尚無勝出者）即由此候選項取代。
+        """
+        key = f"{pattern}::{slot}"
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.get("winner"):
+                entry = {"winner": candidate_key, "hits": 0, "misses": 0, "consecutive_misses": 0}
+                self._entries[key] = entry
+
+            if entry["winner"] == candidate_key:
+                entry["hits"] += 1
+                entry["consecutive_misses"] = 0
+            else:
+                entry["misses"] += 1
+                entry["consecutive_misses"] += 1
+                if entry["consecutive_misses"] >= self.demote_after:
+                    safe_print(f"♻️ 定位器快取降級: {key} {entry['winner']} → {candidate_key}")
+                    entry.update({"winner": candidate_key, "hits": 1, "misses": 0, "consecutive_misses": 0})
+
+            total = entry["hits"] + entry["misses"]
+            entry["hit_rate"] = round(entry["hits"] / total, 3) if total else 0.0
+            entry["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            self._dirty = True
+
+    def flush(self):
+        """將變更寫回快取檔案（無變更時不寫入）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"version": 1, "entries": self._entries}, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except Exception as e:
+                safe_print(f"⚠️ 定位器快取寫入失敗: {e}")
+
+
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+
+def get_selector_cache():
+    """取得程序內共用的 SelectorCache（首次呼叫時載入並註冊結束時寫回）"""
+    global _cache_instance
+    with _cache_lock:
+        if _cache_instance is None:
+            _cache_instance = SelectorCache()
+            atexit.register(_cache_instance.flush)
+        return _cache_instance
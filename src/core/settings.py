@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+執行設定 - 啟動時讀取 .env 與環境變數一次，解析並驗證為不可變的 Settings
+
+所有模組透過 get_settings() 取得同一份設定；新的效能參數（執行緒數、逾時等）也統一在這裡定義。
+明確傳入的建構參數仍優先於設定值。
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+# 下載目錄相關環境變數的後綴（例如 PAYMENT_DOWNLOAD_WORK_DIR / PAYMENT_DOWNLOAD_OK_DIR）
+DOWNLOAD_DIR_SUFFIXES = ("_DOWNLOAD_WORK_DIR", "_DOWNLOAD_OK_DIR")
+MAIL_ENCRYPTIONS = ("tls", "ssl", "none")
+
+
+class SettingsError(ValueError):
+    """設定值格式錯誤（一次列出所有錯誤）"""
+
+
+@dataclass(frozen=True)
+class Settings:
+    """解析後的執行設定"""
+
+    # 瀏覽器
+    headless: bool = True
+    chrome_binary_path: Optional[str] = None
+    chromedriver_path: Optional[str] = None
+    chromedriver_cache_file: str = os.path.join("cache", "chromedriver_path.txt")
+    browser_init_retries: int = 3
+    browser_page_load_timeout: float = 60
+    # 啟動前探測推算的初始頁面載入逾時（非環境變數；導航延遲歷史樣本足夠後改依歷史推算，上限仍為 browser_page_load_timeout）
+    browser_initial_page_load_timeout: Optional[float] = None
+    browser_script_timeout: float = 30
+    browser_wait_timeout: float = 10
+
+    # 登入與驗證碼
+    fast_login: bool = True
+    captcha_network_capture: bool = False
+    captcha_preprocess: Tuple[str, ...] = ()
+    captcha_ocr_ranges: Optional[object] = None
+    captcha_ocr_beta: bool = False
+    captcha_ensemble: bool = False
+    captcha_ensemble_min_confidence: float = 0.67
+    captcha_corpus_dir: Optional[str] = None
+    ocr_service_socket: Optional[str] = None
+    ocr_service_timeout: float = 10
+    ocr_service_threads: int = 1
+
+    # 下載目錄（*_DOWNLOAD_WORK_DIR / *_DOWNLOAD_OK_DIR）
+    download_dirs: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+
+    # 快取
+    selector_cache_file: str = os.path.join("cache", "selector_cache.json")
+    navigation_memo_file: str = os.path.join("cache", "navigation_memo.json")
+    latency_history_file: str = os.path.join("cache", "latency_history.json")
+
+    # 自適應逾時（由步驟延遲歷史的 p99 推算）
+    adaptive_timeouts: bool = True
+    adaptive_timeout_factor: float = 3.0
+    adaptive_timeout_floor: float = 5
+    adaptive_timeout_min_samples: int = 20
+    adaptive_timeout_window: int = 200
+
+    # 日誌與觀測
+    log_flush_interval: float = 2
+    run_journal_dir: str = "journal"
+    trace_export_dir: Optional[str] = None
+    metrics_port: Optional[int] = None
+    metrics_textfile: Optional[str] = None
+    metrics_textfile_interval: float = 15
+
+    # 通知
+    discord_webhook_url: Optional[str] = None
+    mail_host: Optional[str] = None
+    mail_port: int = 587
+    mail_username: Optional[str] = None
+    mail_password: Optional[str] = None
+    mail_encryption: str = "tls"
+    mail_from_address: Optional[str] = None
+    mail_to_address: Optional[str] = None
+    mail_idle_timeout: float = 60
+    notify_workers: int = 4
+    notify_queue_size: int = 32
+    notify_max_attempts: int = 4
+    notify_drain_timeout: float = 60
+    notify_dead_letter: str = os.path.join("logs", "notifications_dead_letter.jsonl")
+
+    # 啟動前探測、網站斷路器與重試預算
+    preflight: bool = True
+    preflight_seed_timeouts: bool = True
+    circuit_failure_threshold: int = 3
+    circuit_cooldown: float = 120
+    circuit_max_pauses: int = 2
+    circuit_probe_timeout: float = 10
+    run_retry_budget: int = 10
+
+    def download_dir(self, env_key, default=None):
+        """取得下載目錄設定（env_key 為 scraper 的 DOWNLOAD_DIR_ENV_KEY / DOWNLOAD_OK_DIR_ENV_KEY）"""
+        return self.download_dirs.get(env_key, default)
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """
+        由環境變數解析設定
+
+        Args:
+            environ: 環境變數 dict（預設 os.environ）
+
+        Raises:
+            SettingsError: 任何設定值格式錯誤時（訊息列出所有錯誤）
+        """
+        env = os.environ if environ is None else environ
+        errors = []
+
+        def text(name, default=None):
+            value = env.get(name)
+            if value is None:
+                return default
+            # 清理可能的格式問題（移除開頭的 = 或引號）
+            value = value.strip().lstrip("=").strip('"').strip("'")
+            return value or default
+
+        def flag(name, default):
+            value = text(name)
+            return default if value is None else value.lower() == "true"
+
+        def number(name, default, kind=float, minimum=0):
+            value = text(name)
+            if value is None:
+                return default
+            try:
+                parsed = kind(value)
+            except ValueError:
+                errors.append(f"{name}={value!r} 不是有效的{'整數' if kind is int else '數字'}")
+                return default
+            if parsed < minimum:
+                errors.append(f"{name}={value!r} 不可小於 {minimum}")
+                return default
+            return parsed
+
+        ranges = text("CAPTCHA_OCR_RANGES")
+        if ranges is not None and ranges.isdigit():
+            ranges = int(ranges)
+
+        encryption = (text("MAIL_ENCRYPTION") or "tls").lower()
+        if encryption not in MAIL_ENCRYPTIONS:
+            errors.append(f"MAIL_ENCRYPTION={encryption!r} 必須是 {' / '.join(MAIL_ENCRYPTIONS)}")
+            encryption = "tls"
+
+        captcha_preprocess = tuple(s.strip() for s in (text("CAPTCHA_PREPROCESS") or "").split(",") if s.strip())
+        if captcha_preprocess:
+            # 有設定時才載入前處理模組（numpy / Pillow）
+            from .captcha_preprocess import PREPROCESS_STAGES
+
+            unknown = [stage for stage in captcha_preprocess if stage not in PREPROCESS_STAGES]
+            if unknown:
+                errors.append(
+                    f"CAPTCHA_PREPROCESS 含未知的步驟 {', '.join(unknown)}（可用: {', '.join(PREPROCESS_STAGES)}）"
+                )
+                captcha_preprocess = ()
+
+        download_dirs = {
+            key: text(key) for key in env if key.endswith(DOWNLOAD_DIR_SUFFIXES) and text(key) is not None
+        }
+
+        settings = cls(
+            headless=flag("HEADLESS", True),
+            chrome_binary_path=text("CHROME_BINARY_PATH"),
+            chromedriver_path=text("CHROMEDRIVER_PATH"),
+            chromedriver_cache_file=text("CHROMEDRIVER_CACHE_FILE", cls.chromedriver_cache_file),
+            browser_init_retries=number("BROWSER_INIT_RETRIES", 3, int, minimum=1),
+            browser_page_load_timeout=number("BROWSER_PAGE_LOAD_TIMEOUT", 60.0),
+            browser_script_timeout=number("BROWSER_SCRIPT_TIMEOUT", 30.0),
+            browser_wait_timeout=number("BROWSER_WAIT_TIMEOUT", 10.0),
+            fast_login=flag("FAST_LOGIN", True),
+            captcha_network_capture=flag("CAPTCHA_NETWORK_CAPTURE", False),
+            captcha_preprocess=captcha_preprocess,
+            captcha_ocr_ranges=ranges,
+            captcha_ocr_beta=flag("CAPTCHA_OCR_BETA", False),
+            captcha_ensemble=flag("CAPTCHA_ENSEMBLE", False),
+            captcha_ensemble_min_confidence=number("CAPTCHA_ENSEMBLE_MIN_CONFIDENCE", 0.67),
+            captcha_corpus_dir=text("CAPTCHA_CORPUS_DIR"),
+            ocr_service_socket=text("OCR_SERVICE_SOCKET"),
+            ocr_service_timeout=number("OCR_SERVICE_TIMEOUT", 10.0),
+            ocr_service_threads=number("OCR_SERVICE_THREADS", 1, int, minimum=1),
+            download_dirs=MappingProxyType(download_dirs),
+            selector_cache_file=text("SELECTOR_CACHE_FILE", cls.selector_cache_file),
+            navigation_memo_file=text("NAVIGATION_MEMO_FILE", cls.navigation_memo_file),
+            latency_history_file=text("LATENCY_HISTORY_FILE", cls.latency_history_file),
+            adaptive_timeouts=flag("ADAPTIVE_TIMEOUTS", True),
+            adaptive_timeout_factor=number("ADAPTIVE_TIMEOUT_FACTOR", 3.0, minimum=1),
+            adaptive_timeout_floor=number("ADAPTIVE_TIMEOUT_FLOOR", 5.0),
+            adaptive_timeout_min_samples=number("ADAPTIVE_TIMEOUT_MIN_SAMPLES", 20, int, minimum=1),
+            adaptive_timeout_window=number("ADAPTIVE_TIMEOUT_WINDOW", 200, int, minimum=1),
+            log_flush_interval=number("LOG_FLUSH_INTERVAL", 2.0),
+            run_journal_dir=text("RUN_JOURNAL_DIR", cls.run_journal_dir),
+            trace_export_dir=text("TRACE_EXPORT_DIR"),
+            metrics_port=number("METRICS_PORT", None, int, minimum=1),
+            metrics_textfile=text("METRICS_TEXTFILE"),
+            metrics_textfile_interval=number("METRICS_TEXTFILE_INTERVAL", 15.0),
+            discord_webhook_url=text("DISCORD_WEBHOOK_URL"),
+            mail_host=text("MAIL_HOST"),
+            mail_port=number("MAIL_PORT", 587, int, minimum=1),
+            mail_username=text("MAIL_USERNAME"),
+            mail_password=text("MAIL_PASSWORD"),
+            mail_encryption=encryption,
+            mail_from_address=text("MAIL_FROM_ADDRESS"),
+            mail_to_address=text("MAIL_TO_ADDRESS"),
+            mail_idle_timeout=number("MAIL_IDLE_TIMEOUT", 60.0),
+            notify_workers=number("NOTIFY_WORKERS", 4, int, minimum=1),
+            notify_queue_size=number("NOTIFY_QUEUE_SIZE", 32, int, minimum=1),
+            notify_max_attempts=number("NOTIFY_MAX_ATTEMPTS", 4, int, minimum=1),
+            notify_drain_timeout=number("NOTIFY_DRAIN_TIMEOUT", 60.0),
+            notify_dead_letter=text("NOTIFY_DEAD_LETTER", cls.notify_dead_letter),
+            preflight=flag("PREFLIGHT", True),
+            preflight_seed_timeouts=flag("PREFLIGHT_SEED_TIMEOUTS", True),
+            circuit_failure_threshold=number("CIRCUIT_FAILURE_THRESHOLD", 3, int, minimum=1),
+            circuit_cooldown=number("CIRCUIT_COOLDOWN", 120.0),
+            circuit_max_pauses=number("CIRCUIT_MAX_PAUSES", 2, int),
+            circuit_probe_timeout=number("CIRCUIT_PROBE_TIMEOUT", 10.0),
+            run_retry_budget=number("RUN_RETRY_BUDGET", 10, int),
+        )
+
+        if errors:
+            raise SettingsError("環境變數設定錯誤:\n  " + "\n  ".join(errors))
+        return settings
+
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def get_settings():
+    """取得程序共用的設定（第一次呼叫時載入 .env 並解析）"""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                from dotenv import load_dotenv
+
+                load_dotenv()
+                _settings = Settings.from_env()
+    return _settings
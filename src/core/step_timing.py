@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+步驟計時 - 記錄每個帳號的登入、驗證碼、導航、搜尋、下載、搬移等步驟耗時與結果
+
+每個步驟是一個 span（可巢狀），結束時寫入與執行日誌同名的 .steps.jsonl，
+並在帳號結束時彙總到 reports/*.json 的 details（各步驟次數、總耗時、自身耗時與失敗次數）。
+"""
+
+import json
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def set_step_sink(writer):
+    """
+    設定所有 StepRecorder 共用的 JSONL 輸出（具 write() 的物件，例如 AsyncLogWriter；None 表示停用）
+
+    Returns:
+        先前的輸出物件
+    """
+    global _sink
+    with _sink_lock:
+        previous, _sink = _sink, writer
+    return previous
+
+
+def _emit(record):
+    """將一筆記錄寫入共用輸出"""
+    with _sink_lock:
+        sink = _sink
+    if sink is None:
+        return
+    try:
+        sink.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    except Exception:
+        pass
+
+
+def _outcome_of(result):
+    """由步驟回傳值推斷結果：例外以外，假值（False / None / 空清單）視為失敗"""
+    if isinstance(result, tuple):
+        result = result[0] if result else None
+    return "ok" if result else "failed"
+
+
+class StepRecorder:
+    """單一帳號的步驟計時記錄器"""
+
+    def __init__(self, username, scraper_name):
+        self.username = username
+        self.scraper_name = scraper_name
+        self.spans = []
+        self._stack = []
+        self._next_id = 1
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """註冊 span / 事件結束時的回呼（callback(record)），供追蹤匯出等使用"""
+        self._listeners.append(callback)
+
+    def _finish(self, record):
+        """保存記錄並通知輸出與監聽者"""
+        self.spans.append(record)
+        _emit(record)
+        for callback in self._listeners:
+            try:
+                callback(record)
+            except Exception:
+                pass
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """
+        記錄一個步驟（with 區塊）
+
+        區塊內可設定 span["outcome"]（預設 ok，發生例外時為 error）或更新 span["attrs"]。
+        """
+        parent = self._stack[-1] if self._stack else None
+        record = {
+            "type": "span",
+            "id": self._next_id,
+            "parent_id": parent["record"]["id"] if parent else None,
+            "account": self.username,
+            "scraper": self.scraper_name,
+            "name": name,
+            "start": datetime.now().isoformat(timespec="milliseconds"),
+            "start_unix": time.time(),
+            "outcome": "ok",
+            "attrs": dict(attrs),
+        }
+        self._next_id += 1
+        frame = {"record": record, "started": time.perf_counter(), "children_ms": 0.0}
+        self._stack.append(frame)
+        try:
+            yield record
+        except BaseException as e:
+            record["outcome"] = "error"
+            record["attrs"]["error"] = f"{type(e).__name__}: {e}"[:200]
+            raise
+        finally:
+            self._stack.pop()
+            duration_ms = (time.perf_counter() - frame["started"]) * 1000
+            record["duration_ms"] = round(duration_ms, 1)
+            record["self_ms"] = round(max(0.0, duration_ms - frame["children_ms"]), 1)
+            if self._stack:
+                self._stack[-1]["children_ms"] += duration_ms
+            self._finish(record)
+
+    def event(self, name, persist=True, **attrs):
+        """
+        記錄一個瞬間事件（歸屬於目前進行中的步驟）
+
+        persist 為 False 時只通知監聽者，不保存也不寫入 JSONL（用於 WebDriver 指令等大量事件）
+        """
+        parent = self._stack[-1] if self._stack else None
+        record = {
+            "type": "event",
+            "parent_id": parent["record"]["id"] if parent else None,
+            "account": self.username,
+            "scraper": self.scraper_name,
+            "name": name,
+            "start": datetime.now().isoformat(timespec="milliseconds"),
+            "start_unix": time.time(),
+            "attrs": dict(attrs),
+        }
+        if persist:
+            self._finish(record)
+            return
+        for callback in self._listeners:
+            try:
+                callback(record)
+            except Exception:
+                pass
+
+    def summary(self, total_seconds=None):
+        """
+        彙總各步驟耗時
+
+        Args:
+            total_seconds: 帳號總耗時（提供時另計未被任何步驟涵蓋的秒數）
+
+        Returns:
+            dict: {"steps": {名稱: {count, failures, total_seconds, self_seconds, max_seconds}}, "untracked_seconds"}
+        """
+        steps = {}
+        for record in self.spans:
+            if record["type"] != "span":
+                continue
+            step = steps.setdefault(
+                record["name"], {"count": 0, "failures": 0, "total_seconds": 0.0, "self_seconds": 0.0, "max_seconds": 0.0}
+            )
+            seconds = record["duration_ms"] / 1000
+            step["count"] += 1
+            step["failures"] += record["outcome"] != "ok"
+            step["total_seconds"] += seconds
+            step["self_seconds"] += record["self_ms"] / 1000
+            step["max_seconds"] = max(step["max_seconds"], seconds)
+
+        for step in steps.values():
+            for key in ("total_seconds", "self_seconds", "max_seconds"):
+                step[key] = round(step[key], 2)
+
+        ordered = dict(sorted(steps.items(), key=lambda item: -item[1]["self_seconds"]))
+        result = {"steps": ordered, "untracked_seconds": None}
+        if total_seconds is not None:
+            tracked = sum(step["self_seconds"] for step in ordered.values())
+            result["untracked_seconds"] = round(max(0.0, total_seconds - tracked), 2)
+        return result
+
+
+def timed_step(name, check_result=True):
+    """
+    方法裝飾器：以 self.steps 記錄方法的耗時與結果
+
+    check_result 為 True 時回傳假值視為 failed；拋出例外一律視為 error。物件沒有 steps 屬性時直接執行。
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            recorder = getattr(self, "steps", None)
+            if recorder is None:
+                return func(self, *args, **kwargs)
+            with recorder.span(name, method=func.__name__) as span:
+                result = func(self, *args, **kwargs)
+                if check_result:
+                    span["outcome"] = _outcome_of(result)
+                if isinstance(result, (list, dict)):
+                    span["attrs"]["items"] = len(result)
+                return result
+
+        return wrapper
+
+    return decorator
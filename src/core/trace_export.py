@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+追蹤匯出 - 以 OTLP/JSON 格式輸出整次執行的追蹤，可載入本機追蹤檢視器比較各帳號與各機器
+
+一次執行為一個 trace：執行本身是根 span，每個帳號是子 span，StepRecorder 的步驟是帳號下的子 span，
+WebDriver 指令與下載檔案則是所屬步驟的 event。設定 TRACE_EXPORT_DIR 後啟用。
+"""
+
+import os
+import json
+import time
+import socket
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .settings import get_settings
+from ..utils.windows_encoding_utils import safe_print
+
+SPAN_KIND_INTERNAL = 1
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def is_trace_export_enabled():
+    """是否設定了 TRACE_EXPORT_DIR"""
+    return bool(get_settings().trace_export_dir)
+
+
+def _new_id(num_bytes):
+    """產生 OTLP 的十六進位 trace / span ID"""
+    return os.urandom(num_bytes).hex()
+
+
+def _nanos(unix_seconds):
+    """秒數轉為 OTLP 使用的奈秒字串"""
+    return str(int(unix_seconds * 1_000_000_000))
+
+
+def _attributes(values):
+    """dict 轉為 OTLP attribute 清單"""
+    attributes = []
+    for key, value in values.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        attributes.append({"key": key, "value": typed})
+    return attributes
+
+
+class TraceExporter:
+    """收集一次執行的 span 並在結束時寫出 OTLP/JSON 檔案"""
+
+    def __init__(self, function_name, output_dir=None):
+        """
+        初始化追蹤匯出器並開始根 span
+
+        Args:
+            function_name: 功能名稱（根 span 名稱與檔名）
+            output_dir: 輸出目錄（預設讀取 TRACE_EXPORT_DIR）
+        """
+        self.function_name = function_name
+        self.output_dir = Path(output_dir or get_settings().trace_export_dir or "traces")
+        self.trace_id = _new_id(16)
+        self.root_span_id = _new_id(8)
+        self.started = time.time()
+        self._spans = []
+        self._pending_events = {}
+        self._span_ids = {}
+        self._lock = threading.Lock()
+
+    # ==================== 帳號 span ====================
+
+    def start_account(self, username):
+        """開始一個帳號 span，回傳帳號上下文（傳給 attach 與 end_account）"""
+        return {"span_id": _new_id(8), "username": username, "started": time.time(), "attempts": 0}
+
+    def end_account(self, account, success, error=None, downloads=0):
+        """結束帳號 span"""
+        self._add_span(
+            span_id=account["span_id"],
+            parent_id=self.root_span_id,
+            name=f"account {account['username']}",
+            start=account["started"],
+            end=time.time(),
+            attributes={
+                "account.username": account["username"],
+                "account.attempts": account["attempts"],
+                "account.downloads": downloads,
+                "error.message": error,
+            },
+            ok=success,
+        )
+
+    def attach(self, account, recorder):
+        """讓 StepRecorder 的步驟與事件成為帳號 span 的子 span / event（每次重試建立的新記錄器都需要呼叫）"""
+        account["attempts"] += 1
+        recorder_key = id(recorder)
+        recorder.add_listener(lambda record: self._on_record(account, recorder_key, record))
+
+    # ==================== 步驟轉換 ====================
+
+    def _span_id_for(self, recorder_key, local_id):
+        """將記錄器內的步驟編號對應到 OTLP span ID（子步驟先結束，父步驟的 ID 需先行配置）"""
+        with self._lock:
+            key = (recorder_key, local_id)
+            if key not in self._span_ids:
+                self._span_ids[key] = _new_id(8)
+            return self._span_ids[key]
+
+    def _on_record(self, account, recorder_key, record):
+        """StepRecorder 監聽回呼：步驟轉為 span、事件暫存到所屬 span"""
+        if record["parent_id"] is None:
+            parent_span_id = account["span_id"]
+        else:
+            parent_span_id = self._span_id_for(recorder_key, record["parent_id"])
+
+        if record["type"] == "event":
+            event = {
+                "timeUnixNano": _nanos(record["start_unix"]),
+                "name": record["name"],
+                "attributes": _attributes(record["attrs"]),
+            }
+            with self._lock:
+                self._pending_events.setdefault(parent_span_id, []).append(event)
+            return
+
+        span_id = self._span_id_for(recorder_key, record["id"])
+        attributes = {"step.outcome": record["outcome"], "step.self_ms": record["self_ms"]}
+        attributes.update({f"step.{key}": value for key, value in record["attrs"].items()})
+        self._add_span(
+            span_id=span_id,
+            parent_id=parent_span_id,
+            name=record["name"],
+            start=record["start_unix"],
+            end=record["start_unix"] + record["duration_ms"] / 1000,
+            attributes=attributes,
+            ok=record["outcome"] == "ok",
+        )
+
+    def _add_span(self, span_id, parent_id, name, start, end, attributes, ok):
+        """加入一個已結束的 span（附上先前暫存的事件）"""
+        with self._lock:
+            events = self._pending_events.pop(span_id, [])
+            self._spans.append(
+                {
+                    "traceId": self.trace_id,
+                    "spanId": span_id,
+                    "parentSpanId": parent_id or "",
+                    "name": name,
+                    "kind": SPAN_KIND_INTERNAL,
+                    "startTimeUnixNano": _nanos(start),
+                    "endTimeUnixNano": _nanos(end),
+                    "attributes": _attributes(attributes),
+                    "events": events,
+                    "status": {"code": STATUS_OK if ok else STATUS_ERROR},
+                }
+            )
+
+    # ==================== 輸出 ====================
+
+    def export(self, summary=None):
+        """
+        結束根 span 並寫出 OTLP/JSON 檔案
+
+        Args:
+            summary: 根 span 的額外屬性（例如成功 / 失敗帳號數）
+
+        Returns:
+            Path: 輸出檔案路徑，失敗時回傳 None
+        """
+        summary = summary or {}
+        self._add_span(
+            span_id=self.root_span_id,
+            parent_id=None,
+            name=f"run {self.function_name}",
+            start=self.started,
+            end=time.time(),
+            attributes={"run.function": self.function_name, **summary},
+            ok=not summary.get("run.failed_accounts"),
+        )
+
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _attributes(
+                            {
+                                "service.name": "seleniumtcat",
+                                "host.name": socket.gethostname(),
+                                "process.pid": os.getpid(),
+                            }
+                        )
+                    },
+                    "scopeSpans": [{"scope": {"name": "seleniumtcat.steps"}, "spans": self._spans}],
+                }
+            ]
+        }
+
+        timestamp = datetime.fromtimestamp(self.started).strftime("%Y%m%d_%H%M%S")
+        path = self.output_dir / f"{timestamp}_{self.function_name}.otlp.json"
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+        except Exception as e:
+            safe_print(f"⚠️ 追蹤檔寫入失敗: {e}")
+            return None
+        return path
+
+
+def instrument_driver(driver, recorder):
+    """
+    記錄 WebDriver 指令為目前步驟的事件（指令名稱與耗時）
+
+    共享瀏覽器在帳號之間沿用同一個 driver，因此只替換一次 execute，
+    之後每次呼叫只更新事件要寫入的 StepRecorder。
+    """
+    if driver is None:
+        return
+    holder = getattr(driver, "_tcat_trace_recorder", None)
+    if holder is not None:
+        holder[0] = recorder
+        return
+
+    holder = [recorder]
+    original_execute = driver.execute
+
+    def execute(driver_command, params=None):
+        started = time.perf_counter()
+        try:
+            return original_execute(driver_command, params)
+        finally:
+            holder[0].event(
+                "webdriver.command",
+                persist=False,
+                command=driver_command,
+                duration_ms=round((time.perf_counter() - started) * 1000, 1),
+            )
+
+    driver.execute = execute
+    driver._tcat_trace_recorder = holder
@@ -9,6 +9,9 @@ import time
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
 from src.utils.windows_encoding_utils import safe_print, check_pythonunbuffered
 from src.core.base_scraper import BaseScraper
+from src.core.errors import ScraperError, LoginRejected, SecurityWarning
+from src.core.scrape_progress import WorkItemInterrupted
+from src.core.step_timing import timed_step
 from src.core.multi_account_manager import MultiAccountManager
 
 # 檢查環境變數
@@ -18,12 +21,8 @@ import re
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
-import requests
-import io
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
 
 class FreightScraper(BaseScraper):
@@ -35,12 +34,13 @@ class FreightScraper(BaseScraper):
     # 設定環境變數 key
     DOWNLOAD_DIR_ENV_KEY = "FREIGHT_DOWNLOAD_WORK_DIR"
     DOWNLOAD_OK_DIR_ENV_KEY = "FREIGHT_DOWNLOAD_OK_DIR"
+    NAVIGATION_MEMO_KEY = "freight"
 
     def __init__(
-        self, username, password, headless=None, start_date=None, end_date=None, quiet_init=False, shared_driver=None
+        self, username, password, headless=None, start_date=None, end_date=None, quiet_init=False, shared_driver=None, settings=None, progress=None
     ):
         # 呼叫父類建構子
-        super().__init__(username, password, headless, shared_driver=shared_driver)
+        super().__init__(username, password, headless, shared_driver=shared_driver, settings=settings, progress=progress)
 
         # FreightScraper 特有的屬性
         # 日期範圍設定（格式：YYYYMMDD）
@@ -70,11 +70,13 @@ class FreightScraper(BaseScraper):
         if not quiet_init:
             safe_print(f"📅 查詢日期範圍: {self.start_date} - {self.end_date}")
 
+    @timed_step("navigation")
     def navigate_to_freight_query(self):
         """導航到對帳單明細頁面 - 包含完整重試機制和 session timeout 處理"""
         safe_print("🧭 導航到對帳單明細頁面...")
 
         max_attempts = 3  # 最多嘗試 3 次
+        nav_started = time.time()
 
         for attempt in range(max_attempts):
             if attempt > 0:
@@ -82,9 +84,18 @@ class FreightScraper(BaseScraper):
                 # 移除固定等待，後續的智慧等待已足夠
 
             try:
-                # 智慧等待登入完成
-                safe_print("⏳ 等待登入完成...")
-                self.smart_wait_for_url_change(timeout=10)
+                # 導航備忘錄：登入後直接跳到上次成功的頁面，只有驗證失敗才執行備援導航
+                memo_result = self._navigate_via_memo(self._is_freight_page) if attempt == 0 else None
+                if memo_result:
+                    return True
+                if self.security_warning_encountered:
+                    safe_print("🚨 檢測到密碼安全警告，終止當前帳號處理")
+                    return False
+
+                # 智慧等待登入完成（備忘錄已導航離開首頁時不需等待）
+                if memo_result is None:
+                    safe_print("⏳ 等待登入完成...")
+                    self.smart_wait_for_url_change(timeout=10)
 
                 # 檢查當前會話狀態
                 if self._check_session_timeout():
@@ -104,6 +115,7 @@ class FreightScraper(BaseScraper):
 
                 if direct_success:
                     safe_print("✅ 直接 URL 導航成功")
+                    self._remember_navigation("direct_url", nav_started, self._last_navigation_url)
                     return True
 
                 # 如果直接 URL 失敗，再次檢查是否為會話超時
@@ -121,6 +133,7 @@ class FreightScraper(BaseScraper):
 
                         if direct_success:
                             safe_print("✅ 重新登入後直接 URL 導航成功")
+                            self._remember_navigation("direct_url", nav_started, self._last_navigation_url)
                             return True
 
                 # 方法2: 嘗試框架導航
@@ -128,6 +141,7 @@ class FreightScraper(BaseScraper):
                 frame_success = self._navigate_through_menu()
                 if frame_success:
                     safe_print("✅ 框架導航成功")
+                    self._remember_navigation("menu", nav_started)
                     return True
                 else:
                     safe_print("❌ 框架導航失敗")
@@ -138,7 +152,7 @@ class FreightScraper(BaseScraper):
                     try:
                         # 回到合約客戶專區首頁
                         home_url = "https://www.takkyubin.com.tw/YMTContract/default.aspx"
-                        self.driver.get(home_url)
+                        self.load_page(home_url)
                         self.smart_wait_for_url_change(timeout=5)
 
                         # 檢查是否需要重新登入
@@ -181,6 +195,9 @@ class FreightScraper(BaseScraper):
                 "https://www.takkyubin.com.tw/YMTContract/aspx/SudaPaymentList.aspx?SudaType=03",
             ]
 
+            # 上次成功的 URL 優先嘗試
+            direct_urls = self.order_navigation_urls("freight_direct_url", direct_urls)
+
             max_retries = 2  # 每個 URL 最多重試 2 次
 
             for url_index, full_url in enumerate(direct_urls):
@@ -191,7 +208,7 @@ class FreightScraper(BaseScraper):
                         print(f"      重試 {retry}/{max_retries}...")
 
                     try:
-                        self.driver.get(full_url)
+                        self.load_page(full_url)
                         # 短暫等待以檢測 alert（保留此處固定等待，因 alert 檢測需要）
                         time.sleep(0.5)
 
@@ -219,7 +236,7 @@ class FreightScraper(BaseScraper):
                             if self._handle_session_timeout():
                                 print("   ✅ 重新登入成功，重試導航...")
                                 # 重新嘗試當前 URL
-                                self.driver.get(full_url)
+                                self.load_page(full_url)
                                 self.smart_wait(1)  # 等待頁面穩定
                             else:
                                 print("   ❌ 重新登入失敗")
@@ -230,6 +247,7 @@ class FreightScraper(BaseScraper):
                         # 檢查是否成功到達對帳單明細頁面
                         if self._is_freight_page():
                             safe_print("✅ 直接 URL 訪問成功")
+                            self.remember_navigation_url("freight_direct_url", full_url)
                             return True
                         else:
                             print("   ❌ 未能到達對帳單明細頁面")
@@ -395,8 +413,8 @@ class FreightScraper(BaseScraper):
     def _is_freight_page(self):
         """檢查是否成功到達對帳單明細頁面"""
         try:
-            current_url = self.driver.current_url
-            page_source = self.driver.page_source
+            # 一次傳輸取得 URL 與原始碼，元素檢查改在本地解析
+            snapshot = self.get_page_snapshot()
 
             # 檢查 URL 是否包含預期的頁面標識
             url_indicators = ["SudaPaymentList.aspx", "SudaType=01"]
@@ -412,29 +430,13 @@ class FreightScraper(BaseScraper):
                 "查詢種類",  # 基於表格標題
             ]
 
-            url_match = any(indicator in current_url for indicator in url_indicators)
-            content_match = any(indicator in page_source for indicator in content_indicators)
-
-            # 更精確的元素檢查
-            element_check = False
-            try:
-                # 檢查關鍵元素是否存在
-                key_elements = [("ID", "txtDateS"), ("ID", "txtDateE"), ("ID", "btnSearch")]
-
-                found_elements = 0
-                for method, selector in key_elements:
-                    try:
-                        if method == "ID":
-                            element = self.driver.find_element(By.ID, selector)
-                            if element:
-                                found_elements += 1
-                    except:
-                        continue
-
-                element_check = found_elements >= 2  # 至少找到 2 個關鍵元素
+            url_match = bool(snapshot.url_contains_any(url_indicators))
+            content_match = bool(snapshot.contains_any(content_indicators))
 
-            except Exception as e:
-                pass
+            # 更精確的元素檢查：關鍵元素是否存在
+            key_element_ids = ["txtDateS", "txtDateE", "btnSearch"]
+            found_elements = sum(1 for element_id in key_element_ids if snapshot.soup.find(id=element_id))
+            element_check = found_elements >= 2  # 至少找到 2 個關鍵元素
 
             safe_print(f"📍 URL 檢查: {'✅' if url_match else '❌'}")
             safe_print(f"📄 內容檢查: {'✅' if content_match else '❌'}")
@@ -446,6 +448,7 @@ class FreightScraper(BaseScraper):
             safe_print(f"❌ 頁面檢查失敗: {e}")
             return False
 
+    @timed_step("date_range")
     def set_invoice_date_range(self):
         """設定發票日期區間為指定的日期範圍"""
         safe_print("📅 設定發票日期區間...")
@@ -457,30 +460,10 @@ class FreightScraper(BaseScraper):
 
             safe_print(f"📅 設定日期範圍: {start_date_str} - {end_date_str}")
 
-            # 基於真實 HTML 結構的精確選擇器
-            start_date_input = None
-            end_date_input = None
-
-            # 方法1: 使用確切的 name 和 id
-            try:
-                start_date_input = self.driver.find_element(By.ID, "txtDateS")
-                end_date_input = self.driver.find_element(By.ID, "txtDateE")
-                safe_print("✅ 找到確切的日期輸入框 (txtDateS, txtDateE)")
-            except:
-                safe_print("⚠️ 未找到確切的日期輸入框，嘗試備用方法")
-
-                # 方法2: 使用 name 屬性
-                try:
-                    start_date_input = self.driver.find_element(By.NAME, "txtDateS")
-                    end_date_input = self.driver.find_element(By.NAME, "txtDateE")
-                    safe_print("✅ 通過 name 屬性找到日期輸入框")
-                except:
-                    # 方法3: 通用搜索
-                    date_inputs = self.driver.find_elements(By.CSS_SELECTOR, "input[type='text']")
-                    if len(date_inputs) >= 2:
-                        start_date_input = date_inputs[0]
-                        end_date_input = date_inputs[1]
-                        safe_print(f"✅ 通過通用搜索找到 {len(date_inputs)} 個輸入框")
+            # 一次腳本呼叫評估所有日期欄位定位策略（txtDateS/txtDateE 優先）
+            start_date_input, end_date_input = self.find_date_inputs()
+            if start_date_input and end_date_input:
+                safe_print("✅ 找到日期輸入框")
 
             # 填入日期範圍
             if start_date_input and end_date_input:
@@ -531,13 +514,17 @@ class FreightScraper(BaseScraper):
 
             return downloaded_files
 
+        except WorkItemInterrupted:
+            raise
         except Exception as e:
             safe_print(f"❌ 搜尋和下載失敗: {e}")
             return []
 
+    @timed_step("search_wait")
     def _wait_for_ajax_results(self, timeout=30):
         """等待 AJAX 搜尋結果載入並檢查下載按鈕是否出現"""
-        safe_print("⏳ 等待 AJAX 搜尋結果載入...")
+        timeout = self.adaptive_timeout("search_wait", timeout)
+        safe_print(f"⏳ 等待 AJAX 搜尋結果載入（最多 {timeout} 秒）...")
 
         try:
             # 使用智慧等待檢查下載按鈕
@@ -554,45 +541,23 @@ class FreightScraper(BaseScraper):
             safe_print(f"⚠️ AJAX 結果載入失敗: {e}")
             return False
 
+    @timed_step("search")
     def _click_search_button(self):
         """點擊搜尋按鈕並處理 AJAX 請求"""
         safe_print("🔍 點擊搜尋按鈕...")
 
         try:
-            # 使用確切的 btnSearch ID（基於真實 HTML）
-            search_button = None
-            try:
-                search_button = self.driver.find_element(By.ID, "btnSearch")
-                if search_button and search_button.is_displayed() and search_button.is_enabled():
-                    safe_print("✅ 找到搜尋按鈕: btnSearch (ID)")
-                else:
-                    safe_print("⚠️ btnSearch 按鈕存在但不可用")
-                    return False
-            except Exception as e:
-                safe_print(f"❌ 找不到 btnSearch 按鈕: {e}")
-
-                # 備用方法
-                backup_selectors = [
-                    ("NAME", "btnSearch"),
-                    ("VALUE", " 搜尋 "),
-                    ("CSS", "input[type='submit'][value*='搜尋']"),
-                ]
-
-                for method, selector in backup_selectors:
-                    try:
-                        if method == "NAME":
-                            search_button = self.driver.find_element(By.NAME, selector)
-                        elif method == "VALUE":
-                            search_button = self.driver.find_element(By.CSS_SELECTOR, f"input[value='{selector}']")
-                        elif method == "CSS":
-                            search_button = self.driver.find_element(By.CSS_SELECTOR, selector)
-
-                        if search_button and search_button.is_displayed() and search_button.is_enabled():
-                            safe_print(f"✅ 找到備用搜尋按鈕: {method}={selector}")
-                            break
-
-                    except Exception:
-                        continue
+            # 確切的 btnSearch ID（基於真實 HTML）優先，其餘為備用定位器
+            search_locators = [
+                (By.ID, "btnSearch"),
+                (By.NAME, "btnSearch"),
+                (By.CSS_SELECTOR, "input[value=' 搜尋 ']"),
+                (By.CSS_SELECTOR, "input[type='submit'][value*='搜尋']"),
+            ]
+            search_button, index = self.find_first_match(search_locators, cache_slot="search_button")
+            if search_button:
+                by_method, selector = search_locators[index]
+                safe_print(f"✅ 找到搜尋按鈕: {by_method}={selector}")
 
             if not search_button:
                 safe_print("❌ 找不到搜尋按鈕")
@@ -619,7 +584,8 @@ class FreightScraper(BaseScraper):
         self.setup_temp_download_dir()
 
         try:
-            # 首先解析表格資料以獲取發票資訊
+            # 首先解析表格資料以獲取發票資訊（工作項目）
+            self.progress.enter("enumerate")
             invoice_data = self._parse_invoice_table()
 
             # 如果沒有發票資料，直接返回，不執行下載
@@ -629,44 +595,10 @@ class FreightScraper(BaseScraper):
 
             safe_print(f"✅ 找到 {len(invoice_data)} 筆發票資料，準備進入詳細頁面下載")
 
-            all_downloaded_files = []
-
-            # 對每一筆發票資料進行處理
-            for idx, invoice_info in enumerate(invoice_data, 1):
-                safe_print(f"📄 處理第 {idx}/{len(invoice_data)} 筆發票: {invoice_info['invoice_number']}")
-
-                try:
-                    # 步驟 1: 點擊發票編號進入詳細頁面
-                    detail_page_success = self._click_invoice_number(invoice_info["invoice_number"])
-                    if not detail_page_success:
-                        safe_print(f"⚠️ 無法進入發票 {invoice_info['invoice_number']} 的詳細頁面，跳過")
-                        continue
-
-                    # 步驟 2: 智慧等待詳細頁面載入
-                    self.smart_wait_for_element(By.ID, "lnkbtnDownloadInvoice", timeout=10, visible=False)
-
-                    # 步驟 3: 在詳細頁面點擊下載表格按鈕
-                    downloaded_file = self._download_invoice_detail(invoice_info)
-
-                    if downloaded_file:
-                        all_downloaded_files.extend(downloaded_file)
-                        safe_print(f"✅ 成功下載發票 {invoice_info['invoice_number']}")
-                    else:
-                        safe_print(f"⚠️ 發票 {invoice_info['invoice_number']} 下載失敗")
-
-                    # 步驟 4: 返回列表頁面
-                    self._return_to_list_page()
-                    # 智慧等待列表頁面載入
-                    self.smart_wait_for_element(By.ID, "grdList", timeout=10, visible=False)
-
-                except Exception as e:
-                    safe_print(f"❌ 處理發票 {invoice_info['invoice_number']} 時發生錯誤: {e}")
-                    # 嘗試返回列表頁面
-                    try:
-                        self._return_to_list_page()
-                    except:
-                        pass
-                    continue
+            # 逐筆處理發票（已完成的發票略過；瀏覽器失效時中止，重試時從失敗的發票續跑）
+            all_downloaded_files = self.download_work_items(
+                invoice_data, lambda invoice_info: invoice_info["invoice_number"], self._download_invoice, label="發票"
+            )
 
             if all_downloaded_files:
                 safe_print(f"✅ 成功下載並重命名 {len(all_downloaded_files)} 個檔案")
@@ -675,10 +607,64 @@ class FreightScraper(BaseScraper):
                 safe_print("⚠️ 沒有檢測到新的下載檔案")
                 return []
 
+        except WorkItemInterrupted:
+            raise
         except Exception as e:
             safe_print(f"❌ 下載失敗: {e}")
             return []
 
+    def _download_invoice(self, invoice_info):
+        """
+        下載單筆發票（進入詳細頁面 → 下載表格 → 返回列表）
+
+        Returns:
+            list: 下載的檔案（檔案已存在時為空清單），失敗時回傳 None
+        """
+        invoice_number = invoice_info["invoice_number"]
+
+        # 檔案已存在時不需要進入詳細頁面
+        target_filename = f"發票明細_{self.username}_{invoice_info['invoice_date']}_{invoice_number}.xlsx"
+        if self.is_file_already_downloaded(target_filename):
+            return []
+
+        try:
+            # 步驟 1: 點擊發票編號進入詳細頁面
+            detail_page_success = self._click_invoice_number(invoice_number)
+            if not detail_page_success:
+                safe_print(f"⚠️ 無法進入發票 {invoice_number} 的詳細頁面，跳過")
+                return None
+
+            # 步驟 2: 智慧等待詳細頁面載入
+            self.smart_wait_for_element(By.ID, "lnkbtnDownloadInvoice", timeout=10, visible=False)
+
+            # 步驟 3: 在詳細頁面點擊下載表格按鈕
+            downloaded_file = self._download_invoice_detail(invoice_info)
+
+            if downloaded_file:
+                self.steps.event(
+                    "download.invoice",
+                    invoice=invoice_number,
+                    files=[Path(f).name for f in downloaded_file],
+                )
+                safe_print(f"✅ 成功下載發票 {invoice_number}")
+            else:
+                safe_print(f"⚠️ 發票 {invoice_number} 下載失敗")
+
+            # 步驟 4: 返回列表頁面
+            self._return_to_list_page()
+            # 智慧等待列表頁面載入
+            self.smart_wait_for_element(By.ID, "grdList", timeout=10, visible=False)
+            return downloaded_file or None
+
+        except Exception as e:
+            safe_print(f"❌ 處理發票 {invoice_number} 時發生錯誤: {e}")
+            # 嘗試返回列表頁面
+            try:
+                self._return_to_list_page()
+            except:
+                pass
+            return None
+
     def _click_invoice_number(self, invoice_number):
         """點擊發票編號進入詳細頁面"""
         safe_print(f"🖱️ 點擊發票編號: {invoice_number}")
@@ -719,45 +705,27 @@ class FreightScraper(BaseScraper):
             safe_print(f"❌ 點擊發票編號失敗: {e}")
             return False
 
+    @timed_step("download")
     def _download_invoice_detail(self, invoice_info):
         """在詳細頁面下載發票表格"""
         safe_print("📥 在詳細頁面下載發票表格...")
 
-        # 檢查檔案是否已下載過（在 OK_DIR 中）
-        if invoice_info:
-            target_filename = f"發票明細_{self.username}_{invoice_info['invoice_date']}_{invoice_info['invoice_number']}.xlsx"
-            if self.is_file_already_downloaded(target_filename):
-                return []  # 跳過已下載的檔案
-
         try:
             # 記錄下載前的檔案
             files_before = set(self.download_dir.glob("*"))
 
-            # 尋找 lnkbtnDownloadInvoice 下載按鈕
-            download_button = None
-
-            try:
-                # 方法 1: 直接使用 ID
-                download_button = self.driver.find_element(By.ID, "lnkbtnDownloadInvoice")
-                if download_button and download_button.is_displayed():
-                    safe_print("✅ 找到下載表格按鈕: lnkbtnDownloadInvoice")
-                else:
-                    safe_print("⚠️ lnkbtnDownloadInvoice 按鈕不可見")
-                    download_button = None
-
-            except Exception as e:
-                safe_print(f"⚠️ 找不到 lnkbtnDownloadInvoice: {e}")
-
-                # 方法 2: 使用文字內容尋找
-                try:
-                    links = self.driver.find_elements(By.TAG_NAME, "a")
-                    for link in links:
-                        if "下載表格" in link.text:
-                            download_button = link
-                            safe_print("✅ 透過文字找到下載表格按鈕")
-                            break
-                except:
-                    pass
+            # 尋找 lnkbtnDownloadInvoice 下載按鈕，找不到時以文字內容比對
+            download_button, index = self.find_first_match(
+                [
+                    (By.ID, "lnkbtnDownloadInvoice"),
+                    (By.XPATH, "//a[contains(text(), '下載表格')]"),
+                ],
+                cache_slot="invoice_download_button",
+            )
+            if index == 0:
+                safe_print("✅ 找到下載表格按鈕: lnkbtnDownloadInvoice")
+            elif download_button:
+                safe_print("✅ 透過文字找到下載表格按鈕")
 
             if not download_button:
                 safe_print("❌ 找不到下載表格按鈕")
@@ -842,8 +810,10 @@ class FreightScraper(BaseScraper):
 
             return False
 
+    @timed_step("download_wait")
     def _wait_for_download(self, files_before, timeout=60):
-        """等待檔案下載完成 - 使用智慧等待"""
+        """等待檔案下載完成 - 使用智慧等待（逾時依延遲歷史調整）"""
+        timeout = self.adaptive_timeout("download_wait", timeout)
         safe_print(f"⏳ 等待檔案下載完成（最多 {timeout} 秒）...")
 
         # 使用智慧檔案下載等待
@@ -984,27 +954,20 @@ class FreightScraper(BaseScraper):
             self.init_browser()
 
             # 2. 登入
+            self.progress.start_attempt()
+            self.progress.enter("login")
             login_success = self.login()
             if not login_success:
-                safe_print(f"❌ 帳號 {self.username} 登入失敗")
-                return {"success": False, "username": self.username, "error": "登入失敗", "downloads": []}
+                raise LoginRejected()
 
             # 3. 導航到對帳單明細頁面
+            self.progress.enter("navigate")
             nav_success = self.navigate_to_freight_query()
             if not nav_success:
                 # 檢查是否為密碼安全警告
                 if self.security_warning_encountered:
-                    safe_print(f"🚨 帳號 {self.username} 密碼安全警告")
-                    return {
-                        "success": False,
-                        "username": self.username,
-                        "error": "密碼安全警告",
-                        "error_type": "security_warning",
-                        "downloads": [],
-                    }
-                else:
-                    safe_print(f"❌ 帳號 {self.username} 導航失敗")
-                    return {"success": False, "username": self.username, "error": "導航失敗", "downloads": []}
+                    raise SecurityWarning()
+                raise ScraperError("導航失敗")
 
             # 4. 設定發票日期區間
             date_success = self.set_invoice_date_range()
@@ -1022,13 +985,8 @@ class FreightScraper(BaseScraper):
                 return {"success": True, "username": self.username, "message": "無資料可下載", "downloads": []}
 
         except Exception as e:
-            safe_print(f"💥 帳號 {self.username} 流程執行失敗: {e}")
-            return {
-                "success": False,
-                "username": self.username,
-                "error": str(e),
-                "downloads": [str(f) for f in downloaded_files],
-            }
+            # 可重試的錯誤（瀏覽器崩潰、網站無法連線）直接拋出，交由 MultiAccountManager 重試
+            return self.failure_result(e, downloaded_files)
         finally:
             # 結束執行時間計時
             self.end_execution_timer()
@@ -1043,6 +1001,7 @@ def main():
     parser.add_argument("--headless", action="store_true", help="使用無頭模式")
     parser.add_argument("--start-date", type=str, help="開始日期 (格式: YYYYMMDD)")
     parser.add_argument("--end-date", type=str, help="結束日期 (格式: YYYYMMDD)")
+    parser.add_argument("--resume", action="store_true", help="從最近一次中斷的執行續跑（略過已完成的帳號）")
 
     args = parser.parse_args()
 
@@ -1053,7 +1012,11 @@ def main():
         # 只有在使用者明確指定 --headless 時才覆蓋設定檔
         headless_arg = True if "--headless" in sys.argv else None
         manager.run_all_accounts(
-            FreightScraper, headless_override=headless_arg, start_date=args.start_date, end_date=args.end_date
+            FreightScraper,
+            headless_override=headless_arg,
+            resume=args.resume,
+            start_date=args.start_date,
+            end_date=args.end_date,
         )
 
         return 0
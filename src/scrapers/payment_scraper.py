@@ -9,6 +9,8 @@ import time
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
 from src.utils.windows_encoding_utils import safe_print, check_pythonunbuffered
 from src.core.base_scraper import BaseScraper
+from src.core.errors import ScraperError, LoginRejected, SecurityWarning, NoData
+from src.core.step_timing import timed_step
 from src.core.multi_account_manager import MultiAccountManager
 
 # 檢查環境變數
@@ -18,12 +20,8 @@ import re
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
-import requests
-import io
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
 
 class PaymentScraper(BaseScraper):
@@ -35,10 +33,11 @@ class PaymentScraper(BaseScraper):
     # 設定環境變數 key
     DOWNLOAD_DIR_ENV_KEY = "PAYMENT_DOWNLOAD_WORK_DIR"
     DOWNLOAD_OK_DIR_ENV_KEY = "PAYMENT_DOWNLOAD_OK_DIR"
+    NAVIGATION_MEMO_KEY = "payment"
 
-    def __init__(self, username, password, headless=None, period_number=1, quiet_init=False, shared_driver=None):
+    def __init__(self, username, password, headless=None, period_number=1, quiet_init=False, shared_driver=None, settings=None, progress=None):
         # 呼叫父類建構子
-        super().__init__(username, password, headless, shared_driver=shared_driver)
+        super().__init__(username, password, headless, shared_driver=shared_driver, settings=settings, progress=progress)
 
         # PaymentScraper 特有的屬性
         # 儲存當前選擇的結算區間
@@ -53,11 +52,13 @@ class PaymentScraper(BaseScraper):
         # quiet_init 用於多帳號模式時抑制重複訊息（目前此 scraper 無需使用）
         self._quiet_init = quiet_init
 
+    @timed_step("navigation")
     def navigate_to_payment_query(self):
         """導航到貨到付款查詢頁面 - 優先使用直接 URL，包含完整重試機制"""
         safe_print("🧭 導航到貨到付款查詢頁面...")
 
         max_attempts = 3  # 最多嘗試 3 次
+        nav_started = time.time()
 
         for attempt in range(max_attempts):
             if attempt > 0:
@@ -65,9 +66,18 @@ class PaymentScraper(BaseScraper):
                 # 移除固定等待，後續的智慧等待已足夠
 
             try:
-                # 智慧等待登入完成 - URL 不再是 Login.aspx
-                print("⏳ 等待登入完成...")
-                self.smart_wait_for_url_change(old_url=self.url, timeout=10)
+                # 導航備忘錄：登入後直接跳到上次成功的頁面，只有驗證失敗才執行備援導航
+                memo_result = self._navigate_via_memo(self._is_payment_page) if attempt == 0 else None
+                if memo_result:
+                    return True
+                if self.security_warning_encountered:
+                    safe_print("🚨 檢測到密碼安全警告，終止當前帳號處理")
+                    return False
+
+                # 智慧等待登入完成 - URL 不再是 Login.aspx（備忘錄已導航離開首頁時不需等待）
+                if memo_result is None:
+                    print("⏳ 等待登入完成...")
+                    self.smart_wait_for_url_change(old_url=self.url, timeout=10)
 
                 # 檢查當前會話狀態
                 if self._check_session_timeout():
@@ -87,6 +97,7 @@ class PaymentScraper(BaseScraper):
 
                 if direct_success:
                     safe_print("✅ 直接 URL 導航成功")
+                    self._remember_navigation("direct_url", nav_started, self._last_navigation_url)
                     return True
 
                 # 如果直接 URL 失敗，再次檢查是否為會話超時
@@ -104,6 +115,7 @@ class PaymentScraper(BaseScraper):
 
                         if direct_success:
                             safe_print("✅ 重新登入後直接 URL 導航成功")
+                            self._remember_navigation("direct_url", nav_started, self._last_navigation_url)
                             return True
 
                 # 如果直接 URL 失敗，嘗試框架導航
@@ -113,6 +125,7 @@ class PaymentScraper(BaseScraper):
                     navigation_success = self._navigate_in_frame()
                     if navigation_success:
                         safe_print("✅ 框架導航成功")
+                        self._remember_navigation("frame", nav_started)
                         return True
                     else:
                         safe_print("❌ 框架導航失敗")
@@ -123,7 +136,7 @@ class PaymentScraper(BaseScraper):
                     try:
                         # 回到合約客戶專區首頁
                         home_url = "https://www.takkyubin.com.tw/YMTContract/default.aspx"
-                        self.driver.get(home_url)
+                        self.load_page(home_url)
                         time.sleep(3)
 
                         # 檢查是否需要重新登入
@@ -168,8 +181,8 @@ class PaymentScraper(BaseScraper):
                 main_iframe = iframes[0]
                 self.driver.switch_to.frame(main_iframe)
 
-                # 檢查框架內容
-                frame_source = self.driver.page_source
+                # 檢查框架內容（框架 DOM 未變更時沿用上一秒的快照）
+                frame_snapshot = self.get_page_snapshot()
 
                 # 尋找導航相關的關鍵字
                 navigation_keywords = [
@@ -184,7 +197,7 @@ class PaymentScraper(BaseScraper):
                     "統計分析",
                 ]
 
-                found_keywords = [kw for kw in navigation_keywords if kw in frame_source]
+                found_keywords = frame_snapshot.contains_any(navigation_keywords)
 
                 if found_keywords:
                     print(f"   第 {attempt+1} 秒: 框架中發現關鍵字 {', '.join(found_keywords)}")
@@ -453,6 +466,36 @@ class PaymentScraper(BaseScraper):
             print(f"   ❌ 貨到付款選項點擊失敗: {e}")
             return False
 
+    def _is_payment_page(self):
+        """檢查是否成功到達貨到付款匯款明細頁面（不是錯誤頁面且包含相關關鍵字）"""
+        try:
+            # 一次傳輸取得 URL 與原始碼
+            snapshot = self.get_page_snapshot()
+            current_url = snapshot.url
+
+            if "MsgCenter.aspx" in current_url:
+                print("   ❌ 導向到訊息頁面，可能是權限問題")
+                return False
+            if any(error_page in current_url for error_page in ["ErrorMsg.aspx", "Login.aspx"]) or current_url == self.url:
+                print(f"   導航失敗或重導向到錯誤頁面")
+                return False
+
+            # 檢查頁面內容是否包含相關關鍵字
+            success_keywords = ["匯款明細", "貨到付款", "結算", "代收貨款", "COD", "明細表"]
+            found_keywords = snapshot.contains_any(success_keywords)
+
+            if found_keywords:
+                print(f"✅ 成功導航到: {current_url}")
+                print(f"   找到關鍵字: {', '.join(found_keywords)}")
+                return True
+
+            print(f"   頁面載入但未找到預期內容")
+            return False
+
+        except Exception as e:
+            safe_print(f"❌ 頁面檢查失敗: {e}")
+            return False
+
     def _try_direct_urls(self):
         """嘗試直接 URL 訪問 - 使用 RedirectFunc 和已知的 URL，包含重試機制"""
         print("🔄 嘗試直接 URL 訪問...")
@@ -469,6 +512,9 @@ class PaymentScraper(BaseScraper):
             "https://www.takkyubin.com.tw/YMTContract/aspx/CollectPaymentList3200T.aspx?Settlement=03",
         ]
 
+        # 上次成功的 URL 優先嘗試
+        direct_urls = self.order_navigation_urls("payment_direct_url", direct_urls)
+
         max_retries = 2  # 每個 URL 最多重試 2 次
 
         for url_index, url in enumerate(direct_urls):
@@ -479,7 +525,7 @@ class PaymentScraper(BaseScraper):
                     print(f"      重試 {retry}/{max_retries}...")
 
                 try:
-                    self.driver.get(url)
+                    self.load_page(url)
                     time.sleep(2)  # 短暫等待以檢測 alert
 
                     # 處理可能的 alert 彈窗
@@ -498,7 +544,6 @@ class PaymentScraper(BaseScraper):
                     )
 
                     current_url = self.driver.current_url
-                    page_source = self.driver.page_source
 
                     print(f"   導航後 URL: {current_url}")
 
@@ -508,38 +553,16 @@ class PaymentScraper(BaseScraper):
                         if self._handle_session_timeout():
                             print("   ✅ 重新登入成功，重試導航...")
                             # 重新嘗試當前 URL
-                            self.driver.get(url)
+                            self.load_page(url)
                             time.sleep(3)
-                            current_url = self.driver.current_url
-                            page_source = self.driver.page_source
                         else:
                             print("   ❌ 重新登入失敗")
                             continue
 
-                    # 檢查是否成功（不是錯誤頁面）
-                    if (
-                        not any(
-                            error_page in current_url
-                            for error_page in ["ErrorMsg.aspx", "Login.aspx", "MsgCenter.aspx"]
-                        )
-                        and current_url != self.url
-                    ):
-
-                        # 檢查頁面內容是否包含相關關鍵字
-                        success_keywords = ["匯款明細", "貨到付款", "結算", "代收貨款", "COD", "明細表"]
-                        found_keywords = [kw for kw in success_keywords if kw in page_source]
-
-                        if found_keywords:
-                            print(f"✅ 成功導航到: {current_url}")
-                            print(f"   找到關鍵字: {', '.join(found_keywords)}")
-                            return True
-                        else:
-                            print(f"   頁面載入但未找到預期內容")
-
-                    elif "MsgCenter.aspx" in current_url:
-                        print("   ❌ 導向到訊息頁面，可能是權限問題")
-                    else:
-                        print(f"   導航失敗或重導向到錯誤頁面")
+                    # 檢查是否成功到達貨到付款匯款明細頁面
+                    if self._is_payment_page():
+                        self.remember_navigation_url("payment_direct_url", url)
+                        return True
 
                     # 如果這次嘗試失敗，但還有重試機會，則稍等片刻再重試
                     if retry < max_retries:
@@ -576,6 +599,7 @@ class PaymentScraper(BaseScraper):
         print("   ❌ 所有直接 URL 嘗試都失敗")
         return False
 
+    @timed_step("period_lookup")
     def get_settlement_periods_for_download(self):
         """根據期數下載最新N期的結算區間 - 專門處理 ddlDate 選單"""
         safe_print(f"📅 準備下載最新 {self.period_number} 期結算區間...")
@@ -794,6 +818,7 @@ class PaymentScraper(BaseScraper):
             safe_text = re.sub(r"[^\w\u4e00-\u9fff\-]", "_", str(period_text))
             return safe_text
 
+    @timed_step("download")
     def download_cod_statement(self):
         """下載貨到付款匯款明細表"""
         safe_print("📥 開始下載貨到付款匯款明細表...")
@@ -818,30 +843,24 @@ class PaymentScraper(BaseScraper):
             # 尋找並點擊查詢按鈕
             query_buttons_found = []
 
-            # 方法1：尋找包含查詢文字的按鈕
+            # 方法1：尋找包含查詢文字的按鈕（一次腳本呼叫評估所有選擇器）
             query_selectors = [
-                "//button[contains(text(), '查詢')]",
-                "//input[@type='button' and contains(@value, '查詢')]",
-                "//input[@type='submit' and contains(@value, '查詢')]",
-                "//a[contains(text(), '查詢')]",
-                "//button[contains(text(), '搜尋')]",
-                "//input[@type='button' and contains(@value, '搜尋')]",
+                (By.XPATH, "//button[contains(text(), '查詢')]"),
+                (By.XPATH, "//input[@type='button' and contains(@value, '查詢')]"),
+                (By.XPATH, "//input[@type='submit' and contains(@value, '查詢')]"),
+                (By.XPATH, "//a[contains(text(), '查詢')]"),
+                (By.XPATH, "//button[contains(text(), '搜尋')]"),
+                (By.XPATH, "//input[@type='button' and contains(@value, '搜尋')]"),
             ]
 
-            for selector in query_selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for elem in elements:
-                        if elem.is_displayed() and elem.is_enabled():
-                            query_buttons_found.append(
-                                {
-                                    "element": elem,
-                                    "text": elem.text or elem.get_attribute("value"),
-                                    "selector": selector,
-                                }
-                            )
-                except:
-                    continue
+            for match in self.find_all_matches(query_selectors):
+                query_buttons_found.append(
+                    {
+                        "element": match["element"],
+                        "text": match["text"],
+                        "selector": query_selectors[match["index"]][1],
+                    }
+                )
 
             # 方法2：尋找所有按鈕，檢查文字內容
             if not query_buttons_found:
@@ -866,26 +885,20 @@ class PaymentScraper(BaseScraper):
 
             # 專門尋找「搜尋」按鈕
             search_selectors = [
-                "//button[contains(text(), '搜尋')]",
-                "//input[@type='button' and contains(@value, '搜尋')]",
-                "//input[@type='submit' and contains(@value, '搜尋')]",
-                "//a[contains(text(), '搜尋')]",
+                (By.XPATH, "//button[contains(text(), '搜尋')]"),
+                (By.XPATH, "//input[@type='button' and contains(@value, '搜尋')]"),
+                (By.XPATH, "//input[@type='submit' and contains(@value, '搜尋')]"),
+                (By.XPATH, "//a[contains(text(), '搜尋')]"),
             ]
 
-            for selector in search_selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for elem in elements:
-                        if elem.is_displayed() and elem.is_enabled():
-                            search_buttons_found.append(
-                                {
-                                    "element": elem,
-                                    "text": elem.text or elem.get_attribute("value"),
-                                    "selector": selector,
-                                }
-                            )
-                except:
-                    continue
+            for match in self.find_all_matches(search_selectors):
+                search_buttons_found.append(
+                    {
+                        "element": match["element"],
+                        "text": match["text"],
+                        "selector": search_selectors[match["index"]][1],
+                    }
+                )
 
             # 如果沒找到「搜尋」，再找「查詢」
             if not search_buttons_found:
@@ -933,16 +946,16 @@ class PaymentScraper(BaseScraper):
             # 專門尋找對帳單下載按鈕（基於用戶提供的確切元素）
             download_selectors = [
                 # 優先使用 ID 選擇器
-                ("id", "lnkbtnDownload"),
+                (By.ID, "lnkbtnDownload"),
                 # 備選：XPath 選擇器
-                ("xpath", "//a[@id='lnkbtnDownload']"),
-                ("xpath", "//a[contains(text(), '對帳單下載')]"),
+                (By.XPATH, "//a[@id='lnkbtnDownload']"),
+                (By.XPATH, "//a[contains(text(), '對帳單下載')]"),
                 # 其他可能的下載按鈕
-                ("xpath", "//button[contains(text(), '對帳單下載')]"),
-                ("xpath", "//input[contains(@value, '對帳單下載')]"),
-                ("xpath", "//a[contains(text(), '下載')]"),
-                ("xpath", "//button[contains(text(), '下載')]"),
-                ("xpath", "//input[contains(@value, '下載')]"),
+                (By.XPATH, "//button[contains(text(), '對帳單下載')]"),
+                (By.XPATH, "//input[contains(@value, '對帳單下載')]"),
+                (By.XPATH, "//a[contains(text(), '下載')]"),
+                (By.XPATH, "//button[contains(text(), '下載')]"),
+                (By.XPATH, "//input[contains(@value, '下載')]"),
             ]
 
             download_buttons_found = []
@@ -961,30 +974,17 @@ class PaymentScraper(BaseScraper):
                         error_message="頁面穩定",
                     )
 
-            for selector_type, selector_value in download_selectors:
-                try:
-                    if selector_type == "id":
-                        elements = [self.driver.find_element(By.ID, selector_value)]
-                    elif selector_type == "xpath":
-                        elements = self.driver.find_elements(By.XPATH, selector_value)
-                    else:
-                        continue
-
-                    for element in elements:
-                        if element.is_displayed() and element.is_enabled():
-                            element_text = element.text or element.get_attribute("value") or ""
-                            element_id = element.get_attribute("id") or ""
-                            download_buttons_found.append(
-                                {
-                                    "element": element,
-                                    "text": element_text,
-                                    "id": element_id,
-                                    "selector": f"{selector_type}:{selector_value}",
-                                }
-                            )
-                            print(f"   找到下載按鈕: '{element_text}' (id: {element_id})")
-                except:
-                    continue
+            # 一次腳本呼叫依序評估所有下載選擇器（已去除重複元素）
+            for match in self.find_all_matches(download_selectors):
+                by_method, selector_value = download_selectors[match["index"]]
+                download_buttons_found.append(
+                    {
+                        "element": match["element"],
+                        "text": match["text"],
+                        "selector": f"{by_method}:{selector_value}",
+                    }
+                )
+                print(f"   找到下載按鈕: '{match['text']}' ({by_method}: {selector_value})")
 
             # 如果沒找到明確的下載按鈕，掃描所有可點擊元素
             if not download_buttons_found:
@@ -1068,11 +1068,14 @@ class PaymentScraper(BaseScraper):
                         except Exception as dialog_e:
                             pass  # 忽略對話框處理錯誤
 
-                        # 智慧等待下載完成
-                        print("   ⏳ 等待檔案下載...")
-                        downloaded_files = self.smart_wait_for_file_download(
-                            expected_extension=".xlsx", timeout=30, check_interval=0.5
-                        )
+                        # 智慧等待下載完成（逾時依延遲歷史調整）
+                        wait_timeout = self.adaptive_timeout("download_wait", 30)
+                        print(f"   ⏳ 等待檔案下載（最多 {wait_timeout} 秒）...")
+                        with self.steps.span("download_wait") as span:
+                            downloaded_files = self.smart_wait_for_file_download(
+                                expected_extension=".xlsx", timeout=wait_timeout, check_interval=0.5
+                            )
+                            span["outcome"] = "ok" if downloaded_files else "failed"
 
                         if downloaded_files:
                             download_success = True
@@ -1135,6 +1138,70 @@ class PaymentScraper(BaseScraper):
         """關閉瀏覽器（委託父類處理共享模式判斷）"""
         super().close()
 
+    def _download_period(self, period_info):
+        """
+        選擇並下載單一結算期間的貨到付款匯款明細表
+
+        Returns:
+            list: 下載的檔案（檔案已存在時為空清單），沒有下載到檔案或失敗時回傳 None
+        """
+        try:
+            safe_print(f"📅 處理第 {period_info['index']} 期: {period_info['text']}")
+
+            # 選擇當前期數
+            self.current_settlement_period = period_info["text"]
+
+            # 檔案已存在時不需要選擇期數與下載
+            formatted_period = self.format_settlement_period_for_filename(period_info["text"])
+            if self.is_file_already_downloaded(f"客樂得對帳單_{self.username}_{formatted_period}.xlsx"):
+                return []
+
+            # 重新選擇期數
+            try:
+                from selenium.webdriver.support.ui import Select
+
+                # 尋找日期選單
+                date_selects = self.driver.find_elements(By.NAME, "ddlDate")
+                if not date_selects:
+                    date_selects = self.driver.find_elements(
+                        By.CSS_SELECTOR,
+                        "select[name*='date'], select[name*='Date'], select[id*='date'], select[id*='Date']",
+                    )
+
+                for select_element in date_selects:
+                    select_obj = Select(select_element)
+                    options = select_obj.options
+
+                    # 找到對應的選項並選擇
+                    for option in options:
+                        if option.text.strip() == period_info["text"]:
+                            select_obj.select_by_visible_text(period_info["text"])
+                            time.sleep(2)
+                            safe_print(f"   ✅ 已選擇期數: {period_info['text']}")
+                            break
+                    break
+            except Exception as select_e:
+                safe_print(f"   ⚠️ 選擇期數失敗: {select_e}，繼續嘗試下載")
+
+            # 下載當期資料
+            period_files = self.download_cod_statement()
+            if period_files:
+                self.steps.event(
+                    "download.period",
+                    period=period_info["index"],
+                    files=[Path(f).name for f in period_files],
+                )
+                safe_print(f"   ✅ 第 {period_info['index']} 期下載完成: {len(period_files)} 個檔案")
+                return period_files
+
+            # 沒有下載到檔案不標記完成，重試或 --resume 時重新下載此期
+            safe_print(f"   ⚠️ 第 {period_info['index']} 期未找到可下載的檔案")
+            return None
+
+        except Exception as period_e:
+            safe_print(f"   ❌ 處理第 {period_info['index']} 期失敗: {period_e}")
+            return None
+
     def run_full_process(self):
         """執行完整的自動化流程"""
         success = False
@@ -1152,38 +1219,26 @@ class PaymentScraper(BaseScraper):
             self.init_browser()
 
             # 2. 登入
+            self.progress.start_attempt()
+            self.progress.enter("login")
             login_success = self.login()
             if not login_success:
-                safe_print(f"❌ 帳號 {self.username} 登入失敗")
-                return {"success": False, "username": self.username, "error": "登入失敗", "downloads": []}
+                raise LoginRejected()
 
             # 3. 導航到貨到付款查詢頁面
+            self.progress.enter("navigate")
             nav_success = self.navigate_to_payment_query()
             if not nav_success:
                 # 檢查是否為密碼安全警告
                 if self.security_warning_encountered:
-                    safe_print(f"🚨 帳號 {self.username} 密碼安全警告")
-                    return {
-                        "success": False,
-                        "username": self.username,
-                        "error": "密碼安全警告",
-                        "error_type": "security_warning",
-                        "downloads": [],
-                    }
-                else:
-                    safe_print(f"❌ 帳號 {self.username} 導航失敗")
-                    return {"success": False, "username": self.username, "error": "導航失敗", "downloads": []}
+                    raise SecurityWarning()
+                raise ScraperError("導航失敗")
 
-            # 4. 獲取要下載的多期結算期間資訊
+            # 4. 獲取要下載的多期結算期間資訊（工作項目）
+            self.progress.enter("enumerate")
             periods_success = self.get_settlement_periods_for_download()
             if periods_success == "NO_DATA_AVAILABLE":
-                safe_print(f"ℹ️ 帳號 {self.username} 沒有可供查詢的日期區間，跳過下載")
-                return {
-                    "success": True,
-                    "username": self.username,
-                    "message": "沒有可供查詢的日期區間",
-                    "downloads": [],
-                }
+                raise NoData("沒有可供查詢的日期區間")
             elif not periods_success:
                 safe_print(f"⚠️ 帳號 {self.username} 未能獲取結算期間資訊")
                 safe_print("⏭️ 無法確定資料可用性，跳過此帳號")
@@ -1192,51 +1247,10 @@ class PaymentScraper(BaseScraper):
                 # 5. 逐一下載每期的貨到付款匯款明細表
                 safe_print(f"🎯 開始下載 {len(self.periods_to_download)} 期資料...")
 
-                for period_info in self.periods_to_download:
-                    try:
-                        safe_print(f"📅 處理第 {period_info['index']} 期: {period_info['text']}")
-
-                        # 選擇當前期數
-                        self.current_settlement_period = period_info["text"]
-
-                        # 重新選擇期數
-                        try:
-                            from selenium.webdriver.support.ui import Select
-
-                            # 尋找日期選單
-                            date_selects = self.driver.find_elements(By.NAME, "ddlDate")
-                            if not date_selects:
-                                date_selects = self.driver.find_elements(
-                                    By.CSS_SELECTOR,
-                                    "select[name*='date'], select[name*='Date'], select[id*='date'], select[id*='Date']",
-                                )
-
-                            for select_element in date_selects:
-                                select_obj = Select(select_element)
-                                options = select_obj.options
-
-                                # 找到對應的選項並選擇
-                                for option in options:
-                                    if option.text.strip() == period_info["text"]:
-                                        select_obj.select_by_visible_text(period_info["text"])
-                                        time.sleep(2)
-                                        safe_print(f"   ✅ 已選擇期數: {period_info['text']}")
-                                        break
-                                break
-                        except Exception as select_e:
-                            safe_print(f"   ⚠️ 選擇期數失敗: {select_e}，繼續嘗試下載")
-
-                        # 下載當期資料
-                        period_files = self.download_cod_statement()
-                        if period_files:
-                            downloaded_files.extend(period_files)
-                            safe_print(f"   ✅ 第 {period_info['index']} 期下載完成: {len(period_files)} 個檔案")
-                        else:
-                            safe_print(f"   ⚠️ 第 {period_info['index']} 期未找到可下載的檔案")
-
-                    except Exception as period_e:
-                        safe_print(f"   ❌ 處理第 {period_info['index']} 期失敗: {period_e}")
-                        continue
+                # 已完成的期間略過；瀏覽器失效時中止，重試時從失敗的期間續跑
+                downloaded_files = self.download_work_items(
+                    self.periods_to_download, lambda period_info: period_info["text"], self._download_period, label="期間"
+                )
 
             if downloaded_files:
                 safe_print(f"🎉 帳號 {self.username} 自動化流程完成！下載了 {len(downloaded_files)} 個檔案")
@@ -1255,13 +1269,8 @@ class PaymentScraper(BaseScraper):
                 }
 
         except Exception as e:
-            safe_print(f"💥 帳號 {self.username} 流程執行失敗: {e}")
-            return {
-                "success": False,
-                "username": self.username,
-                "error": str(e),
-                "downloads": [str(f) for f in downloaded_files],  # 轉換 PosixPath 為字串
-            }
+            # 可重試的錯誤（瀏覽器崩潰、網站無法連線）直接拋出，交由 MultiAccountManager 重試
+            return self.failure_result(e, downloaded_files)
         finally:
             # 結束執行時間計時
             self.end_execution_timer()
@@ -1275,6 +1284,7 @@ def main():
     parser = argparse.ArgumentParser(description="黑貓宅急便自動下載工具")
     parser.add_argument("--headless", action="store_true", help="使用無頭模式")
     parser.add_argument("--period", type=int, default=1, help="指定下載的期數 (1=最新一期, 2=第二新期數, 依此類推)")
+    parser.add_argument("--resume", action="store_true", help="從最近一次中斷的執行續跑（略過已完成的帳號）")
 
     args = parser.parse_args()
 
@@ -1284,7 +1294,9 @@ def main():
         manager = MultiAccountManager("accounts.json")
         # 只有在使用者明確指定 --headless 時才覆蓋設定檔
         headless_arg = True if "--headless" in sys.argv else None
-        manager.run_all_accounts(PaymentScraper, headless_override=headless_arg, period_number=args.period)
+        manager.run_all_accounts(
+            PaymentScraper, headless_override=headless_arg, resume=args.resume, period_number=args.period
+        )
 
         return 0
 
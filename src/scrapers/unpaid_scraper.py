@@ -9,6 +9,8 @@ import time
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
 from src.utils.windows_encoding_utils import safe_print, check_pythonunbuffered
 from src.core.base_scraper import BaseScraper
+from src.core.errors import ScraperError, LoginRejected, SecurityWarning
+from src.core.step_timing import timed_step
 from src.core.multi_account_manager import MultiAccountManager
 
 # 檢查環境變數
@@ -18,12 +20,8 @@ import re
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
-import requests
-import io
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
 
 class UnpaidScraper(BaseScraper):
@@ -35,10 +33,27 @@ class UnpaidScraper(BaseScraper):
     # 設定環境變數 key
     DOWNLOAD_DIR_ENV_KEY = "UNPAID_DOWNLOAD_WORK_DIR"
     DOWNLOAD_OK_DIR_ENV_KEY = "UNPAID_DOWNLOAD_OK_DIR"
-
-    def __init__(self, username, password, headless=None, days=None, quiet_init=False, shared_driver=None):
+    NAVIGATION_MEMO_KEY = "unpaid"
+
+    # 交易明細下載按鈕候選定位器（依優先順序）
+    DOWNLOAD_BUTTON_LOCATORS = [
+        (By.ID, "lnkbtnDownload"),
+        (By.ID, "btnDownload"),
+        (By.ID, "lnkDownload"),
+        (By.LINK_TEXT, "交易明細下載"),
+        (By.PARTIAL_LINK_TEXT, "明細下載"),
+        (By.PARTIAL_LINK_TEXT, "下載"),
+        (By.XPATH, "//a[contains(text(), '交易明細下載')]"),
+        (By.XPATH, "//a[contains(text(), '明細下載')]"),
+        (By.XPATH, "//a[contains(text(), '下載')]"),
+        (By.CSS_SELECTOR, "a[href*='Download']"),
+        (By.CSS_SELECTOR, "input[value*='下載']"),
+        (By.CSS_SELECTOR, "button[value*='下載']"),
+    ]
+
+    def __init__(self, username, password, headless=None, days=None, quiet_init=False, shared_driver=None, settings=None, progress=None):
         # 呼叫父類建構子
-        super().__init__(username, password, headless, shared_driver=shared_driver)
+        super().__init__(username, password, headless, shared_driver=shared_driver, settings=settings, progress=progress)
 
         # UnpaidScraper 特有的屬性
         # 天數設定（預設為 30 天）
@@ -55,11 +70,13 @@ class UnpaidScraper(BaseScraper):
         if not quiet_init:
             safe_print(f"📅 查詢範圍: 前 {self.days} 天")
 
+    @timed_step("navigation")
     def navigate_to_transaction_detail(self):
         """導航到交易明細表頁面 - 包含完整重試機制和 session timeout 處理"""
         safe_print("🧭 導航到交易明細表頁面...")
 
         max_attempts = 3  # 最多嘗試 3 次
+        nav_started = time.time()
 
         for attempt in range(max_attempts):
             if attempt > 0:
@@ -67,9 +84,18 @@ class UnpaidScraper(BaseScraper):
                 # 移除固定等待，後續的智慧等待已足夠
 
             try:
-                # 智慧等待登入完成
-                safe_print("⏳ 等待登入完成...")
-                self.smart_wait_for_url_change(timeout=10)
+                # 導航備忘錄：登入後直接跳到上次成功的頁面，只有驗證失敗才執行備援導航
+                memo_result = self._navigate_via_memo(self._is_transaction_detail_page) if attempt == 0 else None
+                if memo_result:
+                    return True
+                if self.security_warning_encountered:
+                    safe_print("🚨 檢測到密碼安全警告，終止當前帳號處理")
+                    return False
+
+                # 智慧等待登入完成（備忘錄已導航離開首頁時不需等待）
+                if memo_result is None:
+                    safe_print("⏳ 等待登入完成...")
+                    self.smart_wait_for_url_change(timeout=10)
 
                 # 檢查當前會話狀態
                 if self._check_session_timeout():
@@ -89,6 +115,7 @@ class UnpaidScraper(BaseScraper):
 
                 if direct_success:
                     safe_print("✅ 直接 URL 導航成功")
+                    self._remember_navigation("direct_url", nav_started, self._last_navigation_url)
                     return True
 
                 # 如果直接 URL 失敗，再次檢查是否為會話超時
@@ -106,6 +133,7 @@ class UnpaidScraper(BaseScraper):
 
                         if direct_success:
                             safe_print("✅ 重新登入後直接 URL 導航成功")
+                            self._remember_navigation("direct_url", nav_started, self._last_navigation_url)
                             return True
 
                 # 方法2: 嘗試框架導航
@@ -113,6 +141,7 @@ class UnpaidScraper(BaseScraper):
                 frame_success = self._navigate_through_menu()
                 if frame_success:
                     safe_print("✅ 框架導航成功")
+                    self._remember_navigation("menu", nav_started)
                     return True
                 else:
                     safe_print("❌ 框架導航失敗")
@@ -123,7 +152,7 @@ class UnpaidScraper(BaseScraper):
                     try:
                         # 回到合約客戶專區首頁
                         home_url = "https://www.takkyubin.com.tw/YMTContract/default.aspx"
-                        self.driver.get(home_url)
+                        self.load_page(home_url)
                         self.smart_wait_for_url_change(timeout=5)
 
                         # 檢查是否需要重新登入
@@ -166,6 +195,9 @@ class UnpaidScraper(BaseScraper):
                 "https://www.takkyubin.com.tw/YMTContract/aspx/SudaPaymentDetail.aspx?DetailType=02",
             ]
 
+            # 上次成功的 URL 優先嘗試
+            direct_urls = self.order_navigation_urls("transaction_direct_url", direct_urls)
+
             max_retries = 2  # 每個 URL 最多重試 2 次
 
             for url_index, full_url in enumerate(direct_urls):
@@ -176,7 +208,7 @@ class UnpaidScraper(BaseScraper):
                         print(f"      重試 {retry}/{max_retries}...")
 
                     try:
-                        self.driver.get(full_url)
+                        self.load_page(full_url)
                         # 短暫等待以檢測 alert（保留此處固定等待，因 alert 檢測需要）
                         time.sleep(0.5)
 
@@ -204,7 +236,7 @@ class UnpaidScraper(BaseScraper):
                             if self._handle_session_timeout():
                                 print("   ✅ 重新登入成功，重試導航...")
                                 # 重新嘗試當前 URL
-                                self.driver.get(full_url)
+                                self.load_page(full_url)
                                 # 智慧等待頁面完全載入
                                 self.smart_wait(
                                     lambda d: d.execute_script("return document.readyState") == "complete",
@@ -219,6 +251,7 @@ class UnpaidScraper(BaseScraper):
                         # 檢查是否成功到達交易明細表頁面
                         if self._is_transaction_detail_page():
                             safe_print("✅ 直接 URL 訪問成功")
+                            self.remember_navigation_url("transaction_direct_url", full_url)
                             return True
                         else:
                             print("   ❌ 未能到達交易明細表頁面")
@@ -385,8 +418,8 @@ class UnpaidScraper(BaseScraper):
     def _is_transaction_detail_page(self):
         """檢查是否成功到達交易明細表頁面"""
         try:
-            current_url = self.driver.current_url
-            page_source = self.driver.page_source
+            # 一次傳輸取得 URL 與原始碼，元素檢查改在本地解析
+            snapshot = self.get_page_snapshot()
 
             # 檢查 URL 是否包含預期的頁面標識
             url_indicators = ["SudaPaymentDetail.aspx", "TimeOut=N"]
@@ -401,31 +434,11 @@ class UnpaidScraper(BaseScraper):
                 "結束日期",  # 日期選擇欄位
             ]
 
-            url_match = any(indicator in current_url for indicator in url_indicators)
-            content_match = any(indicator in page_source for indicator in content_indicators)
-
-            # 更精確的元素檢查
-            element_check = False
-            try:
-                # 檢查關鍵元素是否存在
-                key_elements = [
-                    ("ID", "lnkbtnDownload"),  # 下載按鈕
-                ]
-
-                found_elements = 0
-                for method, selector in key_elements:
-                    try:
-                        if method == "ID":
-                            element = self.driver.find_element(By.ID, selector)
-                            if element:
-                                found_elements += 1
-                    except:
-                        continue
-
-                element_check = found_elements >= 1  # 至少找到 1 個關鍵元素
+            url_match = bool(snapshot.url_contains_any(url_indicators))
+            content_match = bool(snapshot.contains_any(content_indicators))
 
-            except Exception as e:
-                pass
+            # 更精確的元素檢查：下載按鈕是否存在
+            element_check = snapshot.soup.find(id="lnkbtnDownload") is not None
 
             safe_print(f"📍 URL 檢查: {'✅' if url_match else '❌'}")
             safe_print(f"📄 內容檢查: {'✅' if content_match else '❌'}")
@@ -509,7 +522,7 @@ class UnpaidScraper(BaseScraper):
                     # 重新載入頁面
                     transaction_url = "https://www.takkyubin.com.tw/YMTContract/aspx/RedirectFunc.aspx?FuncNo=167"
                     old_url = self.driver.current_url
-                    self.driver.get(transaction_url)
+                    self.load_page(transaction_url)
                     self.smart_wait_for_url_change(old_url, timeout=5)
 
                 # 記錄下載前的檔案
@@ -609,41 +622,16 @@ class UnpaidScraper(BaseScraper):
             end_date = end_date_obj.strftime("%Y%m%d")
             return start_date, end_date
 
+    @timed_step("search")
     def _perform_ajax_search(self, start_date, end_date):
         """執行 AJAX 搜尋請求"""
         safe_print("🔍 執行 AJAX 搜尋請求...")
 
         try:
-            # 基於實際的 HTML 結構設定日期欄位
-            start_date_input = None
-            end_date_input = None
-
-            # 方法1: 使用確切的 ID（基於 freight_scraper 的成功經驗）
-            try:
-                start_date_input = self.driver.find_element(By.ID, "txtDateS")
-                end_date_input = self.driver.find_element(By.ID, "txtDateE")
-                safe_print("✅ 找到確切的日期輸入框 (txtDateS, txtDateE)")
-            except:
-                safe_print("⚠️ 未找到確切的日期輸入框，嘗試備用方法")
-
-                # 方法2: 使用 name 屬性
-                try:
-                    start_date_input = self.driver.find_element(By.NAME, "txtDateS")
-                    end_date_input = self.driver.find_element(By.NAME, "txtDateE")
-                    safe_print("✅ 通過 name 屬性找到日期輸入框")
-                except:
-                    # 方法3: 嘗試交易明細表特有的 ID
-                    try:
-                        start_date_input = self.driver.find_element(By.ID, "txtStartDate")
-                        end_date_input = self.driver.find_element(By.ID, "txtEndDate")
-                        safe_print("✅ 找到交易明細表日期輸入框")
-                    except:
-                        # 方法4: 通用搜索
-                        date_inputs = self.driver.find_elements(By.CSS_SELECTOR, "input[type='text']")
-                        if len(date_inputs) >= 2:
-                            start_date_input = date_inputs[0]
-                            end_date_input = date_inputs[1]
-                            safe_print(f"✅ 通過通用搜索找到 {len(date_inputs)} 個輸入框")
+            # 一次腳本呼叫評估所有日期欄位定位策略（txtDateS/txtDateE 優先）
+            start_date_input, end_date_input = self.find_date_inputs()
+            if start_date_input and end_date_input:
+                safe_print("✅ 找到日期輸入框")
 
             # 填入日期範圍
             if start_date_input and end_date_input:
@@ -681,67 +669,37 @@ class UnpaidScraper(BaseScraper):
     def _trigger_search_button(self):
         """嘗試觸發搜尋按鈕"""
         try:
-            # 嘗試多種搜尋按鈕 ID
-            search_button_ids = ["btnSearch", "btnQuery", "lnkbtnSearch"]
-
-            for button_id in search_button_ids:
-                try:
-                    search_button = self.driver.find_element(By.ID, button_id)
-                    if search_button and search_button.is_displayed() and search_button.is_enabled():
-                        safe_print(f"✅ 找到搜尋按鈕: {button_id}")
-                        self.driver.execute_script("arguments[0].click();", search_button)
-                        return True
-                except:
-                    continue
-
-            # 如果 ID 搜尋失敗，嘗試通用搜尋
-            try:
-                search_buttons = self.driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "input[type='submit'][value*='搜'], input[type='button'][value*='搜'], button[value*='搜']",
-                )
-                for button in search_buttons:
-                    if button.is_displayed() and button.is_enabled():
-                        safe_print("✅ 找到通用搜尋按鈕")
-                        self.driver.execute_script("arguments[0].click();", button)
-                        return True
-            except:
-                pass
+            # 多種搜尋按鈕 ID 與通用選擇器在一次腳本呼叫中評估
+            search_button, index = self.find_first_match(self.SEARCH_BUTTON_LOCATORS, cache_slot="search_button")
+            if not search_button:
+                return False
 
-            return False
+            safe_print(f"✅ 找到搜尋按鈕: {self.SEARCH_BUTTON_LOCATORS[index][1]}")
+            self.driver.execute_script("arguments[0].click();", search_button)
+            return True
 
         except Exception as e:
             safe_print(f"❌ 觸發搜尋按鈕失敗: {e}")
             return False
 
+    @timed_step("search_wait")
     def _wait_for_search_results(self, timeout=30):
-        """等待搜尋結果載入 - 使用智慧等待"""
-        safe_print("⏳ 等待搜尋結果載入...")
+        """等待搜尋結果載入 - 每次輪詢以一次腳本呼叫檢查所有下載元素（逾時依延遲歷史調整）"""
+        timeout = self.adaptive_timeout("search_wait", timeout)
+        safe_print(f"⏳ 等待搜尋結果載入（最多 {timeout} 秒）...")
 
         try:
-            # 嘗試多種可能的下載按鈕 ID
-            download_button_ids = ["lnkbtnDownload", "btnDownload", "lnkDownload"]
-
-            for button_id in download_button_ids:
-                download_button = self.smart_wait_for_element(
-                    By.ID, button_id, timeout=timeout // len(download_button_ids), visible=True
-                )
-
-                if download_button:
-                    safe_print(f"✅ 搜尋結果載入完成，下載按鈕已準備就緒: {button_id}")
-                    return True
-
-            # 如果沒找到特定 ID，嘗試 XPath 搜尋
-            safe_print("⚠️ 嘗試使用 XPath 搜尋下載元素...")
-            download_element = self.smart_wait_for_element(
-                By.XPATH,
-                "//*[contains(text(), '下載') or contains(text(), '明細下載') or contains(text(), '交易明細下載')]",
-                timeout=10,
-                visible=True,
+            result_locators = self.DOWNLOAD_BUTTON_LOCATORS[:3] + [
+                (By.XPATH, "//*[contains(text(), '下載') or contains(text(), '明細下載') or contains(text(), '交易明細下載')]"),
+            ]
+            download_element = self.smart_wait(
+                lambda d: self.find_first_match(result_locators, enabled=False)[0],
+                timeout=timeout,
+                error_message="搜尋結果載入",
             )
 
             if download_element:
-                safe_print("✅ 搜尋結果載入完成，找到下載元素")
+                safe_print("✅ 搜尋結果載入完成，下載按鈕已準備就緒")
                 return True
 
             safe_print("⚠️ 搜尋結果載入超時，可能沒有符合條件的資料")
@@ -751,6 +709,7 @@ class UnpaidScraper(BaseScraper):
             safe_print(f"⚠️ 搜尋結果載入失敗: {e}")
             return False
 
+    @timed_step("download")
     def _click_download_button(self, max_retries=3):
         """點擊交易明細下載按鈕，支援重試機制"""
         safe_print("🖱️ 點擊交易明細下載按鈕...")
@@ -761,52 +720,11 @@ class UnpaidScraper(BaseScraper):
                     safe_print(f"🔄 第 {retry + 1} 次重試點擊下載按鈕...")
                     self.smart_wait(1)  # 等待頁面穩定
 
-                download_button = None
-
-                # 方法1: 嘗試多種可能的下載按鈕 ID (重新查找)
-                download_button_ids = ["lnkbtnDownload", "btnDownload", "lnkDownload"]
-
-                for button_id in download_button_ids:
-                    try:
-                        # 每次都重新查找元素，避免 stale reference
-                        download_button = self.driver.find_element(By.ID, button_id)
-                        if download_button and download_button.is_displayed() and download_button.is_enabled():
-                            safe_print(f"✅ 找到下載按鈕: {button_id} (ID)")
-                            break
-                    except:
-                        continue
-
-                # 方法2: 如果沒找到特定 ID，嘗試文字搜尋
-                if not download_button:
-                    backup_selectors = [
-                        ("LINK_TEXT", "交易明細下載"),
-                        ("PARTIAL_LINK_TEXT", "明細下載"),
-                        ("PARTIAL_LINK_TEXT", "下載"),
-                        ("XPATH", "//a[contains(text(), '交易明細下載')]"),
-                        ("XPATH", "//a[contains(text(), '明細下載')]"),
-                        ("XPATH", "//a[contains(text(), '下載')]"),
-                        ("CSS", "a[href*='Download']"),
-                        ("CSS", "input[value*='下載']"),
-                        ("CSS", "button[value*='下載']"),
-                    ]
-
-                    for method, selector in backup_selectors:
-                        try:
-                            if method == "LINK_TEXT":
-                                download_button = self.driver.find_element(By.LINK_TEXT, selector)
-                            elif method == "PARTIAL_LINK_TEXT":
-                                download_button = self.driver.find_element(By.PARTIAL_LINK_TEXT, selector)
-                            elif method == "XPATH":
-                                download_button = self.driver.find_element(By.XPATH, selector)
-                            elif method == "CSS":
-                                download_button = self.driver.find_element(By.CSS_SELECTOR, selector)
-
-                            if download_button and download_button.is_displayed() and download_button.is_enabled():
-                                safe_print(f"✅ 找到備用下載按鈕: {method}={selector}")
-                                break
-
-                        except Exception:
-                            continue
+                # 每次都重新查找元素，避免 stale reference（ID 優先，其次文字搜尋）
+                download_button, index = self.find_first_match(self.DOWNLOAD_BUTTON_LOCATORS, cache_slot="download_button")
+                if download_button:
+                    by_method, selector = self.DOWNLOAD_BUTTON_LOCATORS[index]
+                    safe_print(f"✅ 找到下載按鈕: {by_method}={selector}")
 
                 if not download_button:
                     if retry < max_retries - 1:
@@ -853,30 +771,25 @@ class UnpaidScraper(BaseScraper):
         try:
             safe_print("🔍 檢查交易記錄筆數...")
 
-            # 查找包含筆數資訊的元素
-            count_element = None
+            # 一次傳輸取得頁面原始碼，筆數元素在本地解析的 DOM 中查找
+            snapshot = self.get_page_snapshot()
+            soup = snapshot.soup
 
             # 方法1: 直接尋找 lblTotleCount ID
-            try:
-                count_element = self.driver.find_element(By.ID, "lblTotleCount")
+            count_element = soup.find(id="lblTotleCount")
+            if count_element is not None:
                 safe_print("✅ 找到筆數元素 (lblTotleCount)")
-            except:
-                # 方法2: 尋找包含 "交易共" 和 "筆" 的文字
-                try:
-                    count_elements = self.driver.find_elements(
-                        By.XPATH, "//span[contains(@style, 'color:Red;') or contains(@style, 'color:red;')]"
-                    )
-                    for element in count_elements:
-                        if element.text.isdigit():
-                            count_element = element
-                            safe_print("✅ 找到筆數元素 (通過紅色文字)")
-                            break
-                except:
-                    pass
-
-            if count_element:
+            else:
+                # 方法2: 尋找紅色文字的純數字 span
+                for element in soup.find_all("span", style=re.compile(r"color:\s*red;", re.IGNORECASE)):
+                    if element.get_text(strip=True).isdigit():
+                        count_element = element
+                        safe_print("✅ 找到筆數元素 (通過紅色文字)")
+                        break
+
+            if count_element is not None:
                 try:
-                    count_text = count_element.text.strip()
+                    count_text = count_element.get_text(strip=True)
                     record_count = int(count_text)
                     safe_print(f"📊 交易記錄筆數: {record_count} 筆")
 
@@ -894,14 +807,9 @@ class UnpaidScraper(BaseScraper):
             else:
                 safe_print("⚠️ 未找到筆數元素，檢查頁面內容...")
 
-                # 備用方法：檢查頁面源碼
-                page_source = self.driver.page_source
-
-                # 尋找 "交易共 X 筆" 的模式
-                import re
-
+                # 備用方法：檢查頁面源碼，尋找 "交易共 X 筆" 的模式
                 pattern = r"交易共.*?(\d+).*?筆"
-                match = re.search(pattern, page_source)
+                match = re.search(pattern, snapshot.source)
 
                 if match:
                     record_count = int(match.group(1))
@@ -922,8 +830,10 @@ class UnpaidScraper(BaseScraper):
             # 發生錯誤時謹慎起見還是允許下載
             return True
 
+    @timed_step("download_wait")
     def _wait_for_download(self, files_before, timeout=30):
-        """等待檔案下載完成 - 使用智慧等待"""
+        """等待檔案下載完成 - 使用智慧等待（逾時依延遲歷史調整）"""
+        timeout = self.adaptive_timeout("download_wait", timeout)
         safe_print(f"⏳ 等待檔案下載完成（最多 {timeout} 秒）...")
 
         # 使用智慧檔案下載等待
@@ -992,29 +902,23 @@ class UnpaidScraper(BaseScraper):
             self.init_browser()
 
             # 2. 登入
+            self.progress.start_attempt()
+            self.progress.enter("login")
             login_success = self.login()
             if not login_success:
-                safe_print(f"❌ 帳號 {self.username} 登入失敗")
-                return {"success": False, "username": self.username, "error": "登入失敗", "downloads": []}
+                raise LoginRejected()
 
             # 3. 導航到交易明細表頁面
+            self.progress.enter("navigate")
             nav_success = self.navigate_to_transaction_detail()
             if not nav_success:
                 # 檢查是否為密碼安全警告
                 if self.security_warning_encountered:
-                    safe_print(f"🚨 帳號 {self.username} 密碼安全警告")
-                    return {
-                        "success": False,
-                        "username": self.username,
-                        "error": "密碼安全警告",
-                        "error_type": "security_warning",
-                        "downloads": [],
-                    }
-                else:
-                    safe_print(f"❌ 帳號 {self.username} 導航失敗")
-                    return {"success": False, "username": self.username, "error": "導航失敗", "downloads": []}
+                    raise SecurityWarning()
+                raise ScraperError("導航失敗")
 
-            # 4. 搜尋並下載指定天數範圍的交易明細
+            # 4. 搜尋並下載指定天數範圍的交易明細（單一報表，不再拆分工作項目）
+            self.progress.enter("download")
             downloaded_files, days_details = self.search_and_download_days()
 
             if downloaded_files:
@@ -1036,14 +940,8 @@ class UnpaidScraper(BaseScraper):
                 }
 
         except Exception as e:
-            safe_print(f"💥 帳號 {self.username} 流程執行失敗: {e}")
-            return {
-                "success": False,
-                "username": self.username,
-                "error": str(e),
-                "downloads": [str(f) for f in downloaded_files],
-                "days_details": getattr(locals(), "days_details", {}),
-            }
+            # 可重試的錯誤（瀏覽器崩潰、網站無法連線）直接拋出，交由 MultiAccountManager 重試
+            return {**self.failure_result(e, downloaded_files), "days_details": {}}
         finally:
             # 結束執行時間計時
             self.end_execution_timer()
@@ -1057,6 +955,7 @@ def main():
     parser = argparse.ArgumentParser(description="黑貓宅急便交易明細表自動下載工具")
     parser.add_argument("--headless", action="store_true", help="使用無頭模式")
     parser.add_argument("--days", type=int, default=30, help="要下載的天數範圍 (預設: 30 天)")
+    parser.add_argument("--resume", action="store_true", help="從最近一次中斷的執行續跑（略過已完成的帳號）")
 
     args = parser.parse_args()
 
@@ -1066,7 +965,7 @@ def main():
         manager = MultiAccountManager("accounts.json")
         # 只有在使用者明確指定 --headless 時才覆蓋設定檔
         headless_arg = True if "--headless" in sys.argv else None
-        manager.run_all_accounts(UnpaidScraper, headless_override=headless_arg, days=args.days)
+        manager.run_all_accounts(UnpaidScraper, headless_override=headless_arg, resume=args.resume, days=args.days)
 
         return 0
 
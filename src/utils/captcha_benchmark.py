@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+═══════════════════════════════════════════════════════════════════════════
+驗證碼 OCR 準確率與延遲基準測試 - SeleniumTCat
+═══════════════════════════════════════════════════════════════════════════
+用途: 以已標註的驗證碼語料比較 ddddocr 各種設定（預設 / beta 模型、
+      字元集範圍、前處理步驟）的首次識別準確率與每張圖片耗時
+語料: 執行爬蟲時設定 CAPTCHA_CORPUS_DIR 自動收集（見 src/core/captcha_corpus.py）
+執行:
+  PYTHONPATH=$(pwd) uv run python src/utils/captcha_benchmark.py --corpus captcha_corpus
+  PYTHONPATH=$(pwd) uv run python src/utils/captcha_benchmark.py --corpus captcha_corpus --configs default,beta
+  PYTHONPATH=$(pwd) uv run python src/utils/captcha_benchmark.py --corpus captcha_corpus --label
+═══════════════════════════════════════════════════════════════════════════
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+# 確保可以導入 src 模組
+# __file__ 在 src/utils/，需要往上兩層到達專案根目錄
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    import numpy as np
+    from src.core.captcha_corpus import CaptchaCorpus
+    from src.core.captcha_preprocess import CaptchaSolver, CaptchaEnsemble
+    from src.utils.windows_encoding_utils import safe_print
+except ImportError as e:
+    print(f"❌ 導入模組失敗: {e}")
+    print("請確認在專案根目錄執行，並設定 PYTHONPATH=$(pwd)")
+    sys.exit(1)
+
+
+# 可比較的 OCR 設定：beta 模型、字元集範圍（ddddocr set_ranges 的參數）、前處理步驟
+OCR_CONFIGS = {
+    "default": {"beta": False, "ranges": None, "stages": []},
+    "beta": {"beta": True, "ranges": None, "stages": []},
+    "default-alnum": {"beta": False, "ranges": 6, "stages": []},  # 大小寫英文 + 數字
+    "beta-alnum": {"beta": True, "ranges": 6, "stages": []},
+    "default-lower-digits": {"beta": False, "ranges": 4, "stages": []},  # 小寫英文 + 數字
+    "default-digits": {"beta": False, "ranges": 0, "stages": []},  # 純數字
+    "default-gray": {"beta": False, "ranges": None, "stages": ["grayscale"]},
+    "default-threshold": {"beta": False, "ranges": None, "stages": ["grayscale", "threshold"]},
+    "default-clean": {"beta": False, "ranges": None, "stages": ["grayscale", "threshold", "denoise", "crop"]},
+    "beta-clean": {"beta": True, "ranges": None, "stages": ["grayscale", "threshold", "denoise", "crop"]},
+    # 多模型投票：default + beta + 前處理變體（平行識別）
+    "ensemble": {"beta": False, "ranges": None, "stages": [], "ensemble": True},
+}
+
+
+def build_ocr(config):
+    """依設定建立識別器，回傳 (識別函式, 載入耗時毫秒)"""
+    started = time.perf_counter()
+    solver = CaptchaSolver(stages=config["stages"], ranges=config["ranges"], beta=config["beta"])
+    if config.get("ensemble"):
+        solver = CaptchaEnsemble.from_primary(solver)
+    load_ms = (time.perf_counter() - started) * 1000
+    return solver.classify, load_ms
+
+
+def char_accuracy(prediction, label):
+    """逐位置字元準確率"""
+    if not label:
+        return 0.0
+    matches = sum(1 for a, b in zip(prediction, label) if a == b)
+    return matches / max(len(label), len(prediction))
+
+
+def benchmark_config(name, config, samples, ignore_case=False):
+    """以單一設定識別所有樣本，回傳統計結果"""
+    classify, load_ms = build_ocr(config)
+
+    # 預熱一次，避免首次推論的初始化成本計入每張耗時
+    classify(samples[0][1])
+
+    latencies = []
+    correct = 0
+    char_scores = []
+    for label, image_bytes in samples:
+        started = time.perf_counter()
+        prediction = classify(image_bytes) or ""
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        if ignore_case:
+            prediction, label = prediction.lower(), label.lower()
+        correct += prediction == label
+        char_scores.append(char_accuracy(prediction, label))
+
+    latencies_arr = np.asarray(latencies)
+    return {
+        "config": name,
+        "samples": len(samples),
+        "accuracy": correct / len(samples),
+        "char_accuracy": float(np.mean(char_scores)),
+        "mean_ms": float(latencies_arr.mean()),
+        "p50_ms": float(np.percentile(latencies_arr, 50)),
+        "p95_ms": float(np.percentile(latencies_arr, 95)),
+        "load_ms": load_ms,
+    }
+
+
+def print_table(results):
+    """列印比較表（依準確率排序）"""
+    headers = ["設定", "樣本", "準確率", "字元準確率", "平均ms", "p50ms", "p95ms", "載入ms"]
+    rows = [
+        [
+            r["config"],
+            str(r["samples"]),
+            f"{r['accuracy'] * 100:.1f}%",
+            f"{r['char_accuracy'] * 100:.1f}%",
+            f"{r['mean_ms']:.1f}",
+            f"{r['p50_ms']:.1f}",
+            f"{r['p95_ms']:.1f}",
+            f"{r['load_ms']:.0f}",
+        ]
+        for r in sorted(results, key=lambda r: (-r["accuracy"], r["mean_ms"]))
+    ]
+    widths = [max(len(str(row[i])) for row in rows + [headers]) + 2 for i in range(len(headers))]
+
+    print("\n" + "=" * sum(widths))
+    print("".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("-" * sum(widths))
+    for row in rows:
+        print("".join(cell.ljust(w) for cell, w in zip(row, widths)))
+    print("=" * sum(widths))
+
+
+def label_interactively(corpus):
+    """逐張標註待標註圖片：直接 Enter 採用 OCR 建議、輸入 s 跳過、輸入 q 結束"""
+    samples = corpus.unlabelled_samples()
+    if not samples:
+        safe_print("✅ 沒有待標註的圖片")
+        return
+
+    predictions = {}
+    index_file = corpus.root / "index.jsonl"
+    if index_file.exists():
+        for line in index_file.read_text(encoding="utf-8").splitlines():
+            try:
+                entry = json.loads(line)
+                predictions[Path(entry["file"]).name] = entry.get("prediction", "")
+            except Exception:
+                continue
+
+    safe_print(f"📝 共 {len(samples)} 張待標註圖片")
+    for path in samples:
+        suggestion = predictions.get(path.name, "")
+        answer = input(f"{path}  OCR: {suggestion or '-'}  答案> ").strip()
+        if answer == "q":
+            break
+        if answer == "s" or not (answer or suggestion):
+            continue
+        target = corpus.apply_label(path, answer or suggestion)
+        safe_print(f"✅ 已標註: {target.name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="驗證碼 OCR 準確率與延遲基準測試")
+    parser.add_argument("--corpus", required=True, help="語料根目錄（CAPTCHA_CORPUS_DIR）")
+    parser.add_argument(
+        "--configs", default=",".join(OCR_CONFIGS), help=f"要比較的設定，逗號分隔（可用: {', '.join(OCR_CONFIGS)}）"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="最多使用幾張樣本")
+    parser.add_argument("--ignore-case", action="store_true", help="比較時忽略大小寫")
+    parser.add_argument("--json", dest="json_path", help="將結果另存為 JSON")
+    parser.add_argument("--label", action="store_true", help="互動式標註待標註圖片")
+    args = parser.parse_args()
+
+    corpus = CaptchaCorpus(args.corpus)
+    if args.label:
+        label_interactively(corpus)
+        return
+
+    samples = [(label, path.read_bytes()) for path, label in corpus.labelled_samples()]
+    if args.limit:
+        samples = samples[: args.limit]
+    if not samples:
+        safe_print(f"❌ {args.corpus} 中沒有已標註的樣本（labelled/<答案>_<id>.png）")
+        sys.exit(1)
+
+    names = [name.strip() for name in args.configs.split(",") if name.strip()]
+    unknown = [name for name in names if name not in OCR_CONFIGS]
+    if unknown:
+        safe_print(f"❌ 未知的設定: {', '.join(unknown)}")
+        sys.exit(1)
+
+    safe_print(f"📊 使用 {len(samples)} 張已標註樣本比較 {len(names)} 種設定...")
+    results = []
+    for name in names:
+        safe_print(f"🔍 測試設定: {name}")
+        try:
+            results.append(benchmark_config(name, OCR_CONFIGS[name], samples, args.ignore_case))
+        except Exception as e:
+            safe_print(f"❌ 設定 {name} 測試失敗: {e}")
+
+    if results:
+        print_table(results)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        safe_print(f"💾 結果已儲存: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,28 +5,49 @@
 Discord 通知工具模組
 """
 
-import os
-import requests
+import time
 from typing import List, Dict, Optional
 from .windows_encoding_utils import safe_print
+from ..core.settings import get_settings
 
 
 class DiscordNotifier:
     """Discord Webhook 通知器"""
 
-    def __init__(self, webhook_url: Optional[str] = None):
+    # 429 速率限制時最多依 retry_after 重送的次數與單次等待上限（秒）
+    MAX_RATE_LIMIT_WAITS = 3
+    MAX_RETRY_AFTER = 30.0
+
+    def __init__(self, webhook_url: Optional[str] = None, settings=None):
         """
         初始化 Discord 通知器
 
         Args:
-            webhook_url: Discord Webhook URL（若不提供則從環境變數讀取）
+            webhook_url: Discord Webhook URL（若不提供則從設定讀取）
+            settings: 執行設定（預設 get_settings()）
         """
-        webhook_url_raw = webhook_url or os.getenv("DISCORD_WEBHOOK_URL")
+        settings = settings or get_settings()
+        webhook_url_raw = webhook_url or settings.discord_webhook_url
         # 清理可能的格式問題（移除開頭的 = 或引號）
         if webhook_url_raw:
             webhook_url_raw = webhook_url_raw.strip().lstrip('=').strip('"').strip("'")
         self.webhook_url = webhook_url_raw if webhook_url_raw else None
 
+    @staticmethod
+    def _retry_after_seconds(response) -> float:
+        """由 429 回應取得需等待的秒數（JSON retry_after 優先，其次 Retry-After 標頭）"""
+        retry_after = None
+        try:
+            retry_after = float(response.json().get("retry_after"))
+        except Exception:
+            try:
+                retry_after = float(response.headers.get("Retry-After"))
+            except (TypeError, ValueError):
+                pass
+        if retry_after is None:
+            retry_after = 1.0
+        return min(max(retry_after, 0.0), DiscordNotifier.MAX_RETRY_AFTER) + 0.1
+
     def is_enabled(self) -> bool:
         """檢查是否啟用 Discord 通知"""
         return bool(self.webhook_url)
@@ -46,17 +67,27 @@ class DiscordNotifier:
             safe_print("⚠️  Discord Webhook URL 未設定，跳過通知")
             return False
 
+        # 只在實際發送時才載入 requests（縮短不需通知時的啟動時間）
+        import requests
+
         try:
             payload = {"content": content}
             if embeds:
                 payload["embeds"] = embeds
 
-            response = requests.post(
-                self.webhook_url,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=10,
-            )
+            for _ in range(self.MAX_RATE_LIMIT_WAITS + 1):
+                response = requests.post(
+                    self.webhook_url,
+                    json=payload,
+                    headers={"Content-Type": "application/json"},
+                    timeout=10,
+                )
+                if response.status_code != 429:
+                    break
+                # 速率限制：依 Discord 回傳的 retry_after 等待後重送
+                retry_after = self._retry_after_seconds(response)
+                safe_print(f"⏳ Discord 速率限制，{retry_after:.1f} 秒後重送")
+                time.sleep(retry_after)
 
             if response.status_code in (200, 204):
                 safe_print("✅ Discord 通知發送成功")
@@ -5,12 +5,140 @@
 Email 通知工具模組
 """
 
-import os
+import time
 import smtplib
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from .windows_encoding_utils import safe_print
+from ..core.settings import get_settings
+
+
+class SmtpTransport:
+    """
+    SMTP 傳輸層：延遲建立並保持連線，多封郵件共用同一個連線（只需一次 TLS 交握與登入）
+
+    連線閒置超過 idle_timeout 秒會先關閉再重連（避免使用已被伺服器斷開的連線），
+    發送時連線中斷則自動重連並重送一次。多執行緒共用時以鎖串接。
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        encryption: str = "tls",
+        timeout: float = 30,
+        idle_timeout: Optional[float] = None,
+    ):
+        """
+        初始化 SMTP 傳輸層（此時不連線）
+
+        Args:
+            host: SMTP 伺服器位址
+            port: SMTP 伺服器埠號
+            username: SMTP 帳號（未提供時不登入，例如本機除錯用 SMTP 伺服器）
+            password: SMTP 密碼
+            encryption: 加密方式 tls/ssl/none
+            timeout: 連線逾時秒數
+            idle_timeout: 連線閒置多久後重連（預設讀取設定 MAIL_IDLE_TIMEOUT，否則 60 秒）
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.encryption = encryption
+        self.timeout = timeout
+        if idle_timeout is None:
+            idle_timeout = get_settings().mail_idle_timeout
+        self.idle_timeout = idle_timeout
+        self._server = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"connections": 0, "reconnects": 0, "messages": 0, "connect_seconds": 0.0}
+
+    def _connect(self):
+        """建立連線（含 STARTTLS 與登入）"""
+        started = time.perf_counter()
+        if self.encryption == "ssl":
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.encryption == "tls":
+                server.starttls()
+        if self.username:
+            server.login(self.username, self.password)
+        self._server = server
+        self.stats["connections"] += 1
+        self.stats["connect_seconds"] += time.perf_counter() - started
+
+    def _disconnect(self):
+        """關閉連線（忽略已斷線的錯誤）"""
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _send_one(self, from_address: str, to_addresses: List[str], message: str):
+        """以目前連線發送，連線中斷時重連並重送一次"""
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self._disconnect()
+        if self._server is None:
+            self._connect()
+        try:
+            self._server.sendmail(from_address, to_addresses, message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+            self._disconnect()
+            self.stats["reconnects"] += 1
+            self._connect()
+            self._server.sendmail(from_address, to_addresses, message)
+        self._last_used = time.monotonic()
+        self.stats["messages"] += 1
+
+    def send(self, from_address: str, to_addresses: List[str], message: str):
+        """發送一封郵件（失敗時拋出 smtplib 例外）"""
+        with self._lock:
+            try:
+                self._send_one(from_address, to_addresses, message)
+            except Exception:
+                # 連線狀態不明，下次發送時重新連線
+                self._disconnect()
+                raise
+
+    def send_batch(self, from_address: str, to_addresses: List[str], messages: List[str]) -> List[bool]:
+        """
+        在同一個連線中依序發送多封郵件
+
+        Returns:
+            list: 每封郵件是否成功
+        """
+        results = []
+        with self._lock:
+            for message in messages:
+                try:
+                    self._send_one(from_address, to_addresses, message)
+                    results.append(True)
+                except smtplib.SMTPAuthenticationError:
+                    # 驗證失敗時其餘郵件也不可能成功
+                    raise
+                except Exception as e:
+                    safe_print(f"❌ Email 發送錯誤: {e}")
+                    self._disconnect()
+                    results.append(False)
+        return results
+
+    def close(self):
+        """關閉保持中的連線"""
+        with self._lock:
+            self._disconnect()
 
 
 class EmailNotifier:
@@ -25,6 +153,7 @@ class EmailNotifier:
         encryption: Optional[str] = None,
         from_address: Optional[str] = None,
         to_address: Optional[str] = None,
+        settings=None,
     ):
         """
         初始化 Email 通知器
@@ -37,21 +166,29 @@ class EmailNotifier:
             encryption: 加密方式 tls/ssl/none（若不提供則從環境變數讀取）
             from_address: 寄件人地址（若不提供則從環境變數讀取）
             to_address: 收件人地址，支援逗號分隔多個地址（若不提供則從環境變數讀取）
+            settings: 執行設定（預設 get_settings()）
         """
-        self.host = self._clean_value(host or os.getenv("MAIL_HOST"))
-        self.port = int(self._clean_value(port or os.getenv("MAIL_PORT") or "587"))
-        self.username = self._clean_value(username or os.getenv("MAIL_USERNAME"))
-        self.password = self._clean_value(password or os.getenv("MAIL_PASSWORD"))
-        self.encryption = self._clean_value(
-            encryption or os.getenv("MAIL_ENCRYPTION") or "tls"
-        ).lower()
-        self.from_address = self._clean_value(
-            from_address or os.getenv("MAIL_FROM_ADDRESS")
-        )
+        settings = settings or get_settings()
+        self.host = self._clean_value(host or settings.mail_host)
+        self.port = int(self._clean_value(port or settings.mail_port))
+        self.username = self._clean_value(username or settings.mail_username)
+        self.password = self._clean_value(password or settings.mail_password)
+        self.encryption = self._clean_value(encryption or settings.mail_encryption).lower()
+        self.from_address = self._clean_value(from_address or settings.mail_from_address)
         # 支援多個收件人（逗號分隔）
-        raw_to_address = self._clean_value(to_address or os.getenv("MAIL_TO_ADDRESS"))
+        raw_to_address = self._clean_value(to_address or settings.mail_to_address)
         self.to_addresses = self._parse_addresses(raw_to_address)
 
+        # 保持連線的 SMTP 傳輸層（第一次發送時才連線）
+        self.transport = SmtpTransport(
+            self.host,
+            self.port,
+            self.username,
+            self.password,
+            self.encryption,
+            idle_timeout=settings.mail_idle_timeout,
+        )
+
     def _clean_value(self, value: Optional[str]) -> Optional[str]:
         """清理設定值（移除開頭的 = 或引號）"""
         if value is None:
@@ -82,6 +219,15 @@ class EmailNotifier:
             and self.to_addresses
         )
 
+    def _build_message(self, subject: str, body: str) -> str:
+        """建立純文字郵件"""
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = self.from_address
+        msg["To"] = ", ".join(self.to_addresses)
+        msg.attach(MIMEText(body, "plain", "utf-8"))
+        return msg.as_string()
+
     def send_message(
         self, subject: str, body: str, html_body: Optional[str] = None
     ) -> bool:
@@ -101,26 +247,8 @@ class EmailNotifier:
             return False
 
         try:
-            # 建立郵件
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = self.from_address
-            msg["To"] = ", ".join(self.to_addresses)
-
-            # 加入純文字內容
-            msg.attach(MIMEText(body, "plain", "utf-8"))
-
-            # 連線並發送
-            if self.encryption == "ssl":
-                server = smtplib.SMTP_SSL(self.host, self.port, timeout=30)
-            else:
-                server = smtplib.SMTP(self.host, self.port, timeout=30)
-                if self.encryption == "tls":
-                    server.starttls()
-
-            server.login(self.username, self.password)
-            server.sendmail(self.from_address, self.to_addresses, msg.as_string())
-            server.quit()
+            # 以保持中的連線發送（必要時才連線 / 重連）
+            self.transport.send(self.from_address, self.to_addresses, self._build_message(subject, body))
 
             safe_print(f"✅ Email 通知發送成功 (共 {len(self.to_addresses)} 位收件人)")
             return True
@@ -135,6 +263,40 @@ class EmailNotifier:
             safe_print(f"❌ Email 通知發生未預期的錯誤: {e}")
             return False
 
+    def send_batch(self, messages: List[Tuple[str, str]]) -> List[bool]:
+        """
+        在同一個 SMTP 連線中發送多封郵件
+
+        Args:
+            messages: [(主旨, 純文字內容), ...]
+
+        Returns:
+            list: 每封郵件是否成功發送
+        """
+        if not self.is_enabled():
+            safe_print("⚠️  Email SMTP 設定不完整，跳過通知")
+            return [False] * len(messages)
+
+        try:
+            results = self.transport.send_batch(
+                self.from_address,
+                self.to_addresses,
+                [self._build_message(subject, body) for subject, body in messages],
+            )
+        except smtplib.SMTPAuthenticationError as e:
+            safe_print(f"❌ Email 驗證失敗: {e}")
+            return [False] * len(messages)
+        except Exception as e:
+            safe_print(f"❌ Email 通知發生未預期的錯誤: {e}")
+            return [False] * len(messages)
+
+        safe_print(f"✅ Email 批次發送完成: {sum(results)}/{len(results)} 封成功")
+        return results
+
+    def close(self):
+        """關閉保持中的 SMTP 連線"""
+        self.transport.close()
+
     def send_security_warning_notification(
         self, security_warning_accounts: List[Dict], function_name: str = "", **kwargs
     ) -> bool:
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+通知派送器 - 以背景執行緒池發送 Discord / Email 通知
+
+通知放入有上限的佇列後立即返回，由工作執行緒發送；失敗時以指數退避加隨機抖動重試。
+佇列已滿、重試用盡或結束時仍未送出的通知寫入 dead-letter 檔（JSON Lines），不會無聲遺失。
+"""
+
+import json
+import time
+import queue
+import random
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .windows_encoding_utils import safe_print
+from ..core.settings import get_settings
+
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """背景通知派送器"""
+
+    def __init__(
+        self,
+        workers=None,
+        max_queue=None,
+        max_attempts=None,
+        base_delay=2.0,
+        max_delay=60.0,
+        dead_letter_path=None,
+        settings=None,
+    ):
+        """
+        初始化通知派送器（工作執行緒於第一次 submit 時啟動）
+
+        Args:
+            workers: 工作執行緒數（預設讀取設定 NOTIFY_WORKERS，否則 4）
+            max_queue: 佇列上限（預設讀取設定 NOTIFY_QUEUE_SIZE，否則 32）
+            max_attempts: 每則通知最多嘗試次數（預設讀取設定 NOTIFY_MAX_ATTEMPTS，否則 4）
+            base_delay: 第一次重試前的基準等待秒數
+            max_delay: 單次重試等待上限秒數
+            dead_letter_path: 無法送出的通知記錄檔（預設讀取設定 NOTIFY_DEAD_LETTER）
+            settings: 執行設定（預設 get_settings()）
+        """
+        self.settings = settings or get_settings()
+        self.workers = workers or self.settings.notify_workers
+        self.max_attempts = max_attempts or self.settings.notify_max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.dead_letter_path = Path(dead_letter_path or self.settings.notify_dead_letter)
+        self._queue = queue.Queue(maxsize=max_queue or self.settings.notify_queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._closing = threading.Event()
+        self.stats = {"submitted": 0, "sent": 0, "retries": 0, "dead_lettered": 0}
+
+    def _ensure_workers(self):
+        """啟動工作執行緒（只做一次）"""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"notify-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, name, func, *args, **kwargs):
+        """
+        排入一則通知（不阻塞）
+
+        Args:
+            name: 通知名稱（日誌與 dead-letter 使用）
+            func: 發送函數，回傳 True 表示成功
+            *args, **kwargs: 傳給 func 的參數
+
+        Returns:
+            bool: 是否成功排入佇列（佇列已滿時寫入 dead-letter 並回傳 False）
+        """
+        task = {"name": name, "func": func, "args": args, "kwargs": kwargs, "attempts": 0, "error": None}
+        if self._closing.is_set():
+            self._dead_letter(task, "派送器已關閉")
+            return False
+
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait(task)
+        except queue.Full:
+            safe_print(f"⚠️ 通知佇列已滿，{name} 改寫入 {self.dead_letter_path}")
+            self._dead_letter(task, "佇列已滿")
+            return False
+        with self._lock:
+            self.stats["submitted"] += 1
+        return True
+
+    def _run(self):
+        """工作執行緒：取出通知並發送（含重試）"""
+        while True:
+            task = self._queue.get()
+            try:
+                if task is _STOP:
+                    return
+                self._deliver(task)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, task):
+        """發送一則通知，失敗時退避重試，用盡後寫入 dead-letter"""
+        while task["attempts"] < self.max_attempts:
+            task["attempts"] += 1
+            try:
+                if task["func"](*task["args"], **task["kwargs"]):
+                    with self._lock:
+                        self.stats["sent"] += 1
+                    return
+                task["error"] = "發送函數回傳失敗"
+            except Exception as e:
+                task["error"] = f"{type(e).__name__}: {e}"
+
+            if task["attempts"] >= self.max_attempts or self._closing.is_set():
+                break
+            # 指數退避 + 抖動，避免多則通知同時重試撞上同一個速率限制
+            delay = min(self.max_delay, self.base_delay * 2 ** (task["attempts"] - 1)) * random.uniform(0.5, 1.5)
+            with self._lock:
+                self.stats["retries"] += 1
+            safe_print(f"🔁 {task['name']} 發送失敗（第 {task['attempts']} 次），{delay:.1f} 秒後重試")
+            if self._closing.wait(delay):
+                break
+
+        safe_print(f"❌ {task['name']} 發送失敗，已寫入 {self.dead_letter_path}")
+        self._dead_letter(task, task["error"])
+
+    def _dead_letter(self, task, reason):
+        """將無法送出的通知寫入 dead-letter 檔，事後可依內容補發"""
+        entry = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "name": task["name"],
+            "reason": reason,
+            "attempts": task["attempts"],
+            "args": task["args"],
+            "kwargs": task["kwargs"],
+        }
+        with self._lock:
+            self.stats["dead_lettered"] += 1
+            try:
+                self.dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            except Exception as e:
+                safe_print(f"⚠️ dead-letter 寫入失敗: {e}")
+
+    def close(self, timeout=None):
+        """
+        等待佇列中的通知送出後停止工作執行緒（之後再 submit 會重新啟動）
+
+        Args:
+            timeout: 最長等待秒數（預設讀取設定 NOTIFY_DRAIN_TIMEOUT，否則 60）；
+                     逾時後停止重試，尚未送出的通知寫入 dead-letter
+        """
+        if timeout is None:
+            timeout = self.settings.notify_drain_timeout
+        if not self._threads:
+            return
+
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        self._closing.set()
+        # 逾時：取出尚未開始的通知寫入 dead-letter
+        while True:
+            try:
+                task = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if task is not _STOP:
+                self._dead_letter(task, "結束時仍未送出")
+            self._queue.task_done()
+
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()) + 1)
+        self._threads = []
+        self._closing.clear()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+═══════════════════════════════════════════════════════════════════════════
+本機 OCR 服務 - SeleniumTCat
+═══════════════════════════════════════════════════════════════════════════
+用途: 啟動共用的驗證碼 OCR 服務，所有平行執行的爬蟲程序共用一個已預熱的模型
+      （爬蟲端設定 OCR_SERVICE_SOCKET 後自動使用，服務無法連線時改用本機 OCR）
+執行:
+  PYTHONPATH=$(pwd) uv run python src/utils/ocr_daemon.py --socket /tmp/tcat-ocr.sock
+  PYTHONPATH=$(pwd) uv run python src/utils/ocr_daemon.py --socket /tmp/tcat-ocr.sock --stats
+═══════════════════════════════════════════════════════════════════════════
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# 確保可以導入 src 模組
+# __file__ 在 src/utils/，需要往上兩層到達專案根目錄
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    from src.core.ocr_service import OcrServer, request_stats
+    from src.core.settings import get_settings
+    from src.utils.windows_encoding_utils import safe_print
+except ImportError as e:
+    print(f"❌ 導入模組失敗: {e}")
+    print("請確認在專案根目錄執行，並設定 PYTHONPATH=$(pwd)")
+    sys.exit(1)
+
+
+def main():
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="驗證碼 OCR 共用服務")
+    parser.add_argument(
+        "--socket", default=settings.ocr_service_socket or "/tmp/tcat-ocr.sock", help="Unix socket 路徑"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=settings.ocr_service_threads,
+        help="onnxruntime intra-op 執行緒上限（預設 1，避免與 Chrome 搶 CPU）",
+    )
+    parser.add_argument("--batch-window-ms", type=float, default=5, help="合併同批請求的收集時間（毫秒）")
+    parser.add_argument("--max-batch", type=int, default=16, help="單批最多請求數")
+    parser.add_argument("--stats", action="store_true", help="查詢執行中服務的延遲統計後結束")
+    args = parser.parse_args()
+
+    if not hasattr(__import__("socket"), "AF_UNIX"):
+        safe_print("❌ 此平台不支援 Unix socket，OCR 服務無法啟動")
+        sys.exit(1)
+
+    if args.stats:
+        try:
+            print(json.dumps(request_stats(args.socket), ensure_ascii=False, indent=2))
+        except Exception as e:
+            safe_print(f"❌ 無法查詢 OCR 服務: {e}")
+            sys.exit(1)
+        return
+
+    safe_print("📦 載入 OCR 模型...")
+    server = OcrServer(
+        args.socket, intra_op_threads=args.threads, batch_window_ms=args.batch_window_ms, max_batch=args.max_batch
+    )
+    warm_ms = server.warm_up()
+    safe_print(f"✅ 模型已預熱（{warm_ms:.0f} ms）: {server.solver.describe()}")
+    if not server.threads_limited:
+        safe_print("⚠️ 無法套用 onnxruntime 執行緒上限，使用預設執行緒數")
+
+    safe_print(f"🚀 OCR 服務啟動: {args.socket}（intra-op 執行緒: {args.threads}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        safe_print("\n🛑 OCR 服務已停止")
+        print(json.dumps(server.get_stats(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
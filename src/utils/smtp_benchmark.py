@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+═══════════════════════════════════════════════════════════════════════════
+SMTP 發送基準測試 - SeleniumTCat
+═══════════════════════════════════════════════════════════════════════════
+用途: 比較每封郵件重新連線、保持連線、同一連線批次發送三種方式的耗時
+      預設啟動內建的本機除錯 SMTP 伺服器（只接收不轉寄），
+      也可以用 --host/--port 指向其他本機除錯伺服器（例如 python -m aiosmtpd -n）
+執行:
+  PYTHONPATH=$(pwd) uv run python src/utils/smtp_benchmark.py
+  PYTHONPATH=$(pwd) uv run python src/utils/smtp_benchmark.py --messages 20 --connect-delay-ms 150
+  PYTHONPATH=$(pwd) uv run python src/utils/smtp_benchmark.py --host 127.0.0.1 --port 8025
+═══════════════════════════════════════════════════════════════════════════
+"""
+
+import sys
+import json
+import time
+import argparse
+import statistics
+import threading
+import socketserver
+from pathlib import Path
+
+# 確保可以導入 src 模組
+# __file__ 在 src/utils/，需要往上兩層到達專案根目錄
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    from src.utils.email_notifier import SmtpTransport
+    from src.utils.windows_encoding_utils import safe_print
+except ImportError as e:
+    print(f"❌ 導入模組失敗: {e}")
+    print("請確認在專案根目錄執行，並設定 PYTHONPATH=$(pwd)")
+    sys.exit(1)
+
+
+FROM_ADDRESS = "benchmark@localhost"
+TO_ADDRESSES = ["ops@localhost"]
+
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    """最小 SMTP 對話：接受所有郵件並丟棄，以 connect_delay 模擬 TLS 交握與登入成本"""
+
+    disable_nagle_algorithm = True
+
+    def _reply(self, line):
+        self.wfile.write((line + "\r\n").encode("ascii"))
+
+    def handle(self):
+        time.sleep(self.server.connect_delay)
+        self.server.connections += 1
+        self._reply("220 localhost benchmark sink")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip().upper()
+            if command.startswith("EHLO"):
+                self._reply("250-localhost")
+                self._reply("250 8BITMIME")
+            elif command.startswith("DATA"):
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                self.server.messages += 1
+                self._reply("250 OK")
+            elif command.startswith("QUIT"):
+                self._reply("221 Bye")
+                return
+            else:
+                # HELO / MAIL / RCPT / RSET / NOOP
+                self._reply("250 OK")
+
+
+class SinkSmtpServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """本機除錯 SMTP 伺服器"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, connect_delay=0.0):
+        super().__init__(("127.0.0.1", 0), _SinkHandler)
+        self.connect_delay = connect_delay
+        self.connections = 0
+        self.messages = 0
+
+
+def build_messages(count):
+    """產生測試郵件"""
+    return [
+        f"From: {FROM_ADDRESS}\r\nTo: {TO_ADDRESSES[0]}\r\nSubject: benchmark {index}\r\n\r\nbody {index}\r\n"
+        for index in range(count)
+    ]
+
+
+def bench_per_message(host, port, messages):
+    """每封郵件都重新連線（原本的發送方式）"""
+    for message in messages:
+        transport = SmtpTransport(host, port, encryption="none")
+        transport.send(FROM_ADDRESS, TO_ADDRESSES, message)
+        transport.close()
+
+
+def bench_keep_alive(host, port, messages):
+    """保持連線逐封發送"""
+    transport = SmtpTransport(host, port, encryption="none")
+    for message in messages:
+        transport.send(FROM_ADDRESS, TO_ADDRESSES, message)
+    transport.close()
+
+
+def bench_batch(host, port, messages):
+    """同一連線批次發送"""
+    transport = SmtpTransport(host, port, encryption="none")
+    transport.send_batch(FROM_ADDRESS, TO_ADDRESSES, messages)
+    transport.close()
+
+
+MODES = {
+    "per-message": bench_per_message,
+    "keep-alive": bench_keep_alive,
+    "batch": bench_batch,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SMTP 連線重用基準測試")
+    parser.add_argument("--messages", type=int, default=10, help="每輪發送的郵件數")
+    parser.add_argument("--runs", type=int, default=3, help="每種方式重複次數（取中位數）")
+    parser.add_argument("--connect-delay-ms", type=float, default=100, help="內建伺服器每次連線的延遲，模擬 TLS 交握與登入")
+    parser.add_argument("--host", help="使用外部本機除錯 SMTP 伺服器（不使用內建伺服器）")
+    parser.add_argument("--port", type=int, default=8025, help="外部 SMTP 伺服器埠號")
+    parser.add_argument("--json", dest="json_path", help="將結果另存為 JSON")
+    args = parser.parse_args()
+
+    server = None
+    if args.host:
+        host, port = args.host, args.port
+    else:
+        server = SinkSmtpServer(connect_delay=args.connect_delay_ms / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+        safe_print(f"📮 內建除錯 SMTP 伺服器: {host}:{port}（連線延遲 {args.connect_delay_ms:.0f} ms）")
+
+    messages = build_messages(args.messages)
+    results = {}
+    for name, bench in MODES.items():
+        durations = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            bench(host, port, messages)
+            durations.append(time.perf_counter() - started)
+        median = statistics.median(durations)
+        results[name] = {
+            "total_ms": round(median * 1000, 1),
+            "per_message_ms": round(median * 1000 / len(messages), 1),
+        }
+
+    print("\n" + "=" * 70)
+    print(f"  SMTP 發送耗時（{args.messages} 封，{args.runs} 次取中位數）")
+    print("=" * 70)
+    baseline = results["per-message"]["total_ms"]
+    for name, result in results.items():
+        speedup = baseline / result["total_ms"] if result["total_ms"] else 0
+        print(f"  {name:<12} {result['total_ms']:>9.1f} ms  {result['per_message_ms']:>7.1f} ms/封  x{speedup:.1f}")
+    if server:
+        print(f"\n  伺服器統計: {server.connections} 次連線，{server.messages} 封郵件")
+        server.shutdown()
+        server.server_close()
+    print("=" * 70)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        safe_print(f"💾 結果已儲存: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+═══════════════════════════════════════════════════════════════════════════
+啟動時間基準測試 - SeleniumTCat
+═══════════════════════════════════════════════════════════════════════════
+用途: 以 python -X importtime 量測各入口模組的匯入耗時與 --help 實際耗時，
+      列出最耗時的套件，並檢查 OCR / webdriver_manager 等重型套件是否在啟動時就被載入
+執行:
+  PYTHONPATH=$(pwd) uv run python src/utils/startup_benchmark.py
+  PYTHONPATH=$(pwd) uv run python src/utils/startup_benchmark.py --runs 5 --top 15
+  PYTHONPATH=$(pwd) uv run python src/utils/startup_benchmark.py --json startup.json
+═══════════════════════════════════════════════════════════════════════════
+"""
+
+import sys
+import os
+import re
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+# 確保可以導入 src 模組
+# __file__ 在 src/utils/，需要往上兩層到達專案根目錄
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    from src.utils.windows_encoding_utils import safe_print
+except ImportError as e:
+    print(f"❌ 導入模組失敗: {e}")
+    print("請確認在專案根目錄執行，並設定 PYTHONPATH=$(pwd)")
+    sys.exit(1)
+
+
+# 要量測的入口模組
+ENTRY_MODULES = [
+    "src.scrapers.payment_scraper",
+    "src.scrapers.freight_scraper",
+    "src.scrapers.unpaid_scraper",
+    "src.core.multi_account_manager",
+    "src.utils.discord_notifier",
+    "src.utils.email_notifier",
+]
+
+# 要量測 --help 耗時的腳本
+HELP_SCRIPTS = [
+    "src/scrapers/payment_scraper.py",
+    "src/scrapers/freight_scraper.py",
+    "src/scrapers/unpaid_scraper.py",
+]
+
+# 應該延遲到實際使用時才載入的重型套件
+LAZY_PACKAGES = ["ddddocr", "onnxruntime", "numpy", "PIL", "webdriver_manager", "requests", "bs4"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+
+def _subprocess_env():
+    """子程序環境：確保可匯入 src"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(project_root) + os.pathsep + env.get("PYTHONPATH", "")
+    env["PYTHONUNBUFFERED"] = "1"
+    return env
+
+
+def parse_importtime(stderr):
+    """
+    解析 -X importtime 輸出
+
+    Returns:
+        list: [{"module", "self_us", "cumulative_us", "depth"}, ...]
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append(
+                {
+                    "module": module,
+                    "self_us": int(self_us),
+                    "cumulative_us": int(cumulative_us),
+                    "depth": (len(indent) - 1) // 2,
+                }
+            )
+    return entries
+
+
+def measure_import(module, runs):
+    """量測單一模組的匯入耗時（取中位數那次的明細）"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=project_root,
+            env=_subprocess_env(),
+            capture_output=True,
+            text=True,
+        )
+        wall_ms = (time.perf_counter() - started) * 1000
+        entries = parse_importtime(proc.stderr)
+        samples.append({"wall_ms": wall_ms, "entries": entries, "returncode": proc.returncode, "stderr": proc.stderr})
+
+    samples.sort(key=lambda s: s["wall_ms"])
+    median = samples[len(samples) // 2]
+    entries = median["entries"]
+    target = next((e for e in reversed(entries) if e["module"] == module), None)
+    loaded = {e["module"].split(".")[0] for e in entries}
+
+    # 依累計耗時列出最外層（由專案模組直接匯入）的第三方 / 標準函式庫套件
+    packages = {}
+    for entry in entries:
+        root = entry["module"].split(".")[0]
+        if root == "src":
+            continue
+        packages[root] = max(packages.get(root, 0), entry["cumulative_us"])
+
+    error = None
+    if median["returncode"] != 0:
+        error = median["stderr"].strip().splitlines()[-1] if median["stderr"].strip() else "匯入失敗"
+    return {
+        "module": module,
+        "wall_ms": round(statistics.median(s["wall_ms"] for s in samples), 1),
+        "import_ms": round(target["cumulative_us"] / 1000, 1) if target else None,
+        "eager_heavy": [name for name in LAZY_PACKAGES if name in loaded],
+        "top_packages": sorted(packages.items(), key=lambda item: -item[1]),
+        "error": error,
+    }
+
+
+def measure_help(script, runs):
+    """量測 `python <script> --help` 的實際耗時"""
+    durations = []
+    returncode = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, script, "--help"], cwd=project_root, env=_subprocess_env(), capture_output=True
+        )
+        durations.append((time.perf_counter() - started) * 1000)
+        returncode = proc.returncode
+    return {"script": script, "wall_ms": round(statistics.median(durations), 1), "ok": returncode == 0}
+
+
+def measure_baseline(runs):
+    """量測空的 Python 直譯器啟動耗時，作為比較基準"""
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], capture_output=True)
+        durations.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(durations), 1)
+
+
+def print_report(baseline_ms, imports, helps, top):
+    """列印量測結果"""
+    print("\n" + "=" * 70)
+    print(f"  Python 直譯器啟動基準: {baseline_ms:.1f} ms")
+    print("=" * 70)
+
+    for result in imports:
+        print(f"\n📦 {result['module']}")
+        if result["error"]:
+            print(f"   ❌ 匯入失敗: {result['error']}")
+            continue
+        print(f"   匯入耗時: {result['import_ms']} ms（含直譯器啟動 {result['wall_ms']} ms）")
+        if result["eager_heavy"]:
+            print(f"   ⚠️ 啟動時即載入的重型套件: {', '.join(result['eager_heavy'])}")
+        else:
+            print("   ✅ 重型套件皆延遲載入")
+        for name, cumulative_us in result["top_packages"][:top]:
+            print(f"     {cumulative_us / 1000:>8.1f} ms  {name}")
+
+    print("\n" + "-" * 70)
+    print("  --help 耗時")
+    print("-" * 70)
+    for result in helps:
+        status = "" if result["ok"] else "（執行失敗）"
+        print(f"  {result['wall_ms']:>8.1f} ms  {result['script']}{status}")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="入口模組啟動時間基準測試（-X importtime）")
+    parser.add_argument("--runs", type=int, default=3, help="每項量測重複次數（取中位數）")
+    parser.add_argument("--top", type=int, default=10, help="每個模組列出最耗時的套件數")
+    parser.add_argument("--modules", help=f"要量測的模組，逗號分隔（預設: {', '.join(ENTRY_MODULES)}）")
+    parser.add_argument("--json", dest="json_path", help="將結果另存為 JSON")
+    args = parser.parse_args()
+
+    modules = [m.strip() for m in args.modules.split(",") if m.strip()] if args.modules else ENTRY_MODULES
+
+    safe_print(f"⏱️ 量測啟動時間（每項 {args.runs} 次取中位數）...")
+    baseline_ms = measure_baseline(args.runs)
+    imports = [measure_import(module, args.runs) for module in modules]
+    helps = [measure_help(script, args.runs) for script in HELP_SCRIPTS]
+
+    print_report(baseline_ms, imports, helps, args.top)
+
+    if args.json_path:
+        payload = {"baseline_ms": baseline_ms, "imports": imports, "help": helps}
+        Path(args.json_path).write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        safe_print(f"💾 結果已儲存: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()